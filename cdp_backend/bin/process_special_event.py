@@ -7,14 +7,11 @@ import sys
 import traceback
 from pathlib import Path
 
-from fsspec.core import url_to_fs
-from fsspec.implementations.local import LocalFileSystem
-
 from cdp_backend.file_store.functions import upload_file
 from cdp_backend.pipeline import event_gather_pipeline as pipeline
 from cdp_backend.pipeline.ingestion_models import EventIngestionModel
 from cdp_backend.pipeline.pipeline_config import EventGatherPipelineConfig
-from cdp_backend.utils.file_utils import resource_copy
+from cdp_backend.utils.media_cache import get_media_cache
 
 ###############################################################################
 
@@ -66,20 +63,20 @@ def main() -> None:
                 open_resource.read()
             )
 
+            media_cache = get_media_cache()
             for session in ingestion_model.sessions:
                 # Copy if remote resource, otherwise use local file uri
-                fs, path = url_to_fs(session.video_uri)
-                if not isinstance(fs, LocalFileSystem):
-                    filepath = resource_copy(session.video_uri)
-                else:
-                    filepath = session.video_uri
-
-                # Upload video file to file store
-                video_uri = upload_file(
-                    credentials_file=config.google_credentials_file,
-                    bucket=config.validated_gcs_bucket_name,
-                    filepath=filepath,
-                )
+                with media_cache.open(session.video_uri) as filepath:
+                    # Upload video file to file store
+                    video_uri = upload_file(
+                        credentials_file=config.google_credentials_file,
+                        bucket=config.validated_gcs_bucket_name,
+                        filepath=filepath,
+                    )
+
+                    # Register the local copy under the uploaded uri so that the
+                    # pipeline doesn't download the video back from the file store
+                    media_cache.add(video_uri, filepath)
 
                 # Replace video_uri of session
                 session.video_uri = video_uri
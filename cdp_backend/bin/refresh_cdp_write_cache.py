@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import argparse
+import logging
+import sys
+import traceback
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from fireo.models import Model
+
+from cdp_backend.database import DATABASE_MODELS
+from cdp_backend.database import functions as db_functions
+from cdp_backend.database.write_cache import (
+    DocumentWriteCache,
+    get_document_fingerprint,
+)
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(levelname)4s: %(module)s:%(lineno)4s %(asctime)s] %(message)s",
+)
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class Args(argparse.Namespace):
+    def __init__(self) -> None:
+        self.__parse()
+
+    def __parse(self) -> None:
+        p = argparse.ArgumentParser(
+            prog="refresh_cdp_write_cache",
+            description=(
+                "Invalidate a CDP database write cache and optionally refill it "
+                "from the documents currently stored in the database."
+            ),
+        )
+        p.add_argument(
+            "write_cache_path",
+            type=Path,
+            help="Path to the database write cache SQLite file.",
+        )
+        p.add_argument(
+            "-g",
+            "--google_credentials_file",
+            type=Path,
+            default=None,
+            help=(
+                "Path to Google service account JSON key. "
+                "If provided, the cache is refilled from the database."
+            ),
+        )
+        p.add_argument(
+            "-c",
+            "--collections",
+            type=str,
+            nargs="+",
+            default=None,
+            help="The collections to refresh. Default: all collections.",
+        )
+        p.parse_args(namespace=self)
+
+
+###############################################################################
+
+
+def _iter_pages(documents: Iterator[Model], page_size: int = 1000) -> Iterator[List]:
+    page: List[Model] = []
+    for doc in documents:
+        page.append(doc)
+        if len(page) == page_size:
+            yield page
+            page = []
+
+    if len(page) > 0:
+        yield page
+
+
+def _refresh_cdp_write_cache(
+    write_cache_path: Path,
+    google_creds_path: Optional[Path] = None,
+    collections: Optional[List[str]] = None,
+) -> None:
+    write_cache = DocumentWriteCache(write_cache_path)
+
+    for model in DATABASE_MODELS:
+        if collections is not None and model.collection_name not in collections:
+            continue
+
+        num_invalidated = write_cache.invalidate([model.collection_name])
+        log.info(
+            f"Invalidated {num_invalidated} cached documents "
+            f"from collection: {model.collection_name}"
+        )
+
+        # Refill from the documents that are actually stored
+        # References are only needed as ids so they are not loaded
+        if google_creds_path is not None:
+            num_cached = 0
+            for documents in _iter_pages(
+                db_functions.iter_collection(
+                    db_model=model,
+                    credentials_file=str(google_creds_path),
+                    load_references=False,
+                )
+            ):
+                write_cache.add(get_document_fingerprint(doc) for doc in documents)
+                num_cached += len(documents)
+
+            log.info(
+                f"Cached {num_cached} stored documents "
+                f"from collection: {model.collection_name}"
+            )
+
+    write_cache.close()
+    log.info("Write cache refresh complete")
+
+
+def main() -> None:
+    try:
+        args = Args()
+        _refresh_cdp_write_cache(
+            write_cache_path=args.write_cache_path,
+            google_creds_path=args.google_credentials_file,
+            collections=args.collections,
+        )
+    except Exception as e:
+        log.error("=============================================")
+        log.error("\n\n" + traceback.format_exc())
+        log.error("=============================================")
+        log.error("\n\n" + str(e) + "\n")
+        log.error("=============================================")
+        sys.exit(1)
+
+
+###############################################################################
+# Allow caller to directly run this module (usually in development scenarios)
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import json
 import logging
 import sys
 import traceback
@@ -74,6 +75,15 @@ class Args(argparse.Namespace):
                 "Dask Distributed cluster for event processing."
             ),
         )
+        p.add_argument(
+            "--dry_run",
+            action="store_true",
+            dest="dry_run",
+            help=(
+                "Boolean option to only print the report of the planned work "
+                "(events to store and sessions to process) without running it."
+            ),
+        )
 
         p.parse_args(namespace=self)
 
@@ -86,6 +96,16 @@ def main() -> None:
                 open_resource.read()
             )
 
+        # Only report the planned work
+        if args.dry_run:
+            plan = pipeline.plan_event_gather(
+                config=config,
+                from_dt=args.from_dt,
+                to_dt=args.to_dt,
+            )
+            print(json.dumps(plan.to_report(), indent=4))
+            return
+
         # Get flow definition
         flow = pipeline.create_event_gather_flow(
             config=config,
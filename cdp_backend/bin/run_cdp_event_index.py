@@ -59,6 +59,15 @@ class Args(argparse.Namespace):
                 "Should the pipeline store the generated index to a local parquet file."
             ),
         )
+        p.add_argument(
+            "-i",
+            "--incremental",
+            action="store_true",
+            help=(
+                "Should the pipeline only index the events with transcripts created "
+                "since the previous incremental run."
+            ),
+        )
         p.add_argument(
             "-p",
             "--parallel",
@@ -86,6 +95,7 @@ def main() -> None:
             config=config,
             n_grams=args.n_grams,
             store_local=args.store_local,
+            incremental=args.incremental,
         )
 
         # Determine executor
@@ -10,11 +10,10 @@ from datetime import datetime
 from typing import Dict, List, NamedTuple
 
 import dask.dataframe as dd
-from nltk import ngrams
-from nltk.stem import SnowballStemmer
 
 from cdp_backend.database import models as db_models
-from cdp_backend.utils.string_utils import clean_text
+from cdp_backend.utils.stem_cache import get_stem_cache
+from cdp_backend.utils.string_utils import get_text_tokenizer
 
 ###############################################################################
 
@@ -86,6 +85,16 @@ class Args(argparse.Namespace):
             default="tfidf-*.parquet",
             help="The file glob for which files to use for reading a planned index.",
         )
+        p.add_argument(
+            "-v",
+            "--stem_vocabulary_path",
+            type=str,
+            default=None,
+            help=(
+                "Path to a stem vocabulary file (stored by the index pipeline) "
+                "to warm the stem cache with."
+            ),
+        )
         p.parse_args(namespace=self)
 
 
@@ -93,16 +102,18 @@ class Args(argparse.Namespace):
 
 
 def get_stemmed_grams_from_query(query: str) -> List[str]:
-    # Spawn stemmer
-    stemmer = SnowballStemmer("english")
+    # Use the stem cache shared with the index pipeline
+    stem_cache = get_stem_cache()
 
     # Create stemmed grams for query
-    query_terms = clean_text(query, clean_stop_words=True).split()
+    # Tokenized the same way as the indexed transcripts
+    tokenized = get_text_tokenizer().tokenize(query)
     stemmed_grams = []
     for n_gram_size in [1, 2, 3]:
-        grams = ngrams(query_terms, n_gram_size)
-        for gram in grams:
-            stemmed_grams.append(" ".join(stemmer.stem(term.lower()) for term in gram))
+        for gram in tokenized.get_content_n_grams(n_gram_size):
+            stemmed_grams.append(
+                " ".join(stem_cache.stem(tokenized.lowered_tokens[i]) for i in gram)
+            )
 
     return stemmed_grams
 
@@ -343,6 +354,9 @@ def run_local_search(
 def main() -> None:
     try:
         args = Args()
+        if args.stem_vocabulary_path is not None:
+            get_stem_cache(args.stem_vocabulary_path)
+
         run_remote_search(args.query, args.sort_by, args.first)
         run_local_search(args.query, args.local_index_glob, args.sort_by, args.first)
     except Exception as e:
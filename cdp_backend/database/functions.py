@@ -5,15 +5,26 @@ import logging
 import pickle
 from datetime import datetime
 from hashlib import sha256
-from typing import Any, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
 
 import fireo
+from fireo.database import db as fireo_db
+from fireo.fields import ReferenceField
 from fireo.models import Model
+from fireo.queries.query_wrapper import ModelWrapper, ReferenceDocLoader
 from google.cloud.firestore_v1.batch import WriteBatch
+from google.cloud.firestore_v1.document import DocumentReference, DocumentSnapshot
+from google.cloud.firestore_v1.field_path import FieldPath
 from google.cloud.firestore_v1.transaction import Transaction
 
 from ..database import models as db_models
 from ..pipeline import ingestion_models, transcript_model
+from ..utils import client_registry
+from .write_cache import (
+    DocumentFingerprint,
+    DocumentWriteCache,
+    get_document_fingerprint,
+)
 
 ###############################################################################
 
@@ -22,6 +33,17 @@ log = logging.getLogger(__name__)
 ###############################################################################
 
 
+# Instance attribute used to memoize a model's document id
+_DOC_HASH_MEMO_ATTR = "_doc_hash_memo"
+
+
+def _encode_primary_key_value(value: Any) -> bytes:
+    # Pickle protocol 4 is deterministic for the primary key value types we store
+    # (str, int, float, bool, None, datetime) and changing the encoding would change
+    # the id of every document already stored
+    return pickle.dumps(value, protocol=4)
+
+
 def generate_and_attach_doc_hash_as_id(db_model: Model) -> Model:
     """
     Generate a SHA256 hash to use as the document key for storage
@@ -36,27 +58,42 @@ def generate_and_attach_doc_hash_as_id(db_model: Model) -> Model:
     -------
     db_model: Model
         The updated database model with the doc key set.
+
+    Notes
+    -----
+    The generated id is memoized on the model and only regenerated when the value of
+    one of the model's primary keys (or the id of a referenced model) changes.
     """
-    # Create hasher and hash primary values
-    hasher = sha256()
+    # Collect the primary values
+    # Reference fields are represented by their (recursively generated) doc id
+    pk_values = []
     for pk in db_model._PRIMARY_KEYS:
         field = getattr(db_model, pk)
 
         # Handle reference fields by using their doc path
         if isinstance(field, Model):
             # Ensure that the underlying model has an id
-            # In place update to db_model for this field
-            setattr(db_model, pk, generate_and_attach_doc_hash_as_id(field))
-
-            # Now attach the generated hash document path
-            hasher.update(pickle.dumps(field.id, protocol=4))
+            generate_and_attach_doc_hash_as_id(field)
+            pk_values.append((Model, field.id))
 
         # Otherwise just simply add the primary key value
         else:
-            hasher.update(pickle.dumps(field, protocol=4))
+            pk_values.append((type(field), field))
+
+    # Reuse the id if none of the primary values changed since it was generated
+    memo_key = tuple(pk_values)
+    memo = db_model.__dict__.get(_DOC_HASH_MEMO_ATTR)
+    if memo is not None and memo[0] == memo_key and db_model.id == memo[1]:
+        return db_model
+
+    # Create hasher and hash primary values
+    hasher = sha256()
+    for _, value in pk_values:
+        hasher.update(_encode_primary_key_value(value))
 
     # Set the id to the first twelve characters of hexdigest
     db_model.id = hasher.hexdigest()[:12]
+    db_model.__dict__[_DOC_HASH_MEMO_ATTR] = (memo_key, db_model.id)
 
     return db_model
 
@@ -86,8 +123,8 @@ def upload_db_model(
     db_model: Model
         The uploaded, or updated, database model.
     """
-    # Init transaction and auth
-    fireo.connection(from_file=credentials_file)
+    # Init transaction and auth (connection is shared between calls)
+    client_registry.connect_firestore(credentials_file)
 
     # Generate id and upsert
     db_model = generate_and_attach_doc_hash_as_id(db_model)
@@ -95,6 +132,156 @@ def upload_db_model(
     return db_model
 
 
+class BatchedWritePlanner:
+    """
+    Plan database model uploads and commit them with Firestore write batches rather
+    than one request per document.
+
+    Document ids are generated as models are added so that later models can reference
+    them before anything is written. Models are placed into dependency "waves": a
+    model is always committed in a later wave than any planned model it references,
+    so no committed document ever references a document that is not yet stored.
+
+    Parameters
+    ----------
+    credentials_file: str
+        Path to Google Service Account Credentials JSON file.
+    max_batch_size: int
+        The maximum number of write operations per batch.
+        Default: 500 (the Firestore limit)
+    write_cache: Optional[DocumentWriteCache]
+        A record of documents stored by prior runs. Documents that are known to be
+        stored with the same content are not written again.
+        Default: None (write every document)
+
+    Examples
+    --------
+    >>> planner = BatchedWritePlanner(credentials_file)
+    >>> body = planner.add(create_body(body=body, start_datetime=start_datetime))
+    >>> event = planner.add(create_event(body_ref=body, event_datetime=dt))
+    >>> planner.commit()
+
+    Notes
+    -----
+    Models are validated when they are added, so any field validation error is raised
+    by `add` and the failing model is not planned.
+    """
+
+    def __init__(
+        self,
+        credentials_file: str,
+        max_batch_size: int = 500,
+        write_cache: Optional[DocumentWriteCache] = None,
+    ):
+        self.credentials_file = credentials_file
+        self.max_batch_size = max_batch_size
+        self.write_cache = write_cache
+        self._waves: List[List[WriteBatch]] = []
+        self._batch_sizes: List[List[int]] = []
+        self._batch_documents: List[List[List[DocumentFingerprint]]] = []
+        self._planned_waves: Dict[Tuple[str, str], int] = {}
+        self._num_skipped = 0
+
+    @staticmethod
+    def _get_key(db_model: Model) -> Tuple[str, str]:
+        return (db_model.__class__.__name__, db_model.id)
+
+    def _get_wave(self, db_model: Model) -> int:
+        # One wave after the latest planned model this model references
+        wave = 0
+        for value in vars(db_model).values():
+            if isinstance(value, Model):
+                referenced_wave = self._planned_waves.get(self._get_key(value))
+                if referenced_wave is not None:
+                    wave = max(wave, referenced_wave + 1)
+
+        return wave
+
+    def _get_batch(self, wave: int) -> WriteBatch:
+        while len(self._waves) <= wave:
+            self._waves.append([])
+            self._batch_sizes.append([])
+            self._batch_documents.append([])
+
+        batch_sizes = self._batch_sizes[wave]
+        if len(batch_sizes) == 0 or batch_sizes[-1] >= self.max_batch_size:
+            client_registry.connect_firestore(self.credentials_file)
+            self._waves[wave].append(fireo.batch())
+            batch_sizes.append(0)
+            self._batch_documents[wave].append([])
+
+        return self._waves[wave][-1]
+
+    def add(self, db_model: Model) -> Model:
+        """
+        Plan the upload, or update, of a database model.
+
+        Parameters
+        ----------
+        db_model: Model
+            The database model to upload.
+
+        Returns
+        -------
+        db_model: Model
+            The database model with its document id attached.
+        """
+        db_model = generate_and_attach_doc_hash_as_id(db_model)
+
+        # Skip documents that are already stored with the same content
+        # Nothing needs to wait for them so they are not planned in any wave
+        document: Optional[DocumentFingerprint] = None
+        if self.write_cache is not None:
+            document = get_document_fingerprint(db_model)
+            if self.write_cache.contains(document):
+                self._num_skipped += 1
+                return db_model
+
+        wave = self._get_wave(db_model)
+        upload_db_model(
+            db_model=db_model,
+            credentials_file=self.credentials_file,
+            batch=self._get_batch(wave),
+        )
+
+        # Only count the operation once it passed validation
+        self._batch_sizes[wave][-1] += 1
+        if document is not None:
+            self._batch_documents[wave][-1].append(document)
+        key = self._get_key(db_model)
+        self._planned_waves[key] = max(wave, self._planned_waves.get(key, wave))
+        return db_model
+
+    def commit(self) -> None:
+        """
+        Commit all planned uploads, wave by wave.
+        """
+        num_batches = 0
+        for wave, batch_sizes, batch_documents in zip(
+            self._waves, self._batch_sizes, self._batch_documents
+        ):
+            for batch, batch_size, documents in zip(wave, batch_sizes, batch_documents):
+                # Batches can be left empty by models that failed validation
+                if batch_size > 0:
+                    batch.commit()
+                    num_batches += 1
+
+                    # Only record documents once they are stored
+                    if self.write_cache is not None:
+                        self.write_cache.add(documents)
+
+        log.debug(
+            f"Committed {len(self._planned_waves)} documents "
+            f"in {num_batches} write batches "
+            f"({self._num_skipped} unchanged documents skipped)."
+        )
+        self._waves = []
+        self._batch_sizes = []
+        self._batch_documents = []
+        self._planned_waves = {}
+        self._num_skipped = 0
+
+
 def get_all_of_collection(
     db_model: Model, credentials_file: str, batch_size: int = 1000
 ) -> List[Model]:
@@ -115,8 +302,13 @@ def get_all_of_collection(
     -------
     documents: List[Model]
         All documents in the model's collection.
+
+    See Also
+    --------
+    iter_collection
+        Iterate over the documents without holding the whole collection in memory.
     """
-    fireo.connection(from_file=credentials_file)
+    client_registry.connect_firestore(credentials_file)
 
     # Construct all documents list and fill as batches return
     all_documents: List[Model] = []
@@ -133,6 +325,241 @@ def get_all_of_collection(
     return all_documents
 
 
+def _document_to_model(
+    db_model: Type[Model],
+    doc: DocumentSnapshot,
+    load_references: bool = True,
+) -> Model:
+    if load_references:
+        return ModelWrapper.from_query_result(db_model(), doc)
+
+    # Same as fireo's conversion but references are left for the caller to load
+    model = db_model()
+    for column_name, value in doc.to_dict().items():
+        field = model._meta.get_field_by_column_name(column_name)
+        if field is None:
+            continue
+
+        if isinstance(field, ReferenceField):
+            ref = field.field_value(value)
+            setattr(
+                model,
+                field.name,
+                ReferenceDocLoader(model, field, ref) if ref else None,
+            )
+        else:
+            setattr(model, field.name, field.field_value(value))
+
+    setattr(model, "_instance_modified", True)
+    setattr(model, "_id", doc.id)
+    model._create_time = doc.create_time
+    model._update_time = doc.update_time
+    return model
+
+
+def iter_collection(
+    db_model: Type[Model],
+    credentials_file: str,
+    page_size: int = 1000,
+    fields: Optional[Iterable[str]] = None,
+    load_references: bool = True,
+    filters: Optional[Iterable[Tuple[str, str, Any]]] = None,
+) -> Iterator[Model]:
+    """
+    Iterate over all documents in a collection, requesting a single page at a time.
+
+    Only a single page of documents is held in memory at any time.
+
+    Parameters
+    ----------
+    db_model: Type[Model]
+        The CDP database model to iterate over the documents of.
+    credentials_file: str
+        Path to Google Service Account Credentials JSON file.
+    page_size: int
+        How many documents to request at a single time.
+        Default: 1000
+    fields: Optional[Iterable[str]]
+        The names of the model fields to request. All other fields are left unset.
+        Default: None (request all fields)
+    load_references: bool
+        Whether to load all referenced documents (one read per reference) as each
+        document is converted. When False, reference fields are left as
+        ReferenceDocLoader objects that can be loaded with `get()`.
+        Default: True
+    filters: Optional[Iterable[Tuple[str, str, Any]]]
+        Filters to apply to the documents as (field name, operator, value) tuples.
+        i.e. [("created", ">", datetime(2021, 1, 1))]
+        Default: None (all documents of the collection)
+
+    Yields
+    ------
+    document: Model
+        Each document of the model's collection that matches the filters,
+        ordered by document id (after any range filtered fields).
+    """
+    client_registry.connect_firestore(credentials_file)
+
+    query = fireo_db.conn.collection(db_model.collection_name)
+
+    # Firestore requires range filtered fields to be ordered on first
+    range_filtered_columns: List[str] = []
+    for name, operator, value in filters or []:
+        column = db_model._meta.get_field(name).db_column_name
+        query = query.where(column, operator, value)
+        if operator != "==" and column not in range_filtered_columns:
+            range_filtered_columns.append(column)
+    for column in range_filtered_columns:
+        query = query.order_by(column)
+
+    # Documents are (finally) ordered by id so the last document of a page is the
+    # cursor
+    query = query.order_by(FieldPath.document_id()).limit(page_size)
+    if fields is not None:
+        query = query.select(
+            [db_model._meta.get_field(name).db_column_name for name in fields]
+        )
+
+    cursor: Optional[DocumentSnapshot] = None
+    while True:
+        page_query = query if cursor is None else query.start_after(cursor)
+        page = list(page_query.stream())
+        for doc in page:
+            yield _document_to_model(db_model, doc, load_references=load_references)
+
+        if len(page) < page_size:
+            return
+
+        cursor = page[-1]
+
+
+class ReferenceResolver:
+    """
+    Load the referenced documents of many models with batched reads.
+
+    All unloaded references (ReferenceDocLoader fields, see iter_collection) of a set
+    of models are collected and read with a single `get_all` request per batch,
+    then set back on the models. The loaded documents' own references are resolved
+    the same way, level by level, so resolving a chain of references
+    (i.e. Transcript -> Session -> Event -> Body) takes one batched read per level
+    rather than one read per reference.
+
+    Every loaded document is kept (by document path) so that a document referenced
+    by many models is loaded once and shared by all of them.
+
+    Parameters
+    ----------
+    credentials_file: str
+        Path to Google Service Account Credentials JSON file.
+    batch_size: int
+        The maximum number of documents to request at a single time.
+        Default: 300
+
+    Examples
+    --------
+    >>> resolver = ReferenceResolver(credentials_file)
+    >>> transcripts = list(
+    ...     iter_collection(Transcript, credentials_file, load_references=False)
+    ... )
+    >>> resolver.resolve(transcripts)
+    >>> transcripts[0].session_ref.event_ref.body_ref.name
+    """
+
+    def __init__(self, credentials_file: str, batch_size: int = 300):
+        self.credentials_file = credentials_file
+        self.batch_size = batch_size
+        self._documents: Dict[str, Model] = {}
+
+    def _load(
+        self,
+        references: Dict[str, Tuple[Type[Model], DocumentReference]],
+    ) -> List[Model]:
+        client_registry.connect_firestore(self.credentials_file)
+
+        loaded = []
+        paths = list(references)
+        for i in range(0, len(paths), self.batch_size):
+            refs = [references[path][1] for path in paths[i : i + self.batch_size]]
+            for doc in fireo_db.conn.get_all(refs):
+                path = doc.reference.path
+                if not doc.exists:
+                    log.warning(f"Referenced document does not exist: '{path}'")
+                    continue
+
+                model = _document_to_model(
+                    references[path][0],
+                    doc,
+                    load_references=False,
+                )
+                self._documents[path] = model
+                loaded.append(model)
+
+        return loaded
+
+    def resolve(self, models: Iterable[Model]) -> None:
+        """
+        Load (in place) every reference of the models and of the referenced models.
+
+        Parameters
+        ----------
+        models: Iterable[Model]
+            The models to resolve the references of.
+        """
+        models = list(models)
+        while len(models) > 0:
+            # Collect the references of this level that have not been loaded yet
+            unresolved: List[Tuple[Model, str, str]] = []
+            references: Dict[str, Tuple[Type[Model], DocumentReference]] = {}
+            for model in models:
+                for name in model._meta.field_list:
+                    value = getattr(model, name, None)
+                    if isinstance(value, ReferenceDocLoader):
+                        path = value.ref.path
+                        unresolved.append((model, name, path))
+                        if path not in self._documents:
+                            references[path] = (value.field.model_ref, value.ref)
+
+            # The next level is made of the newly loaded documents
+            models = self._load(references)
+            for model, name, path in unresolved:
+                if path in self._documents:
+                    setattr(model, name, self._documents[path])
+
+    def get(self, db_model: Type[Model], ids: Iterable[str]) -> Dict[str, Model]:
+        """
+        Get documents by id, with all of their references resolved.
+
+        Parameters
+        ----------
+        db_model: Type[Model]
+            The CDP database model of the documents.
+        ids: Iterable[str]
+            The ids of the documents to get.
+
+        Returns
+        -------
+        documents: Dict[str, Model]
+            The found documents mapped by document id.
+        """
+        client_registry.connect_firestore(self.credentials_file)
+
+        collection = fireo_db.conn.collection(db_model.collection_name)
+        paths: Dict[str, str] = {}
+        references: Dict[str, Tuple[Type[Model], DocumentReference]] = {}
+        for doc_id in ids:
+            ref = collection.document(doc_id)
+            paths[doc_id] = ref.path
+            if ref.path not in self._documents:
+                references[ref.path] = (db_model, ref)
+
+        self.resolve(self._load(references))
+        return {
+            doc_id: self._documents[path]
+            for doc_id, path in paths.items()
+            if path in self._documents
+        }
+
+
 def _strip_field(field: Optional[str]) -> Optional[str]:
     if isinstance(field, str):
         return field.strip()
@@ -3,13 +3,16 @@
 
 import logging
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Callable, List, Optional, Type
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type
 
 from fireo.models import Model
 from fsspec.core import url_to_fs
-from gcsfs import GCSFileSystem
 
+from ..utils import client_registry
 from ..utils.constants_utils import get_all_class_attr_values
 from ..utils.string_utils import convert_gcs_json_url_to_gsutil_form
 
@@ -17,6 +20,12 @@ from ..utils.string_utils import convert_gcs_json_url_to_gsutil_form
 
 log = logging.getLogger(__name__)
 
+# How long (in seconds) a resource_exists result is reused for
+RESOURCE_EXISTS_CACHE_TTL = 600
+
+_RESOURCE_EXISTS_CACHE: Dict[Tuple[str, str], Tuple[float, bool]] = {}
+_RESOURCE_EXISTS_CACHE_LOCK = threading.Lock()
+
 ###############################################################################
 # Model Validation
 
@@ -96,6 +105,48 @@ def email_is_valid(email: Optional[str]) -> bool:
     return False
 
 
+def _resource_exists(uri: str, google_credentials_file: Optional[str]) -> bool:
+    if uri.startswith("gs://") or uri.startswith("https://storage.googleapis"):
+        if google_credentials_file:
+            fs = client_registry.get_gcs_file_system(str(google_credentials_file))
+
+            # Convert to gsutil form if necessary
+            if uri.startswith("https://storage.googleapis"):
+                uri = convert_gcs_json_url_to_gsutil_form(uri)
+
+                # If uri is not convertible to gsutil form we can't confirm
+                if uri == "":
+                    return True
+
+            return fs.exists(uri)
+
+        # Can't check GCS resources without creds file
+        else:
+            return True
+
+    else:
+        # Get file system
+        fs, uri = url_to_fs(uri)
+
+        # Check exists
+        if fs.exists(uri):
+            return True
+
+    return False
+
+
+def _get_cached_resource_exists(key: Tuple[str, str]) -> Optional[bool]:
+    with _RESOURCE_EXISTS_CACHE_LOCK:
+        cached = _RESOURCE_EXISTS_CACHE.get(key)
+
+    if cached is not None:
+        checked_at, exists = cached
+        if time.monotonic() - checked_at < RESOURCE_EXISTS_CACHE_TTL:
+            return exists
+
+    return None
+
+
 def resource_exists(uri: Optional[str], **kwargs: str) -> bool:
     """
     Validate that the URI provided points to an existing file.
@@ -111,38 +162,72 @@ def resource_exists(uri: Optional[str], **kwargs: str) -> bool:
     -------
     status: bool
         The validation status.
+
+    Notes
+    -----
+    Results are cached for RESOURCE_EXISTS_CACHE_TTL seconds.
     """
 
     if uri is None:
         return True
 
-    if uri.startswith("gs://") or uri.startswith("https://storage.googleapis"):
-        if kwargs.get("google_credentials_file"):
-            fs = GCSFileSystem(token=str(kwargs.get("google_credentials_file")))
+    google_credentials_file = kwargs.get("google_credentials_file")
+    key = (uri, str(google_credentials_file or ""))
+    exists = _get_cached_resource_exists(key)
+    if exists is None:
+        exists = _resource_exists(uri, google_credentials_file)
+        with _RESOURCE_EXISTS_CACHE_LOCK:
+            _RESOURCE_EXISTS_CACHE[key] = (time.monotonic(), exists)
 
-            # Convert to gsutil form if necessary
-            if uri.startswith("https://storage.googleapis"):
-                uri = convert_gcs_json_url_to_gsutil_form(uri)
+    return exists
 
-                # If uri is not convertible to gsutil form we can't confirm
-                if uri == "":
-                    return True
 
-            return fs.exists(uri)
+def prevalidate_resources(
+    uris: Iterable[Optional[str]],
+    max_workers: int = 16,
+    **kwargs: str,
+) -> Dict[str, bool]:
+    """
+    Validate that many URIs point to existing files, concurrently, so that later
+    resource_exists validations are answered from the cache.
 
-        # Can't check GCS resources without creds file
-        else:
-            return True
+    Parameters
+    ----------
+    uris: Iterable[Optional[str]]
+        The URIs to validate resource existance for. None values are skipped.
+    max_workers: int
+        The maximum number of URIs to validate at the same time.
+        Default: 16
+    kwargs: str
+        Validator kwargs (i.e. google_credentials_file) passed to resource_exists.
 
-    else:
-        # Get file system
-        fs, uri = url_to_fs(uri)
+    Returns
+    -------
+    statuses: Dict[str, bool]
+        The validation status for each unique URI.
+    """
+    unique_uris = list(dict.fromkeys(uri for uri in uris if uri is not None))
+    if len(unique_uris) == 0:
+        return {}
 
-        # Check exists
-        if fs.exists(uri):
-            return True
+    def _validate(uri: str) -> bool:
+        try:
+            return resource_exists(uri, **kwargs)
+        except Exception as e:
+            # Leave the failure to be raised by the model validation itself
+            log.debug(f"Could not prevalidate resource: '{uri}' ({e})")
+            return False
 
-    return False
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_uris))) as exe:
+        return dict(zip(unique_uris, exe.map(_validate, unique_uris)))
+
+
+def clear_resource_exists_cache() -> None:
+    """
+    Forget all cached resource_exists results.
+    """
+    with _RESOURCE_EXISTS_CACHE_LOCK:
+        _RESOURCE_EXISTS_CACHE.clear()
 
 
 def create_constant_value_validator(
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple, Union
+
+from fireo.models import Model
+from fireo.queries.query_wrapper import ReferenceDocLoader
+from google.cloud.firestore_v1 import DocumentReference
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    stored REAL NOT NULL,
+    PRIMARY KEY (collection, doc_id)
+)
+"""
+
+# Write caches are shared per process and path
+_WRITE_CACHES_LOCK = threading.Lock()
+_WRITE_CACHES: Dict[Tuple[int, str], "DocumentWriteCache"] = {}
+
+###############################################################################
+
+
+class DocumentFingerprint(NamedTuple):
+    collection: str
+    doc_id: str
+    fingerprint: str
+
+
+def _normalize_field_value(value: Any) -> Any:
+    # References are represented by the id of the referenced document
+    if isinstance(value, (Model, DocumentReference)):
+        return ["ref", value.id]
+    if isinstance(value, ReferenceDocLoader):
+        return ["ref", value.ref.id]
+
+    # Firestore stores naive datetimes as UTC and returns them timezone aware
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).isoformat()
+
+    if isinstance(value, (list, tuple)):
+        return [_normalize_field_value(item) for item in value]
+
+    return value
+
+
+def get_document_fingerprint(db_model: Model) -> DocumentFingerprint:
+    """
+    Fingerprint the content of a database model as it would be stored.
+
+    Parameters
+    ----------
+    db_model: Model
+        The database model to fingerprint. The document id must already be attached.
+
+    Returns
+    -------
+    fingerprint: DocumentFingerprint
+        The collection, document id, and the SHA256 hash of all field values.
+    """
+    fields = [
+        [name, _normalize_field_value(getattr(db_model, name, None))]
+        for name in sorted(db_model._meta.field_list)
+    ]
+    fingerprint = sha256(
+        json.dumps(fields, default=str, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+    return DocumentFingerprint(db_model.collection_name, db_model.id, fingerprint)
+
+
+class DocumentWriteCache:
+    """
+    A local, persistent, record of the documents (and their content) that were
+    written to the database.
+
+    Used to skip writes of documents that are known to already be stored with the
+    exact same content (a document is only skipped when both its id and content
+    fingerprint match).
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        The path to the SQLite database file to store the cache in.
+    max_age: Optional[float]
+        The number of seconds a cached document is trusted for.
+        Default: None (trusted until invalidated)
+
+    Examples
+    --------
+    >>> cache = DocumentWriteCache("~/.cdp/write-cache.sqlite")
+    >>> planner = BatchedWritePlanner(credentials_file, write_cache=cache)
+
+    Notes
+    -----
+    The cache has no knowledge of changes made to the database by anything else.
+    Invalidate the cache (see bin/refresh_cdp_write_cache.py) after documents are
+    deleted or modified outside of the pipelines.
+    """
+
+    def __init__(self, path: Union[str, Path], max_age: Optional[float] = None):
+        self.path = Path(path).expanduser().resolve()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+
+        # A single connection is shared by all threads of the process
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(self.path),
+            timeout=30,
+            check_same_thread=False,
+        )
+        with self._lock, self._connection:
+            self._connection.execute(_CREATE_TABLE)
+
+    def contains(self, document: DocumentFingerprint) -> bool:
+        """
+        Check whether a document is known to be stored with the same content.
+
+        Parameters
+        ----------
+        document: DocumentFingerprint
+            The fingerprint of the document to check.
+
+        Returns
+        -------
+        contained: bool
+            Whether the exact document is stored.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT fingerprint, stored FROM documents "
+                "WHERE collection = ? AND doc_id = ?",
+                (document.collection, document.doc_id),
+            ).fetchone()
+
+        if row is None or row[0] != document.fingerprint:
+            return False
+
+        return self.max_age is None or time.time() - row[1] <= self.max_age
+
+    def add(self, documents: Iterable[DocumentFingerprint]) -> None:
+        """
+        Record that documents are stored.
+
+        Parameters
+        ----------
+        documents: Iterable[DocumentFingerprint]
+            The fingerprints of the stored documents.
+        """
+        stored = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                [(*document, stored) for document in documents],
+            )
+
+    def invalidate(self, collections: Optional[Iterable[str]] = None) -> int:
+        """
+        Forget stored documents so that they are written again.
+
+        Parameters
+        ----------
+        collections: Optional[Iterable[str]]
+            The collections to forget the documents of.
+            Default: None (forget all documents)
+
+        Returns
+        -------
+        num_invalidated: int
+            The number of documents forgotten.
+        """
+        with self._lock, self._connection:
+            if collections is None:
+                cursor = self._connection.execute("DELETE FROM documents")
+            else:
+                cursor = self._connection.executemany(
+                    "DELETE FROM documents WHERE collection = ?",
+                    [(collection,) for collection in collections],
+                )
+
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def get_write_cache(
+    path: Union[str, Path],
+    max_age: Optional[float] = None,
+) -> DocumentWriteCache:
+    """
+    Get the (process wide, shared) write cache stored at a path.
+
+    Parameters
+    ----------
+    path: Union[str, Path]
+        The path to the SQLite database file to store the cache in.
+    max_age: Optional[float]
+        The number of seconds a cached document is trusted for.
+        Only used when the cache is first opened in the process.
+        Default: None (trusted until invalidated)
+
+    Returns
+    -------
+    write_cache: DocumentWriteCache
+        The shared write cache.
+    """
+    key = (os.getpid(), str(Path(path).expanduser().resolve()))
+    with _WRITE_CACHES_LOCK:
+        if key not in _WRITE_CACHES:
+            _WRITE_CACHES[key] = DocumentWriteCache(path=path, max_age=max_age)
+
+        return _WRITE_CACHES[key]
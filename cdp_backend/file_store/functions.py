@@ -2,24 +2,35 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import os
+import posixpath
+import struct
+import threading
+import time
 from pathlib import Path
-from typing import Optional, Union
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple, Union
+from uuid import uuid4
 
 from fsspec.implementations.local import LocalFileSystem
 from gcsfs import GCSFileSystem
 
+from ..utils import client_registry
+
 ###############################################################################
 
 log = logging.getLogger(__name__)
 
 GCS_URI = "gs://{bucket}/{filename}"
 
+# How long a bucket listing is trusted before the bucket is listed again
+BUCKET_MANIFEST_MAX_AGE = 600
+
 ###############################################################################
 
 
 def initialize_gcs_file_system(credentials_file: str) -> GCSFileSystem:
     """
-    Initializes an instance of a GCSFileSystem.
+    Get the (process wide, shared) GCSFileSystem for the provided credentials.
 
     Parameters
     ----------
@@ -31,7 +42,149 @@ def initialize_gcs_file_system(credentials_file: str) -> GCSFileSystem:
     file_system: GCSFileSystem
         An initialized GCSFileSystem.
     """
-    return GCSFileSystem(token=str(credentials_file))
+    return client_registry.get_gcs_file_system(credentials_file)
+
+
+class BucketManifest:
+    """
+    An in-memory index of the files stored in a bucket.
+
+    Files are listed by name prefix: the part of the file name before the first "-"
+    (or the whole name when there is none). CDP artifacts are named
+    "{session content hash}-{artifact}", so the first lookup of any artifact of a
+    session lists all of that session's artifacts with a single request, without
+    listing the rest of the bucket. All other lookups of the same prefix are
+    answered locally and uploads are added to the index, so existence checks
+    don't each cost a request.
+
+    Parameters
+    ----------
+    fs: GCSFileSystem
+        The file system to list the bucket with.
+    bucket: str
+        The name of the bucket.
+    max_age: float
+        The number of seconds a prefix listing is trusted before it is listed
+        again.
+        Default: BUCKET_MANIFEST_MAX_AGE (10 minutes)
+    """
+
+    def __init__(
+        self,
+        fs: GCSFileSystem,
+        bucket: str,
+        max_age: float = BUCKET_MANIFEST_MAX_AGE,
+    ):
+        self.fs = fs
+        self.bucket = bucket
+        self.max_age = max_age
+        self._listings: Dict[Tuple[str, str], Tuple[float, Set[str]]] = {}
+        self._lock = threading.Lock()
+
+    def _split(self, filename: str) -> Tuple[Tuple[str, str], str]:
+        directory, name = posixpath.split(f"{self.bucket}/{filename.lstrip('/')}")
+        return (directory, name.split("-", 1)[0]), name
+
+    def _list_prefix(self, directory: str, prefix: str) -> Set[str]:
+        self.fs.invalidate_cache(directory)
+        try:
+            names = {
+                posixpath.basename(details["name"].rstrip("/"))
+                for details in self.fs.ls(directory, detail=True, prefix=prefix)
+                if details.get("type") == "file"
+            }
+        except FileNotFoundError:
+            return set()
+
+        # Listings are only filtered by the file store when not cached
+        return {name for name in names if name.startswith(prefix)}
+
+    def _get_listing(self, key: Tuple[str, str]) -> Set[str]:
+        with self._lock:
+            if key in self._listings:
+                listed_at, listing = self._listings[key]
+                if time.monotonic() - listed_at < self.max_age:
+                    return listing
+
+        # List outside of the lock, a concurrent listing only wastes a request
+        directory, prefix = key
+        listing = self._list_prefix(directory, prefix)
+        log.debug(f"Listed {len(listing)} files in: {directory}/{prefix}*")
+        with self._lock:
+            self._listings[key] = (time.monotonic(), listing)
+
+        return listing
+
+    def exists(self, filename: str) -> bool:
+        """
+        Check if a file exists in the bucket.
+
+        Parameters
+        ----------
+        filename: str
+            The name (path relative to the bucket) of the file to check for.
+
+        Returns
+        -------
+        exists: bool
+            Whether or not the file is in the bucket.
+        """
+        key, name = self._split(filename)
+        return name in self._get_listing(key)
+
+    def add(self, filename: str) -> None:
+        """
+        Record that a file was uploaded to the bucket.
+
+        Parameters
+        ----------
+        filename: str
+            The name (path relative to the bucket) of the uploaded file.
+        """
+        key, name = self._split(filename)
+        with self._lock:
+            if key in self._listings:
+                self._listings[key][1].add(name)
+
+
+_BUCKET_MANIFESTS: Dict[Tuple[int, str, str], BucketManifest] = {}
+_BUCKET_MANIFESTS_LOCK = threading.Lock()
+
+
+def get_bucket_manifest(bucket: str, credentials_file: str) -> BucketManifest:
+    """
+    Get the (process wide, shared) manifest of the files in a bucket.
+
+    Parameters
+    ----------
+    bucket: str
+        The name of the bucket.
+    credentials_file: str
+        The path to the Google Service Account credentials JSON file used
+        to initialize the file store connection.
+
+    Returns
+    -------
+    manifest: BucketManifest
+        The manifest for the bucket.
+    """
+    key = (os.getpid(), str(credentials_file), bucket)
+    with _BUCKET_MANIFESTS_LOCK:
+        if key not in _BUCKET_MANIFESTS:
+            _BUCKET_MANIFESTS[key] = BucketManifest(
+                fs=initialize_gcs_file_system(credentials_file),
+                bucket=bucket,
+            )
+
+        return _BUCKET_MANIFESTS[key]
+
+
+def clear_bucket_manifests() -> None:
+    """
+    Forget all bucket manifests. Buckets are listed again on the next lookup.
+    """
+    with _BUCKET_MANIFESTS_LOCK:
+        _BUCKET_MANIFESTS.clear()
 
 
 def get_file_uri(bucket: str, filename: str, credentials_file: str) -> Optional[str]:
@@ -52,10 +205,12 @@ def get_file_uri(bucket: str, filename: str, credentials_file: str) -> Optional[
     -------
     file_uri: Optional[str]
         The file uri if the file exists, otherwise returns None.
-    """
-    fs = initialize_gcs_file_system(credentials_file)
 
-    if fs.exists(f"{bucket}/{filename}"):
+    Notes
+    -----
+    The lookup is answered from the bucket's manifest (see get_bucket_manifest).
+    """
+    if get_bucket_manifest(bucket, credentials_file).exists(filename):
         return GCS_URI.format(bucket=bucket, filename=filename)
 
     return None
@@ -118,6 +273,7 @@ def upload_file(
         save_url = GCS_URI.format(bucket=bucket, filename=save_name)
         remote_uri = f"{bucket}/{save_name}"
         fs.put_file(resolved_filepath, remote_uri)
+        get_bucket_manifest(bucket, credentials_file).add(save_name)
 
         if remove_local:
             remove_local_file(resolved_filepath)
@@ -126,6 +282,119 @@ def upload_file(
         return save_url
 
 
+def _get_wav_header(
+    num_data_bytes: int, sample_rate: int, num_channels: int, sample_width: int
+) -> bytes:
+    block_align = num_channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + num_data_bytes,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,  # PCM
+        num_channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        sample_width * 8,
+        b"data",
+        num_data_bytes,
+    )
+
+
+def upload_wav_stream(
+    credentials_file: str,
+    bucket: str,
+    pcm_chunks: Iterable[bytes],
+    save_name: Union[str, Callable[[], str]],
+    sample_rate: int = 16000,
+    num_channels: int = 1,
+    sample_width: int = 2,
+) -> str:
+    """
+    Uploads a stream of raw PCM audio to a Google Cloud file store bucket as a WAV
+    file without storing it locally.
+
+    The audio is streamed to a temporary object. Once the length is known, a WAV
+    header is uploaded and composed with the audio into the final object on the
+    file store itself.
+
+    Parameters
+    ----------
+    credentials_file: str
+        The path to the Google Service Account credentials JSON file used
+        to initialize the file store connection.
+    bucket: str
+        The name of the file store bucket to upload to.
+    pcm_chunks: Iterable[bytes]
+        The raw, little endian, PCM audio data.
+    save_name: Union[str, Callable[[], str]]
+        The name to save the file as in the file store. Or, for names that depend on
+        the streamed content, a function that returns the name once every chunk is
+        uploaded.
+    sample_rate: int
+        The audio sample rate in Hz.
+        Default: 16000
+    num_channels: int
+        The number of audio channels.
+        Default: 1
+    sample_width: int
+        The number of bytes per sample.
+        Default: 2
+
+    Returns
+    -------
+    uri: str
+        The uri of the uploaded file in the file store.
+    """
+    fs = initialize_gcs_file_system(credentials_file)
+
+    # Try to get the file first
+    if isinstance(save_name, str):
+        uri = get_file_uri(bucket, save_name, credentials_file)
+        if uri:
+            return uri
+
+    partial_uri = f"{bucket}/{uuid4().hex}"
+    remote_data_uri = f"{partial_uri}.data"
+    remote_header_uri = f"{partial_uri}.header"
+    try:
+        num_data_bytes = 0
+        with fs.open(remote_data_uri, "wb") as open_resource:
+            for chunk in pcm_chunks:
+                open_resource.write(chunk)
+                num_data_bytes += len(chunk)
+
+        # The streamed content may already be stored
+        if not isinstance(save_name, str):
+            save_name = save_name()
+            uri = get_file_uri(bucket, save_name, credentials_file)
+            if uri:
+                return uri
+
+        remote_uri = f"{bucket}/{save_name}"
+        fs.pipe_file(
+            remote_header_uri,
+            _get_wav_header(
+                num_data_bytes=num_data_bytes,
+                sample_rate=sample_rate,
+                num_channels=num_channels,
+                sample_width=sample_width,
+            ),
+        )
+        fs.merge(remote_uri, [remote_header_uri, remote_data_uri])
+        get_bucket_manifest(bucket, credentials_file).add(save_name)
+    finally:
+        for remote_partial_uri in [remote_header_uri, remote_data_uri]:
+            if fs.exists(remote_partial_uri):
+                fs.rm(remote_partial_uri)
+
+    log.info(f"Uploaded audio stream to {remote_uri}")
+    return GCS_URI.format(bucket=bucket, filename=save_name)
+
+
 def remove_local_file(filepath: Union[str, Path]) -> None:
     """
     Deletes a file from the local file system.
@@ -2,23 +2,43 @@
 # -*- coding: utf-8 -*-
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime, timedelta
+from hashlib import sha256
 from importlib import import_module
 from operator import attrgetter
-from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 from fireo.fields.errors import FieldValidationFailed, InvalidFieldType, RequiredField
+from fireo.models import Model
 from fsspec.core import url_to_fs
-from gcsfs import GCSFileSystem
-from prefect import Flow, task
-from prefect.tasks.control_flow import case, merge
+from fsspec.implementations.local import LocalFileSystem
+from prefect import Flow, Task, task, unmapped
+from prefect.triggers import always_run
 
 from ..database import constants as db_constants
 from ..database import functions as db_functions
 from ..database import models as db_models
+from ..database import validators, write_cache
 from ..file_store import functions as fs_functions
 from ..sr_models import GoogleCloudSRModel, WebVTTSRModel
-from ..utils import constants_utils, file_utils
+from ..utils import client_registry, constants_utils, file_utils
+from ..utils.concurrency_utils import PipelineStage, stage_limit
+from ..utils.fingerprint_cache import FingerprintCache
+from ..utils.media_cache import get_media_cache
+from ..utils.phrase_budget import PhraseBudget
 from ..version import __version__
 from . import ingestion_models
 from .ingestion_models import EventIngestionModel, Session
@@ -31,6 +51,16 @@ log = logging.getLogger(__name__)
 
 ###############################################################################
 
+FINGERPRINT_CACHE_DIR = "fingerprint-cache"
+PREFLIGHT_MAX_WORKERS = 16
+
+###############################################################################
+
+
+class SessionAudio(NamedTuple):
+    session_content_hash: str
+    audio_uri: str
+
 
 class SessionProcessingResult(NamedTuple):
     session: Session
@@ -41,6 +71,116 @@ class SessionProcessingResult(NamedTuple):
     hover_thumbnail_uri: str
 
 
+class SessionPlan(NamedTuple):
+    session: Session
+    session_content_hash: Optional[str] = None
+    audio_uri: Optional[str] = None
+    transcript_uri: Optional[str] = None
+    static_thumbnail_uri: Optional[str] = None
+    hover_thumbnail_uri: Optional[str] = None
+    is_stored: Optional[bool] = None
+
+    @property
+    def is_processed(self) -> bool:
+        return None not in (
+            self.audio_uri,
+            self.transcript_uri,
+            self.static_thumbnail_uri,
+            self.hover_thumbnail_uri,
+        )
+
+
+class EventPlan(NamedTuple):
+    event: EventIngestionModel
+    sessions: List[SessionPlan]
+    is_stored: Optional[bool] = None
+
+    @property
+    def is_processed(self) -> bool:
+        return all(session_plan.is_processed for session_plan in self.sessions)
+
+    @property
+    def is_complete(self) -> bool:
+        return (
+            self.is_stored is True
+            and self.is_processed
+            and all(session_plan.is_stored is True for session_plan in self.sessions)
+        )
+
+
+class EventGatherPlan(NamedTuple):
+    events: List[EventPlan]
+    skip_stored_events: bool = False
+
+    @property
+    def events_to_process(self) -> List[EventPlan]:
+        if not self.skip_stored_events:
+            return self.events
+
+        return [event_plan for event_plan in self.events if not event_plan.is_complete]
+
+    def to_report(self) -> Dict[str, Any]:
+        """
+        Summarize the plan as a JSON serializable dictionary (i.e. for a dry run).
+
+        Returns
+        -------
+        report: Dict[str, Any]
+            The number of events and sessions found and the work planned for each.
+        """
+        events_to_process = self.events_to_process
+        session_plans = [
+            session_plan
+            for event_plan in events_to_process
+            for session_plan in event_plan.sessions
+        ]
+        return {
+            "events_found": len(self.events),
+            "events_skipped": len(self.events) - len(events_to_process),
+            "events_to_store": len(events_to_process),
+            "sessions_to_process": len(
+                [
+                    session_plan
+                    for session_plan in session_plans
+                    if not session_plan.is_processed
+                ]
+            ),
+            "sessions_to_reuse": len(
+                [
+                    session_plan
+                    for session_plan in session_plans
+                    if session_plan.is_processed
+                ]
+            ),
+            "events": [
+                {
+                    "external_source_id": event_plan.event.external_source_id,
+                    "body": event_plan.event.body.name,
+                    "is_stored": event_plan.is_stored,
+                    "skipped": self.skip_stored_events and event_plan.is_complete,
+                    "sessions": [
+                        {
+                            "external_source_id": (
+                                session_plan.session.external_source_id
+                            ),
+                            "video_uri": session_plan.session.video_uri,
+                            "caption_uri": session_plan.session.caption_uri,
+                            "session_content_hash": session_plan.session_content_hash,
+                            "audio_uri": session_plan.audio_uri,
+                            "transcript_uri": session_plan.transcript_uri,
+                            "static_thumbnail_uri": session_plan.static_thumbnail_uri,
+                            "hover_thumbnail_uri": session_plan.hover_thumbnail_uri,
+                            "is_stored": session_plan.is_stored,
+                            "is_processed": session_plan.is_processed,
+                        }
+                        for session_plan in event_plan.sessions
+                    ],
+                }
+                for event_plan in self.events
+            ],
+        }
+
+
 def import_get_events_func(func_path: str) -> Callable:
     path, func_name = str(func_path).rsplit(".", 1)
     mod = import_module(path)
@@ -48,16 +188,85 @@ def import_get_events_func(func_path: str) -> Callable:
     return getattr(mod, func_name)
 
 
-def create_event_gather_flow(
+def _plan_session_processing(
+    session: Session,
+    event: EventIngestionModel,
+    bucket: str,
+    credentials_file: str,
+) -> SessionPlan:
+    # Only remote videos are fingerprinted and only generated thumbnails are
+    # named by content hash, anything else is left for the processing tasks
+    if isinstance(
+        url_to_fs(session.video_uri)[0], LocalFileSystem
+    ) or not _needs_thumbnail_generation(event):
+        return SessionPlan(session=session)
+
+    fingerprint_cache = FingerprintCache(
+        storage_path=f"{bucket}/{FINGERPRINT_CACHE_DIR}",
+        fs=fs_functions.initialize_gcs_file_system(credentials_file),
+    )
+    session_content_hash = fingerprint_cache.get(session.video_uri)
+    if session_content_hash is None:
+        return SessionPlan(session=session)
+
+    # Find each artifact of a prior run of this session
+    artifact_uris = [
+        fs_functions.get_file_uri(
+            bucket=bucket,
+            filename=filename,
+            credentials_file=credentials_file,
+        )
+        for filename in [
+            f"{session_content_hash}-audio.wav",
+            (
+                f"{session_content_hash}-"
+                f"cdp_{__version__.replace('.', '_')}-"
+                f"transcript.json"
+            ),
+            f"{session_content_hash}-static-thumbnail.png",
+            f"{session_content_hash}-hover-thumbnail.gif",
+        ]
+    ]
+    return SessionPlan(session, session_content_hash, *artifact_uris)
+
+
+def _check_is_stored(
+    model: Type[Model],
+    external_source_id: Optional[str],
+    credentials_file: str,
+) -> Optional[bool]:
+    # Without an external source id there is nothing to look the document up by
+    if external_source_id is None:
+        return None
+
+    client_registry.connect_firestore(credentials_file)
+    return (
+        model.collection.filter("external_source_id", "==", external_source_id).get()
+        is not None
+    )
+
+
+def _get_planning_result(future: Any, description: str) -> Any:
+    # A check that fails only means the work will be done (again) by the flow
+    try:
+        return future.result()
+    except Exception as e:
+        log.warning(f"Pre-flight check failed for {description}: {e}")
+        return None
+
+
+def plan_event_gather(
     config: EventGatherPipelineConfig,
     from_dt: Optional[Union[str, datetime]] = None,
     to_dt: Optional[Union[str, datetime]] = None,
     prefetched_events: Optional[List[EventIngestionModel]] = None,
-    from_local: bool = False,
-) -> Flow:
+) -> EventGatherPlan:
     """
-    Provided a function to gather new event information, create the Prefect Flow object
-    to preview, run, or visualize.
+    Gather the events to process and find which of their sessions were already
+    processed (and which events and sessions were already stored) by a prior run.
+
+    All checks are run concurrently. Caption URIs that can't be found are removed
+    from their session, this will result in Speech-to-Text being used instead.
 
     Parameters
     ----------
@@ -71,11 +280,21 @@ def create_event_gather_flow(
         Optional ISO formatted string or datetime object to pass to the get_events
         function to act as the end point for event gathering.
         Default: None (now)
+    prefetched_events: Optional[List[EventIngestionModel]]
+        Events to plan instead of calling the get_events function.
+        Default: None (call the get_events function)
 
     Returns
     -------
-    flow: Flow
-        The constructed CDP Event Gather Pipeline as a Prefect Flow.
+    plan: EventGatherPlan
+        The plan for each event and session.
+
+    Notes
+    -----
+    Sessions are only found to be processed when their video is remote (and was
+    fingerprinted by a prior run) and the event does not provide thumbnails. Checks
+    against the file store and database are only run when
+    config.preflight_checks is True.
     """
     # Load get_events_func
     get_events_func = import_get_events_func(config.get_events_function_path)
@@ -98,109 +317,302 @@ def create_event_gather_flow(
     else:
         to_datetime = datetime.utcnow()
 
-    # Create flow
-    with Flow("CDP Event Gather Pipeline") as flow:
-        log.info(
-            f"Gathering events to process. "
-            f"({from_datetime.isoformat()} - {to_datetime.isoformat()})"
-        )
+    log.info(
+        f"Gathering events to process. "
+        f"({from_datetime.isoformat()} - {to_datetime.isoformat()})"
+    )
 
-        # Use prefetched events instead of get_events_func if provided
-        if prefetched_events is not None:
-            events = prefetched_events
+    # Use prefetched events instead of get_events_func if provided
+    if prefetched_events is not None:
+        events = prefetched_events
 
-        else:
-            events = get_events_func(
-                from_dt=from_datetime,
-                to_dt=to_datetime,
-            )
+    else:
+        events = get_events_func(
+            from_dt=from_datetime,
+            to_dt=to_datetime,
+        )
 
-        # Safety measure catch
-        if events is None:
-            events = []
-        log.info(f"Processing {len(events)} events.")
+    # Safety measure catch
+    if events is None:
+        events = []
+
+    with ThreadPoolExecutor(max_workers=PREFLIGHT_MAX_WORKERS) as executor:
+        # Remove caption URIs that can't be found
+        caption_checks = [
+            executor.submit(validate_session_caption_uri.run, session)
+            for event in events
+            for session in event.sessions
+            if session.caption_uri is not None
+        ]
+
+        # Find prior processing results and stored documents
+        session_plan_futures: Dict[int, Any] = {}
+        session_is_stored_futures: Dict[int, Any] = {}
+        event_is_stored_futures: Dict[int, Any] = {}
+        if config.preflight_checks:
+            for event in events:
+                event_is_stored_futures[id(event)] = executor.submit(
+                    _check_is_stored,
+                    db_models.Event,
+                    event.external_source_id,
+                    config.google_credentials_file,
+                )
+                for session in event.sessions:
+                    session_plan_futures[id(session)] = executor.submit(
+                        _plan_session_processing,
+                        session=session,
+                        event=event,
+                        bucket=config.validated_gcs_bucket_name,
+                        credentials_file=config.google_credentials_file,
+                    )
+                    session_is_stored_futures[id(session)] = executor.submit(
+                        _check_is_stored,
+                        db_models.Session,
+                        session.external_source_id,
+                        config.google_credentials_file,
+                    )
+
+        # Caption checks raise the same as they would in the flow
+        for caption_check in caption_checks:
+            caption_check.result()
 
+        event_plans = []
         for event in events:
-            session_processing_results: List[SessionProcessingResult] = []
+            session_plans = []
             for session in event.sessions:
-                # Get or create audio
-                session_content_hash, audio_uri = get_video_and_split_audio(
-                    video_uri=session.video_uri,
-                    bucket=config.validated_gcs_bucket_name,
-                    credentials_file=config.google_credentials_file,
-                )
-
-                # Check caption uri
-                if session.caption_uri is not None:
-                    fs, caption_path = url_to_fs(session.caption_uri)
-
-                    # If the caption doesn't exist, remove the property
-                    # This will result in Speech-to-Text being used instead
-                    if not fs.exists(caption_path):
-                        log.warning(
-                            f"File not found using provided caption URI: "
-                            f"'{session.caption_uri}'. "
-                            f"Removing the referenced caption URI and will process "
-                            f"the session using Speech-to-Text."
-                        )
-                        session.caption_uri = None
+                session_plan: Optional[SessionPlan] = None
+                is_stored: Optional[bool] = None
+                if config.preflight_checks:
+                    description = f"session '{session.video_uri}'"
+                    session_plan = _get_planning_result(
+                        session_plan_futures[id(session)], description
+                    )
+                    is_stored = _get_planning_result(
+                        session_is_stored_futures[id(session)], description
+                    )
+                if session_plan is None:
+                    session_plan = SessionPlan(session=session)
 
-                # Generate transcript
-                transcript_uri, transcript = generate_transcript(
-                    session_content_hash=session_content_hash,
-                    audio_uri=audio_uri,
-                    session=session,
-                    event=event,
-                    bucket=config.validated_gcs_bucket_name,
-                    credentials_file=config.google_credentials_file,
-                    caption_new_speaker_turn_pattern=(
-                        config.caption_new_speaker_turn_pattern
-                    ),
-                    caption_confidence=config.caption_confidence,
+                # The caption check may have changed the session after planning
+                session_plans.append(
+                    session_plan._replace(session=session, is_stored=is_stored)
                 )
 
-                # Generate thumbnails
-                (
-                    static_thumbnail_uri,
-                    hover_thumbnail_uri,
-                ) = get_video_and_generate_thumbnails(
-                    session_content_hash=session_content_hash,
-                    video_uri=session.video_uri,
+            event_is_stored: Optional[bool] = None
+            if config.preflight_checks:
+                event_is_stored = _get_planning_result(
+                    event_is_stored_futures[id(event)],
+                    f"event '{event.external_source_id}'",
+                )
+            event_plans.append(
+                EventPlan(
                     event=event,
-                    bucket=config.validated_gcs_bucket_name,
-                    credentials_file=config.google_credentials_file,
+                    sessions=session_plans,
+                    is_stored=event_is_stored,
                 )
+            )
 
-                # Store all processed and provided data
-                session_processing_results.append(
-                    compile_session_processing_result(  # type: ignore
-                        session=session,
-                        audio_uri=audio_uri,
-                        transcript=transcript,
-                        transcript_uri=transcript_uri,
-                        static_thumbnail_uri=static_thumbnail_uri,
-                        hover_thumbnail_uri=hover_thumbnail_uri,
-                    )
-                )
+    plan = EventGatherPlan(
+        events=event_plans,
+        skip_stored_events=config.skip_stored_events,
+    )
+    report = plan.to_report()
+    log.info(
+        f"Planned {report['events_to_store']} of {report['events_found']} events "
+        f"with {report['sessions_to_process']} sessions to process and "
+        f"{report['sessions_to_reuse']} sessions to reuse."
+    )
+
+    return plan
+
+
+def create_event_gather_flow(
+    config: EventGatherPipelineConfig,
+    from_dt: Optional[Union[str, datetime]] = None,
+    to_dt: Optional[Union[str, datetime]] = None,
+    prefetched_events: Optional[List[EventIngestionModel]] = None,
+    from_local: bool = False,
+) -> Flow:
+    """
+    Provided a function to gather new event information, create the Prefect Flow object
+    to preview, run, or visualize.
+
+    The events are planned (see plan_event_gather) before the flow is created so
+    that the flow only includes the work that is missing.
+
+    Parameters
+    ----------
+    config: EventGatherPipelineConfig
+        Configuration options for the pipeline.
+    from_dt: Optional[Union[str, datetime]]
+        Optional ISO formatted string or datetime object to pass to the get_events
+        function to act as the start point for event gathering.
+        Default: None (two days ago)
+    to_dt: Optional[Union[str, datetime]]
+        Optional ISO formatted string or datetime object to pass to the get_events
+        function to act as the end point for event gathering.
+        Default: None (now)
+
+    Returns
+    -------
+    flow: Flow
+        The constructed CDP Event Gather Pipeline as a Prefect Flow.
+    """
+    plan = plan_event_gather(
+        config=config,
+        from_dt=from_dt,
+        to_dt=to_dt,
+        prefetched_events=prefetched_events,
+    )
+    event_plans = plan.events_to_process
 
-            # Process all metadata and store event
-            store_event_processing_results(
-                event=event,
-                session_processing_results=session_processing_results,
-                credentials_file=config.google_credentials_file,
-                bucket=config.validated_gcs_bucket_name,
-                from_local=from_local,
+    # Create flow
+    with Flow("CDP Event Gather Pipeline") as flow:
+        events = [event_plan.event for event_plan in event_plans]
+        log.info(f"Processing {len(events)} events.")
+
+        # Every stage is a single task mapped over all sessions (or events) so that
+        # the size of the flow does not grow with the number of events
+        session_plans = [
+            session_plan
+            for event_plan in event_plans
+            for session_plan in event_plan.sessions
+        ]
+
+        # Sessions processed by a prior run only need their transcript loaded
+        processed_session_indices = [
+            i
+            for i, session_plan in enumerate(session_plans)
+            if session_plan.is_processed
+        ]
+        processed_session_processing_results: Any = []
+        if len(processed_session_indices) > 0:
+            processed_session_processing_results = load_processed_session.map(
+                session_plan=[session_plans[i] for i in processed_session_indices],
+                credentials_file=unmapped(config.google_credentials_file),
+            )
+
+        # All other sessions go through every processing stage
+        sessions = [
+            session_plan.session
+            for session_plan in session_plans
+            if not session_plan.is_processed
+        ]
+        session_events = [
+            event_plan.event
+            for event_plan in event_plans
+            for session_plan in event_plan.sessions
+            if not session_plan.is_processed
+        ]
+        session_processing_results: Any = []
+        if len(sessions) > 0:
+            # Get or create audio (and thumbnails when not provided)
+            sessions_audio = split_session_audio.map(
+                event=session_events,
+                session=sessions,
+                bucket=unmapped(config.validated_gcs_bucket_name),
+                credentials_file=unmapped(config.google_credentials_file),
+                stream_audio_only_sessions=unmapped(config.stream_audio_only_sessions),
+                stage_limits=unmapped(config.stage_concurrency_limits),
+                media_cache_dir=unmapped(config.media_cache_dir),
+                media_cache_max_bytes=unmapped(config.media_cache_max_bytes),
+            )
+
+            # Generate transcripts
+            sessions_transcript = generate_session_transcript.map(
+                session_audio=sessions_audio,
+                event=session_events,
+                session=sessions,
+                bucket=unmapped(config.validated_gcs_bucket_name),
+                credentials_file=unmapped(config.google_credentials_file),
+                caption_new_speaker_turn_pattern=unmapped(
+                    config.caption_new_speaker_turn_pattern
+                ),
+                caption_confidence=unmapped(config.caption_confidence),
+                stage_limits=unmapped(config.stage_concurrency_limits),
             )
 
+            # Generate thumbnails
+            sessions_thumbnails = generate_session_thumbnails.map(
+                session_audio=sessions_audio,
+                event=session_events,
+                session=sessions,
+                bucket=unmapped(config.validated_gcs_bucket_name),
+                credentials_file=unmapped(config.google_credentials_file),
+                stage_limits=unmapped(config.stage_concurrency_limits),
+                media_cache_dir=unmapped(config.media_cache_dir),
+                media_cache_max_bytes=unmapped(config.media_cache_max_bytes),
+            )
+
+            # Store all processed and provided data
+            session_processing_results = compile_session_processing_result.map(
+                session=sessions,
+                session_audio=sessions_audio,
+                session_transcript=sessions_transcript,
+                session_thumbnails=sessions_thumbnails,
+            )
+
+        # Store each unique body, person, seat, and role of all events once
+        ingested_entities = store_event_entities(
+            events=events,
+            credentials_file=config.google_credentials_file,
+            bucket=config.validated_gcs_bucket_name,
+            stage_limits=config.stage_concurrency_limits,
+            write_cache_path=config.database_write_cache_path,
+        )
+
+        # Process all metadata and store events
+        # Events with a session that failed processing are not stored
+        (
+            processed_events,
+            grouped_session_processing_results,
+        ) = group_session_processing_results(
+            events=events,
+            session_processing_results=session_processing_results,
+            processed_session_processing_results=processed_session_processing_results,
+            processed_session_indices=processed_session_indices,
+        )
+        store_event_processing_results.map(
+            event=processed_events,
+            session_processing_results=grouped_session_processing_results,
+            credentials_file=unmapped(config.google_credentials_file),
+            bucket=unmapped(config.validated_gcs_bucket_name),
+            from_local=unmapped(from_local),
+            stage_limits=unmapped(config.stage_concurrency_limits),
+            ingested_entities=unmapped(ingested_entities),
+            write_cache_path=unmapped(config.database_write_cache_path),
+        )
+
+    # Failed sessions only keep their own event from being stored
+    # but the flow run is still reported as failed
+    flow.set_reference_tasks(
+        flow.terminal_tasks()
+        | {
+            session_results_task
+            for session_results_task in [
+                session_processing_results,
+                processed_session_processing_results,
+            ]
+            if isinstance(session_results_task, Task)
+        }
+    )
+
     return flow
 
 
 @task(nout=2, max_retries=3, retry_delay=timedelta(seconds=60))
 def get_video_and_split_audio(
-    video_uri: str, bucket: str, credentials_file: str
-) -> Tuple[str, str]:
+    video_uri: str,
+    bucket: str,
+    credentials_file: str,
+    generate_thumbnails: bool = False,
+    stream_audio: bool = False,
+    stage_limits: Optional[Dict[str, int]] = None,
+    media_cache_dir: Optional[str] = None,
+    media_cache_max_bytes: Optional[int] = None,
+) -> SessionAudio:
     """
-    Download (or copy) a video file to temp storage, split's the audio, and uploads
+    Download (or reuse a cached copy of) a video file, split's the audio, and uploads
     the audio to Google storage.
 
     Parameters
@@ -211,6 +623,25 @@ def get_video_and_split_audio(
         The name of the GCS bucket to upload the produced audio to.
     credentials_file: str
         Path to Google Service Account Credentials JSON file.
+    generate_thumbnails: bool
+        Whether to also generate and upload the session thumbnails in the same ffmpeg
+        run as the audio split. The uploaded thumbnails are found (by content hash)
+        and reused by get_video_and_generate_thumbnails.
+        Default: False
+    stream_audio: bool
+        For remote videos, pipe the video into ffmpeg (hashing it on the way) and
+        stream the audio to the bucket rather than downloading the video. Only useful
+        when the video is not needed for anything else (i.e. thumbnail generation).
+        Default: False
+    stage_limits: Optional[Dict[str, int]]
+        Overrides for the maximum number of concurrent downloads and ffmpeg runs.
+        Default: None (use concurrency_utils.DEFAULT_STAGE_LIMITS)
+    media_cache_dir: Optional[str]
+        The directory to cache downloaded videos in.
+        Default: None (see media_cache.get_media_cache)
+    media_cache_max_bytes: Optional[int]
+        The disk quota for the cached videos.
+        Default: None (see media_cache.get_media_cache)
 
     Returns
     -------
@@ -224,69 +655,223 @@ def get_video_and_split_audio(
     We sometimes get file downloading failures when running in parallel so this has two
     retries attached to it that will run after a failure on a 3 minute delay.
     """
-    # Get just the video filename from the full uri
-    # TODO: Handle windows file splitting???
-    # Generally this is a URI but we do have a goal of a local file processing too...
-    video_filename = video_uri.split("/")[-1]
-    tmp_video_filepath = file_utils.resource_copy(
-        uri=video_uri,
-        dst=f"audio-splitting-{video_filename}",
-        overwrite=True,
-    )
+    # Remote videos that were already processed in a prior run can be matched to
+    # their content hash (and existing audio) with only a metadata request
+    fingerprint_cache: Optional[FingerprintCache] = None
+    if not isinstance(url_to_fs(video_uri)[0], LocalFileSystem):
+        fingerprint_cache = FingerprintCache(
+            storage_path=f"{bucket}/{FINGERPRINT_CACHE_DIR}",
+            fs=fs_functions.initialize_gcs_file_system(credentials_file),
+        )
+        session_content_hash = fingerprint_cache.get(video_uri)
+        if session_content_hash is not None:
+            audio_uri = fs_functions.get_file_uri(
+                bucket=bucket,
+                filename=f"{session_content_hash}-audio.wav",
+                credentials_file=credentials_file,
+            )
+            if audio_uri is not None:
+                log.info(f"Skipping video download, audio already exists: {video_uri}")
+                return SessionAudio(session_content_hash, audio_uri)
+
+        # When only the audio is needed, the remote video is piped into ffmpeg
+        # and the audio is streamed to the bucket, nothing is stored on disk
+        # The video is hashed as it is read so that it is only read once
+        if stream_audio:
+            video_hasher = sha256()
+            with stage_limit(PipelineStage.FFMPEG, stage_limits):
+                audio_uri = fs_functions.upload_wav_stream(
+                    credentials_file=credentials_file,
+                    bucket=bucket,
+                    pcm_chunks=file_utils.stream_audio(
+                        video_uri, on_video_chunk=video_hasher.update
+                    ),
+                    save_name=lambda: f"{video_hasher.hexdigest()}-audio.wav",
+                )
 
-    # Hash the video contents
-    session_content_hash = file_utils.hash_file_contents(uri=tmp_video_filepath)
+            session_content_hash = video_hasher.hexdigest()
+            fingerprint_cache.put(video_uri, session_content_hash)
+            return SessionAudio(session_content_hash, audio_uri)
 
-    # Check for existing audio
-    tmp_audio_filepath = f"{session_content_hash}-audio.wav"
-    audio_uri = fs_functions.get_file_uri(
-        bucket=bucket,
-        filename=tmp_audio_filepath,
-        credentials_file=credentials_file,
-    )
+    # Get the video from the shared media cache so that it is only downloaded once
+    # for both audio splitting and thumbnail generation
+    media_cache = get_media_cache(media_cache_dir, media_cache_max_bytes)
+    with ExitStack() as video_stack:
+        with stage_limit(PipelineStage.DOWNLOAD, stage_limits):
+            tmp_video_filepath = video_stack.enter_context(media_cache.open(video_uri))
 
-    # If no pre-existing audio, split
-    if audio_uri is None:
-        # Split and store the audio in temporary file prior to upload
-        (
-            tmp_audio_filepath,
-            tmp_audio_log_out_filepath,
-            tmp_audio_log_err_filepath,
-        ) = file_utils.split_audio(
-            video_read_path=tmp_video_filepath,
-            audio_save_path=tmp_audio_filepath,
-            overwrite=True,
-        )
+        # Hash the video contents (computed during download for remote videos)
+        session_content_hash = media_cache.get_content_hash(video_uri)
 
-        # Store audio and logs
-        audio_uri = fs_functions.upload_file(
-            credentials_file=credentials_file,
+        # Check for existing audio
+        tmp_audio_filepath = f"{session_content_hash}-audio.wav"
+        audio_uri = fs_functions.get_file_uri(
             bucket=bucket,
-            filepath=tmp_audio_filepath,
-        )
-        fs_functions.upload_file(
-            credentials_file=credentials_file,
-            bucket=bucket,
-            filepath=tmp_audio_log_out_filepath,
-        )
-        fs_functions.upload_file(
+            filename=tmp_audio_filepath,
             credentials_file=credentials_file,
-            bucket=bucket,
-            filepath=tmp_audio_log_err_filepath,
         )
 
-        # Remove tmp files after their final dependent tasks are finished
-        for local_path in [
-            tmp_audio_filepath,
-            tmp_audio_log_out_filepath,
-            tmp_audio_log_err_filepath,
-        ]:
-            fs_functions.remove_local_file(local_path)
+        # If no pre-existing audio, split
+        if audio_uri is None:
+            # Split and store the audio in temporary file prior to upload
+            if generate_thumbnails:
+                with stage_limit(PipelineStage.FFMPEG, stage_limits):
+                    derived_media = file_utils.derive_media(
+                        video_read_path=tmp_video_filepath,
+                        audio_save_path=tmp_audio_filepath,
+                        session_content_hash=session_content_hash,
+                        overwrite=True,
+                    )
+                tmp_audio_filepath = derived_media.audio_path
+                tmp_audio_log_out_filepath = derived_media.ffmpeg_stdout_path
+                tmp_audio_log_err_filepath = derived_media.ffmpeg_stderr_path
+
+                # Store thumbnails for the thumbnail generation task to reuse
+                for tmp_thumbnail_filepath in [
+                    derived_media.static_thumbnail_path,
+                    derived_media.hover_thumbnail_path,
+                ]:
+                    fs_functions.upload_file(
+                        credentials_file=credentials_file,
+                        bucket=bucket,
+                        filepath=tmp_thumbnail_filepath,
+                        remove_local=True,
+                    )
+            else:
+                with stage_limit(PipelineStage.FFMPEG, stage_limits):
+                    (
+                        tmp_audio_filepath,
+                        tmp_audio_log_out_filepath,
+                        tmp_audio_log_err_filepath,
+                    ) = file_utils.split_audio(
+                        video_read_path=tmp_video_filepath,
+                        audio_save_path=tmp_audio_filepath,
+                        overwrite=True,
+                    )
+
+            # Store audio and logs
+            audio_uri = fs_functions.upload_file(
+                credentials_file=credentials_file,
+                bucket=bucket,
+                filepath=tmp_audio_filepath,
+            )
+            fs_functions.upload_file(
+                credentials_file=credentials_file,
+                bucket=bucket,
+                filepath=tmp_audio_log_out_filepath,
+            )
+            fs_functions.upload_file(
+                credentials_file=credentials_file,
+                bucket=bucket,
+                filepath=tmp_audio_log_err_filepath,
+            )
+
+            # Remove tmp files after their final dependent tasks are finished
+            for local_path in [
+                tmp_audio_filepath,
+                tmp_audio_log_out_filepath,
+                tmp_audio_log_err_filepath,
+            ]:
+                fs_functions.remove_local_file(local_path)
+
+    if fingerprint_cache is not None:
+        fingerprint_cache.put(video_uri, session_content_hash)
+
+    return SessionAudio(session_content_hash, audio_uri)
+
+
+def _needs_thumbnail_generation(event: EventIngestionModel) -> bool:
+    return event.static_thumbnail_uri is None or event.hover_thumbnail_uri is None
+
+
+@task
+def validate_session_caption_uri(session: Session) -> Session:
+    """
+    Remove the caption URI from a session if the caption file can't be found.
+    This will result in Speech-to-Text being used instead.
+
+    Parameters
+    ----------
+    session: Session
+        The session to validate.
+
+    Returns
+    -------
+    session: Session
+        The session with a caption URI that exists (or no caption URI).
+    """
+    if session.caption_uri is not None:
+        fs, caption_path = url_to_fs(session.caption_uri)
+
+        # If the caption doesn't exist, remove the property
+        if not fs.exists(caption_path):
+            log.warning(
+                f"File not found using provided caption URI: "
+                f"'{session.caption_uri}'. "
+                f"Removing the referenced caption URI and will process "
+                f"the session using Speech-to-Text."
+            )
+            session.caption_uri = None
+
+    return session
 
-    # Always remove tmp video file
-    fs_functions.remove_local_file(tmp_video_filepath)
 
-    return session_content_hash, audio_uri
+@task(max_retries=3, retry_delay=timedelta(seconds=60))
+def split_session_audio(
+    event: EventIngestionModel,
+    session: Session,
+    bucket: str,
+    credentials_file: str,
+    stream_audio_only_sessions: bool = False,
+    stage_limits: Optional[Dict[str, int]] = None,
+    media_cache_dir: Optional[str] = None,
+    media_cache_max_bytes: Optional[int] = None,
+) -> SessionAudio:
+    """
+    Mappable version of get_video_and_split_audio for a single event session.
+
+    The session thumbnails are produced in the same ffmpeg run when the event does
+    not provide them, otherwise the audio may be streamed from the video URI.
+
+    Parameters
+    ----------
+    event: EventIngestionModel
+        The parent event of the session.
+    session: Session
+        The session to get or create the audio for.
+    bucket: str
+        The name of the GCS bucket to upload the produced audio to.
+    credentials_file: str
+        Path to Google Service Account Credentials JSON file.
+    stream_audio_only_sessions: bool
+        See EventGatherPipelineConfig.stream_audio_only_sessions.
+        Default: False
+    stage_limits: Optional[Dict[str, int]]
+        Overrides for the maximum number of concurrent downloads and ffmpeg runs.
+        Default: None (use concurrency_utils.DEFAULT_STAGE_LIMITS)
+    media_cache_dir: Optional[str]
+        The directory to cache downloaded videos in.
+        Default: None (see media_cache.get_media_cache)
+    media_cache_max_bytes: Optional[int]
+        The disk quota for the cached videos.
+        Default: None (see media_cache.get_media_cache)
+
+    Returns
+    -------
+    session_audio: SessionAudio
+        The session content hash and the URI to the uploaded audio file.
+    """
+    generate_thumbnails = _needs_thumbnail_generation(event)
+    return get_video_and_split_audio.run(
+        video_uri=session.video_uri,
+        bucket=bucket,
+        credentials_file=credentials_file,
+        generate_thumbnails=generate_thumbnails,
+        stream_audio=stream_audio_only_sessions and not generate_thumbnails,
+        stage_limits=stage_limits,
+        media_cache_dir=media_cache_dir,
+        media_cache_max_bytes=media_cache_max_bytes,
+    )
 
 
 @task
@@ -317,101 +902,52 @@ def construct_speech_to_text_phrases_context(event: EventIngestionModel) -> List
     5. councilmember role titles
     """
     # Note: Google Speech-to-Text allows max 500 phrases
-    phrases: Set[str] = set()
-
-    PHRASE_LIMIT = 500
-    CUM_CHAR_LIMIT = 9900
-
-    # In line def for get character count
-    # Google Speech-to-Text allows cumulative max 9900 characters
-    def _get_total_char_count(phrases: Set[str]) -> int:
-        chars = 0
-        for phrase in phrases:
-            chars += len(phrase)
-
-        return chars
-
-    def _get_if_added_sum(phrases: Set[str], next_addition: str) -> int:
-        current_len = _get_total_char_count(phrases)
-        return current_len + len(next_addition)
-
-    def _within_limit(phrases: Set[str]) -> bool:
-        return (
-            _get_total_char_count(phrases) < CUM_CHAR_LIMIT
-            and len(phrases) < PHRASE_LIMIT
-        )
+    # and cumulative max 9900 characters (keeping a margin from the hard limit)
+    budget = PhraseBudget(max_phrases=500, max_total_chars=9900)
 
     # Get body name
-    if _within_limit(phrases):
-        if _get_if_added_sum(phrases, event.body.name) < CUM_CHAR_LIMIT:
-            phrases.add(event.body.name)
+    budget.add(event.body.name)
 
     # Extras from event minutes items
     if event.event_minutes_items is not None:
+        event_minutes_items = event.event_minutes_items
+
         # Get minutes item name
-        for event_minutes_item in event.event_minutes_items:
-            if _within_limit(phrases):
-                if (
-                    _get_if_added_sum(phrases, event_minutes_item.minutes_item.name)
-                    < CUM_CHAR_LIMIT
-                ):
-                    phrases.add(event_minutes_item.minutes_item.name)
+        budget.extend(
+            event_minutes_item.minutes_item.name
+            for event_minutes_item in event_minutes_items
+        )
 
-        # Get councilmember names from sponsors and votes
-        for event_minutes_item in event.event_minutes_items:
+        # Gather councilmember names and role titles from sponsors and votes
+        person_names: List[str] = []
+        role_titles: List[str] = []
+        for event_minutes_item in event_minutes_items:
             if event_minutes_item.matter is not None:
                 if event_minutes_item.matter.sponsors is not None:
                     for sponsor in event_minutes_item.matter.sponsors:
-                        if _within_limit(phrases):
-                            if (
-                                _get_if_added_sum(phrases, sponsor.name)
-                                < CUM_CHAR_LIMIT
-                            ):
-                                phrases.add(sponsor.name)
+                        person_names.append(sponsor.name)
+                        if sponsor.seat is not None and sponsor.seat.roles is not None:
+                            role_titles += [role.title for role in sponsor.seat.roles]
             if event_minutes_item.votes is not None:
                 for vote in event_minutes_item.votes:
-                    if _within_limit(phrases):
-                        if (
-                            _get_if_added_sum(phrases, vote.person.name)
-                            < CUM_CHAR_LIMIT
-                        ):
-                            phrases.add(vote.person.name)
+                    person_names.append(vote.person.name)
+                    if vote.person.roles is not None:
+                        role_titles += [role.title for role in vote.person.roles]
+
+        # Get councilmember names
+        budget.extend(person_names)
 
         # Get matter titles
-        for event_minutes_item in event.event_minutes_items:
-            if event_minutes_item.matter is not None:
-                if _within_limit(phrases):
-                    if (
-                        _get_if_added_sum(phrases, event_minutes_item.matter.title)
-                        < CUM_CHAR_LIMIT
-                    ):
-                        phrases.add(event_minutes_item.matter.title)
-
-        # Get councilmember role titles from sponsors and votes
-        for event_minutes_item in event.event_minutes_items:
-            if event_minutes_item.matter is not None:
-                if event_minutes_item.matter.sponsors is not None:
-                    for sponsor in event_minutes_item.matter.sponsors:
-                        if sponsor.seat is not None:
-                            if sponsor.seat.roles is not None:
-                                for role in sponsor.seat.roles:
-                                    if (
-                                        _get_if_added_sum(phrases, role.title)
-                                        < CUM_CHAR_LIMIT
-                                    ):
-                                        phrases.add(role.title)
-            if event_minutes_item.votes is not None:
-                for vote in event_minutes_item.votes:
-                    if vote.person.roles is not None:
-                        for role in vote.person.roles:
-                            if _within_limit(phrases):
-                                if (
-                                    _get_if_added_sum(phrases, role.title)
-                                    < CUM_CHAR_LIMIT
-                                ):
-                                    phrases.add(role.title)
+        budget.extend(
+            event_minutes_item.matter.title
+            for event_minutes_item in event_minutes_items
+            if event_minutes_item.matter is not None
+        )
+
+        # Get councilmember role titles
+        budget.extend(role_titles)
 
-    return list(phrases)
+    return budget.phrases
 
 
 @task
@@ -592,7 +1128,7 @@ def check_for_existing_transcript(
 
     # Load transcript if exists
     if transcript_exists:
-        fs = GCSFileSystem(token=credentials_file)
+        fs = fs_functions.initialize_gcs_file_system(credentials_file)
         with fs.open(transcript_uri, "r") as open_resource:
             transcript = Transcript.from_json(open_resource.read())  # type: ignore
     else:
@@ -601,42 +1137,43 @@ def check_for_existing_transcript(
     return (tmp_transcript_filepath, transcript_uri, transcript, transcript_exists)
 
 
-def generate_transcript(
-    session_content_hash: str,
-    audio_uri: str,
-    session: Session,
+@task(max_retries=3, retry_delay=timedelta(seconds=60))
+def generate_session_transcript(
+    session_audio: SessionAudio,
     event: EventIngestionModel,
+    session: Session,
     bucket: str,
     credentials_file: str,
     caption_new_speaker_turn_pattern: Optional[str] = None,
     caption_confidence: Optional[float] = None,
+    stage_limits: Optional[Dict[str, int]] = None,
 ) -> Tuple[str, Transcript]:
     """
-    Route transcript generation to the correct processing.
+    Route transcript generation for a single event session to the correct
+    processing, or load the transcript generated by a previous run.
 
     Parameters
     ----------
-    session_content_hash: str
-        The unique key (SHA256 hash of video content) for this session processing.
-    audio_uri: str
-        The URI to the audio file to generate a transcript from.
-    session: Session
-        The specific session details to be used in final transcript upload and
-        archival.
-        Additionally, if a closed caption URI is available on the session object,
-        the transcript produced from this function will have been created using WebVTT
-        caption transform rather than Google Speech-to-Text.
+    session_audio: SessionAudio
+        The session content hash and the URI to the audio file to generate a
+        transcript from.
     event: EventIngestionModel
         The parent event of the session. If no captions are available,
         speech context phrases will be pulled from the whole event details.
+    session: Session
+        The specific session details to be used in final transcript upload and
+        archival.
     bucket: str
-        The name of the GCS bucket to upload the produced audio to.
+        The name of the GCS bucket to upload the produced transcript to.
     credentials_file: str
         Path to Google Service Account Credentials JSON file.
     caption_new_speaker_turn_pattern: Optional[str]
         Passthrough to sr_models.webvtt_sr_model.WebVTTSRModel.
     caption_confidence: Optional[float]
         Passthrough to sr_models.webvtt_sr_model.WebVTTSRModel.
+    stage_limits: Optional[Dict[str, int]]
+        Overrides for the maximum number of concurrent Speech-to-Text requests.
+        Default: None (use concurrency_utils.DEFAULT_STAGE_LIMITS)
 
     Returns
     -------
@@ -645,68 +1182,45 @@ def generate_transcript(
     transcript: Transcript
         The in-memory Transcript object.
     """
-    # Get unique transcript name from parameters and current lib version
     (
         tmp_transcript_filepath,
         transcript_uri,
         transcript,
         transcript_exists,
-    ) = check_for_existing_transcript(
-        session_content_hash=session_content_hash,
+    ) = check_for_existing_transcript.run(
+        session_content_hash=session_audio.session_content_hash,
         bucket=bucket,
         credentials_file=credentials_file,
     )
-
-    # If no pre-existing transcript with the same parameters, generate
-    with case(transcript_exists, False):
-        # If no captions, generate transcript with Google Speech-to-Text
-        if session.caption_uri is None:
-            phrases = construct_speech_to_text_phrases_context(event=event)
-            generated_transcript = use_speech_to_text_and_generate_transcript(
-                audio_uri=audio_uri,
+    if transcript_exists:
+        return transcript_uri, transcript
+
+    # If no captions, generate transcript with Google Speech-to-Text
+    if session.caption_uri is None:
+        phrases = construct_speech_to_text_phrases_context.run(event=event)
+        with stage_limit(PipelineStage.SPEECH_TO_TEXT, stage_limits):
+            generated_transcript = use_speech_to_text_and_generate_transcript.run(
+                audio_uri=session_audio.audio_uri,
                 credentials_file=credentials_file,
                 phrases=phrases,
             )
 
-        # Process captions
-        else:
-            generated_transcript = get_captions_and_generate_transcript(
-                caption_uri=session.caption_uri,
-                new_turn_pattern=caption_new_speaker_turn_pattern,
-                confidence=caption_confidence,
-            )
-
-        # Add extra metadata and upload
-        (
-            generated_transcript_uri,
-            generated_transcript,
-        ) = finalize_and_archive_transcript(
-            transcript=generated_transcript,
-            transcript_save_path=tmp_transcript_filepath,
-            bucket=bucket,
-            credentials_file=credentials_file,
-            session=session,
+    # Process captions
+    else:
+        generated_transcript = get_captions_and_generate_transcript.run(
+            caption_uri=session.caption_uri,
+            new_turn_pattern=caption_new_speaker_turn_pattern,
+            confidence=caption_confidence,
         )
 
-    # Existing transcript
-    with case(transcript_exists, True):
-        found_transcript_uri = transcript_uri
-        found_transcript = transcript
-
-    # Merge the two paths and results
-    # Set the names of the merge for visualization and testing purposes
-    result_transcript_uri = merge(
-        generated_transcript_uri,
-        found_transcript_uri,
-    )
-    result_transcript_uri.name = "merge_transcript_uri"
-    result_transcript = merge(
-        generated_transcript,
-        found_transcript,
+    # Add extra metadata and upload
+    return finalize_and_archive_transcript.run(
+        transcript=generated_transcript,
+        transcript_save_path=tmp_transcript_filepath,
+        bucket=bucket,
+        credentials_file=credentials_file,
+        session=session,
     )
-    result_transcript.name = "merge_in_memory_transcript"
-
-    return (result_transcript_uri, result_transcript)  # type: ignore
 
 
 @task(nout=2)
@@ -716,6 +1230,9 @@ def get_video_and_generate_thumbnails(
     event: EventIngestionModel,
     bucket: str,
     credentials_file: str,
+    stage_limits: Optional[Dict[str, int]] = None,
+    media_cache_dir: Optional[str] = None,
+    media_cache_max_bytes: Optional[int] = None,
 ) -> Tuple[str, str]:
     """
     Creates static and hover thumbnails.
@@ -733,6 +1250,15 @@ def get_video_and_generate_thumbnails(
         The name of the GCS bucket to upload the produced audio to.
     credentials_file: str
         Path to Google Service Account Credentials JSON file.
+    stage_limits: Optional[Dict[str, int]]
+        Overrides for the maximum number of concurrent downloads and ffmpeg runs.
+        Default: None (use concurrency_utils.DEFAULT_STAGE_LIMITS)
+    media_cache_dir: Optional[str]
+        The directory to cache downloaded videos in.
+        Default: None (see media_cache.get_media_cache)
+    media_cache_max_bytes: Optional[int]
+        The disk quota for the cached videos.
+        Default: None (see media_cache.get_media_cache)
 
     Returns
     -------
@@ -741,43 +1267,83 @@ def get_video_and_generate_thumbnails(
     hover_thumbnail_url: str
         The URL of the hover thumbnail, stored on GCS.
     """
-    tmp_video_path = file_utils.resource_copy(video_uri)
-
+    # Thumbnails generated by a prior run are keyed by the session content hash
+    # so the video is only needed when one of them is missing
+    static_thumbnail_url: Optional[str] = None
     if event.static_thumbnail_uri is None:
-        # Generate new
-        static_thumbnail_file = file_utils.get_static_thumbnail(
-            tmp_video_path, session_content_hash
+        static_thumbnail_url = fs_functions.get_file_uri(
+            bucket=bucket,
+            filename=f"{session_content_hash}-static-thumbnail.png",
+            credentials_file=credentials_file,
         )
-    else:
-        static_thumbnail_file = file_utils.resource_copy(
-            event.static_thumbnail_uri, session_content_hash
+    hover_thumbnail_url: Optional[str] = None
+    if event.hover_thumbnail_uri is None:
+        hover_thumbnail_url = fs_functions.get_file_uri(
+            bucket=bucket,
+            filename=f"{session_content_hash}-hover-thumbnail.gif",
+            credentials_file=credentials_file,
         )
 
-    static_thumbnail_url = fs_functions.upload_file(
-        credentials_file=credentials_file,
-        bucket=bucket,
-        filepath=static_thumbnail_file,
+    # Generate any missing thumbnails that were not provided by the event
+    generate_static_thumbnail = (
+        static_thumbnail_url is None and event.static_thumbnail_uri is None
     )
-    fs_functions.remove_local_file(static_thumbnail_file)
+    generate_hover_thumbnail = (
+        hover_thumbnail_url is None and event.hover_thumbnail_uri is None
+    )
+    static_thumbnail_file: Optional[str] = None
+    hover_thumbnail_file: Optional[str] = None
+    if generate_static_thumbnail or generate_hover_thumbnail:
+        # Reuse the video downloaded (or being downloaded) for audio splitting
+        with ExitStack() as video_stack:
+            with stage_limit(PipelineStage.DOWNLOAD, stage_limits):
+                tmp_video_path = video_stack.enter_context(
+                    get_media_cache(media_cache_dir, media_cache_max_bytes).open(
+                        video_uri
+                    )
+                )
 
-    if event.hover_thumbnail_uri is None:
-        # Generate new
-        hover_thumbnail_file = file_utils.get_hover_thumbnail(
-            tmp_video_path, session_content_hash
-        )
-    else:
-        hover_thumbnail_file = file_utils.resource_copy(
-            event.hover_thumbnail_uri, session_content_hash
+            # Both thumbnails are read from a single probe of the video
+            with stage_limit(PipelineStage.FFMPEG, stage_limits):
+                if generate_static_thumbnail and generate_hover_thumbnail:
+                    (
+                        static_thumbnail_file,
+                        hover_thumbnail_file,
+                    ) = file_utils.get_thumbnails(tmp_video_path, session_content_hash)
+                elif generate_static_thumbnail:
+                    static_thumbnail_file = file_utils.get_static_thumbnail(
+                        tmp_video_path, session_content_hash
+                    )
+                else:
+                    hover_thumbnail_file = file_utils.get_hover_thumbnail(
+                        tmp_video_path, session_content_hash
+                    )
+
+    if static_thumbnail_url is None:
+        if static_thumbnail_file is None:
+            static_thumbnail_file = file_utils.resource_copy(
+                event.static_thumbnail_uri, session_content_hash  # type: ignore
+            )
+
+        static_thumbnail_url = fs_functions.upload_file(
+            credentials_file=credentials_file,
+            bucket=bucket,
+            filepath=static_thumbnail_file,
         )
+        fs_functions.remove_local_file(static_thumbnail_file)
 
-    hover_thumbnail_url = fs_functions.upload_file(
-        credentials_file=credentials_file,
-        bucket=bucket,
-        filepath=hover_thumbnail_file,
-    )
-    fs_functions.remove_local_file(hover_thumbnail_file)
+    if hover_thumbnail_url is None:
+        if hover_thumbnail_file is None:
+            hover_thumbnail_file = file_utils.resource_copy(
+                event.hover_thumbnail_uri, session_content_hash  # type: ignore
+            )
 
-    fs_functions.remove_local_file(tmp_video_path)
+        hover_thumbnail_url = fs_functions.upload_file(
+            credentials_file=credentials_file,
+            bucket=bucket,
+            filepath=hover_thumbnail_file,
+        )
+        fs_functions.remove_local_file(hover_thumbnail_file)
 
     return (
         static_thumbnail_url,
@@ -785,18 +1351,107 @@ def get_video_and_generate_thumbnails(
     )
 
 
+@task
+def generate_session_thumbnails(
+    session_audio: SessionAudio,
+    event: EventIngestionModel,
+    session: Session,
+    bucket: str,
+    credentials_file: str,
+    stage_limits: Optional[Dict[str, int]] = None,
+    media_cache_dir: Optional[str] = None,
+    media_cache_max_bytes: Optional[int] = None,
+) -> Tuple[str, str]:
+    """
+    Mappable version of get_video_and_generate_thumbnails for a single event session.
+
+    Parameters
+    ----------
+    session_audio: SessionAudio
+        The session content hash and audio URI.
+    event: EventIngestionModel
+        The parent event of the session.
+    session: Session
+        The session to generate thumbnails for.
+    bucket: str
+        The name of the GCS bucket to upload the produced thumbnails to.
+    credentials_file: str
+        Path to Google Service Account Credentials JSON file.
+    stage_limits: Optional[Dict[str, int]]
+        Overrides for the maximum number of concurrent downloads and ffmpeg runs.
+        Default: None (use concurrency_utils.DEFAULT_STAGE_LIMITS)
+    media_cache_dir: Optional[str]
+        The directory to cache downloaded videos in.
+        Default: None (see media_cache.get_media_cache)
+    media_cache_max_bytes: Optional[int]
+        The disk quota for the cached videos.
+        Default: None (see media_cache.get_media_cache)
+
+    Returns
+    -------
+    static_thumbnail_url: str
+        The URL of the static thumbnail, stored on GCS.
+    hover_thumbnail_url: str
+        The URL of the hover thumbnail, stored on GCS.
+    """
+    return get_video_and_generate_thumbnails.run(
+        session_content_hash=session_audio.session_content_hash,
+        video_uri=session.video_uri,
+        event=event,
+        bucket=bucket,
+        credentials_file=credentials_file,
+        stage_limits=stage_limits,
+        media_cache_dir=media_cache_dir,
+        media_cache_max_bytes=media_cache_max_bytes,
+    )
+
+
+@task
+def load_processed_session(
+    session_plan: SessionPlan,
+    credentials_file: str,
+) -> SessionProcessingResult:
+    """
+    Load the results of a session that was fully processed by a prior run.
+
+    Parameters
+    ----------
+    session_plan: SessionPlan
+        The plan (with every artifact URI) of the processed session.
+    credentials_file: str
+        Path to Google Service Account Credentials JSON file.
+
+    Returns
+    -------
+    session_processing_result: SessionProcessingResult
+        The processing result of the session.
+    """
+    fs = fs_functions.initialize_gcs_file_system(credentials_file)
+    with fs.open(session_plan.transcript_uri, "r") as open_resource:
+        transcript = Transcript.from_json(open_resource.read())  # type: ignore
+
+    return SessionProcessingResult(
+        session=session_plan.session,
+        audio_uri=session_plan.audio_uri,  # type: ignore
+        transcript=transcript,
+        transcript_uri=session_plan.transcript_uri,  # type: ignore
+        static_thumbnail_uri=session_plan.static_thumbnail_uri,  # type: ignore
+        hover_thumbnail_uri=session_plan.hover_thumbnail_uri,  # type: ignore
+    )
+
+
 @task
 def compile_session_processing_result(
     session: Session,
-    audio_uri: str,
-    transcript: Transcript,
-    transcript_uri: str,
-    static_thumbnail_uri: str,
-    hover_thumbnail_uri: str,
+    session_audio: SessionAudio,
+    session_transcript: Tuple[str, Transcript],
+    session_thumbnails: Tuple[str, str],
 ) -> SessionProcessingResult:
+    transcript_uri, transcript = session_transcript
+    static_thumbnail_uri, hover_thumbnail_uri = session_thumbnails
     return SessionProcessingResult(
         session=session,
-        audio_uri=audio_uri,
+        audio_uri=session_audio.audio_uri,
         transcript=transcript,
         transcript_uri=transcript_uri,
         static_thumbnail_uri=static_thumbnail_uri,
@@ -804,146 +1459,429 @@ def compile_session_processing_result(
     )
 
 
-def _process_person_ingestion(
-    person: ingestion_models.Person,
-    default_session: Session,
-    credentials_file: str,
-    bucket: str,
-) -> db_models.Person:
-    # Store person picture file
-    person_picture_db_model: Optional[db_models.File]
-    if person.picture_uri is not None:
-        try:
-            tmp_person_picture_path = file_utils.resource_copy(person.picture_uri)
-            person_picture_uri = fs_functions.upload_file(
-                credentials_file=credentials_file,
-                bucket=bucket,
-                filepath=tmp_person_picture_path,
+@task(nout=2, trigger=always_run)
+def group_session_processing_results(
+    events: List[EventIngestionModel],
+    session_processing_results: List[SessionProcessingResult],
+    processed_session_processing_results: Optional[
+        List[SessionProcessingResult]
+    ] = None,
+    processed_session_indices: Optional[List[int]] = None,
+) -> Tuple[List[EventIngestionModel], List[List[SessionProcessingResult]]]:
+    """
+    Group the (flattened) session processing results back by event.
+
+    This task always runs so that a failed session only drops its own event:
+    events with any session that failed processing are left out (and logged).
+
+    Parameters
+    ----------
+    events: List[EventIngestionModel]
+        The events the sessions were flattened from, in the same order.
+    session_processing_results: List[SessionProcessingResult]
+        The processing results for every session of every event.
+        When processed_session_indices is provided, the processing results for every
+        other session.
+    processed_session_processing_results: Optional[List[SessionProcessingResult]]
+        The results loaded for the sessions processed by a prior run.
+        Default: None (all sessions are in session_processing_results)
+    processed_session_indices: Optional[List[int]]
+        The (flattened) index of each session processed by a prior run.
+        Default: None (all sessions are in session_processing_results)
+
+    Returns
+    -------
+    events: List[EventIngestionModel]
+        The events with every session successfully processed.
+    grouped_session_processing_results: List[List[SessionProcessingResult]]
+        The session processing results for each of those events.
+    """
+    # Put the results of sessions processed by a prior run back in place
+    if processed_session_indices:
+        processed = dict(
+            zip(
+                processed_session_indices,
+                processed_session_processing_results,  # type: ignore
             )
-            fs_functions.remove_local_file(tmp_person_picture_path)
-            person_picture_db_model = db_functions.create_file(
-                uri=person_picture_uri,
-                credentials_file=credentials_file,
+        )
+        results = iter(session_processing_results)
+        session_processing_results = [
+            processed[i] if i in processed else next(results)
+            for i in range(len(processed) + len(session_processing_results))
+        ]
+
+    # Failed (or skipped) sessions are passed in as their exception
+    grouped_events = []
+    grouped_session_processing_results = []
+    start = 0
+    for event in events:
+        end = start + len(event.sessions)
+        event_session_processing_results = session_processing_results[start:end]
+        start = end
+
+        failures = [
+            result
+            for result in event_session_processing_results
+            if not isinstance(result, SessionProcessingResult)
+        ]
+        if len(failures) > 0:
+            log.error(
+                f"Skipping storage of event '{event.external_source_id}' "
+                f"({event.body.name}), {len(failures)} of its sessions failed "
+                f"processing: {failures[0]}"
             )
-            person_picture_db_model = db_functions.upload_db_model(
-                db_model=person_picture_db_model,
-                credentials_file=credentials_file,
+            continue
+
+        grouped_events.append(event)
+        grouped_session_processing_results.append(event_session_processing_results)
+
+    return grouped_events, grouped_session_processing_results
+
+
+class IngestedEntities(NamedTuple):
+    bodies: Dict[str, db_models.Body]
+    persons: Dict[str, db_models.Person]
+
+
+class EntityIngestionPlanner:
+    """
+    Archive and plan the database upload of every unique body, person, seat, and role
+    exactly once, no matter how many events, matters, and votes they are attached to.
+
+    Entities are identified by the document id generated from the database model's
+    _PRIMARY_KEYS. The first occurrence of an entity is the one that is stored.
+
+    Parameters
+    ----------
+    credentials_file: str
+        Path to Google Service Account Credentials JSON file.
+    bucket: str
+        The name of the GCS bucket to archive pictures and images to.
+    write_planner: db_functions.BatchedWritePlanner
+        The write planner to plan all database uploads with.
+    ingested_entities: Optional[IngestedEntities]
+        Bodies and persons that have already been stored during this run.
+        They will be reused instead of archived and uploaded again.
+        Default: None (no entities have been stored yet)
+    """
+
+    def __init__(
+        self,
+        credentials_file: str,
+        bucket: str,
+        write_planner: db_functions.BatchedWritePlanner,
+        ingested_entities: Optional[IngestedEntities] = None,
+    ):
+        self.credentials_file = credentials_file
+        self.bucket = bucket
+        self.write_planner = write_planner
+
+        if ingested_entities is None:
+            ingested_entities = IngestedEntities(bodies={}, persons={})
+        self._bodies = dict(ingested_entities.bodies)
+        self._persons = dict(ingested_entities.persons)
+        self._seats: Dict[str, db_models.Seat] = {}
+        self._files: Dict[str, db_models.File] = {}
+
+    @property
+    def ingested_entities(self) -> IngestedEntities:
+        return IngestedEntities(bodies=dict(self._bodies), persons=dict(self._persons))
+
+    @staticmethod
+    def _get_entity_id(db_model: Model) -> str:
+        return db_functions.generate_and_attach_doc_hash_as_id(db_model).id
+
+    def _archive_file(self, uri: str) -> db_models.File:
+        # Raises FileNotFoundError (every time) for resources that can't be archived
+        if uri not in self._files:
+            tmp_path = file_utils.resource_copy(uri)
+            archived_uri = fs_functions.upload_file(
+                credentials_file=self.credentials_file,
+                bucket=self.bucket,
+                filepath=tmp_path,
             )
-        except FileNotFoundError:
-            person_picture_db_model = None
-            log.error(f"Person ('{person.name}'), picture URI could not be archived.")
-    else:
-        person_picture_db_model = None
+            fs_functions.remove_local_file(tmp_path)
+            file_db_model = db_functions.create_file(
+                uri=archived_uri,
+                credentials_file=self.credentials_file,
+            )
+            self._files[uri] = self.write_planner.add(file_db_model)
+
+        return self._files[uri]
+
+    def add_body(
+        self,
+        body: ingestion_models.Body,
+        default_start_datetime: datetime,
+    ) -> db_models.Body:
+        """
+        Get the planned database model for a body, planning its upload if new.
+
+        Parameters
+        ----------
+        body: ingestion_models.Body
+            The body to store.
+        default_start_datetime: datetime
+            The start datetime to use if the body doesn't provide one.
+
+        Returns
+        -------
+        body_db_model: db_models.Body
+            The body database model.
+        """
+        # Use or default body start_datetime
+        if body.start_datetime is None:
+            body_start_datetime = default_start_datetime
+        else:
+            body_start_datetime = body.start_datetime
 
-    # Create person
-    try:
-        person_db_model = db_functions.create_person(
-            person=person,
-            picture_ref=person_picture_db_model,
-            credentials_file=credentials_file,
-        )
-        person_db_model = db_functions.upload_db_model(
-            db_model=person_db_model,
-            credentials_file=credentials_file,
-        )
-    except (FieldValidationFailed, RequiredField, InvalidFieldType):
-        person_db_model = db_functions.create_minimal_person(person=person)
-        # No ingestion model provided here so that we don't try to
-        # re-validate the already failed model upload
-        person_db_model = db_functions.upload_db_model(
-            db_model=person_db_model,
-            credentials_file=credentials_file,
+        body_db_model = db_functions.create_body(
+            body=body,
+            start_datetime=body_start_datetime,
         )
+        body_id = self._get_entity_id(body_db_model)
+        if body_id not in self._bodies:
+            self._bodies[body_id] = self.write_planner.add(body_db_model)
+
+        return self._bodies[body_id]
+
+    def add_person(
+        self,
+        person: ingestion_models.Person,
+        default_session: Session,
+    ) -> db_models.Person:
+        """
+        Get the planned database model for a person, archiving their picture and
+        planning the upload of them, their seat, and their roles if new.
+
+        Parameters
+        ----------
+        person: ingestion_models.Person
+            The person to store.
+        default_session: Session
+            The session to use for defaulting any missing role or body start datetimes.
+
+        Returns
+        -------
+        person_db_model: db_models.Person
+            The person database model.
+        """
+        person_id = self._get_entity_id(db_functions.create_minimal_person(person))
+        if person_id in self._persons:
+            return self._persons[person_id]
+
+        # Store person picture file
+        person_picture_db_model: Optional[db_models.File]
+        if person.picture_uri is not None:
+            try:
+                person_picture_db_model = self._archive_file(person.picture_uri)
+            except FileNotFoundError:
+                person_picture_db_model = None
+                log.error(
+                    f"Person ('{person.name}'), picture URI could not be archived."
+                )
+        else:
+            person_picture_db_model = None
+
+        # Create person
+        try:
+            person_db_model = db_functions.create_person(
+                person=person,
+                picture_ref=person_picture_db_model,
+                credentials_file=self.credentials_file,
+            )
+            person_db_model = self.write_planner.add(person_db_model)
+        except (FieldValidationFailed, RequiredField, InvalidFieldType):
+            person_db_model = db_functions.create_minimal_person(person=person)
+            # No ingestion model provided here so that we don't try to
+            # re-validate the already failed model upload
+            person_db_model = self.write_planner.add(person_db_model)
+
+        self._persons[person_id] = person_db_model
+        try:
+            self._add_person_seat_and_roles(person, person_db_model, default_session)
+        except Exception:
+            # Leave the person to be stored with the events it belongs to
+            del self._persons[person_id]
+            raise
+
+        return person_db_model
+
+    def _add_person_seat_and_roles(
+        self,
+        person: ingestion_models.Person,
+        person_db_model: db_models.Person,
+        default_session: Session,
+    ) -> None:
+        # Create seat
+        if person.seat is not None:
+            person_seat_db_model = self._add_seat(person.seat, person.name)
+
+            # Create roles
+            if person.seat.roles is not None:
+                for person_role in person.seat.roles:
+                    # Create any bodies for roles
+                    person_role_body_db_model: Optional[db_models.Body]
+                    if person_role.body is not None:
+                        person_role_body_db_model = self.add_body(
+                            body=person_role.body,
+                            default_start_datetime=default_session.session_datetime,
+                        )
+                    else:
+                        person_role_body_db_model = None
+
+                    # Use or default role start_datetime
+                    if person_role.start_datetime is None:
+                        person_role_start_datetime = default_session.session_datetime
+                    else:
+                        person_role_start_datetime = person_role.start_datetime
+
+                    # Actual role creation
+                    person_role_db_model = db_functions.create_role(
+                        role=person_role,
+                        person_ref=person_db_model,
+                        seat_ref=person_seat_db_model,
+                        start_datetime=person_role_start_datetime,
+                        body_ref=person_role_body_db_model,
+                    )
+                    self.write_planner.add(person_role_db_model)
+
+    def _add_seat(
+        self, seat: ingestion_models.Seat, person_name: str
+    ) -> db_models.Seat:
+        seat_id = self._get_entity_id(db_functions.create_seat(seat, image_ref=None))
+        if seat_id in self._seats:
+            return self._seats[seat_id]
 
-    # Create seat
-    if person.seat is not None:
         # Store seat picture file
         person_seat_image_db_model: Optional[db_models.File]
-        try:
-            if person.seat.image_uri is not None:
-                tmp_person_seat_image_path = file_utils.resource_copy(
-                    uri=person.seat.image_uri,
-                )
-                person_seat_image_uri = fs_functions.upload_file(
-                    credentials_file=credentials_file,
-                    bucket=bucket,
-                    filepath=tmp_person_seat_image_path,
-                )
-                fs_functions.remove_local_file(
-                    tmp_person_seat_image_path,
-                )
-                person_seat_image_db_model = db_functions.create_file(
-                    uri=person_seat_image_uri, credentials_file=credentials_file
-                )
-                person_seat_image_db_model = db_functions.upload_db_model(
-                    db_model=person_seat_image_db_model,
-                    credentials_file=credentials_file,
-                )
-            else:
+        if seat.image_uri is not None:
+            try:
+                person_seat_image_db_model = self._archive_file(seat.image_uri)
+            except FileNotFoundError:
                 person_seat_image_db_model = None
-        except FileNotFoundError:
+                log.error(
+                    f"Person ('{person_name}'), seat image URI could not be archived."
+                )
+        else:
             person_seat_image_db_model = None
-            log.error(
-                f"Person ('{person.name}'), " f"seat image URI could not be archived."
-            )
 
         # Actual seat creation
         person_seat_db_model = db_functions.create_seat(
-            seat=person.seat,
+            seat=seat,
             image_ref=person_seat_image_db_model,
         )
-        person_seat_db_model = db_functions.upload_db_model(
-            db_model=person_seat_db_model,
-            credentials_file=credentials_file,
-        )
+        self._seats[seat_id] = self.write_planner.add(person_seat_db_model)
+        return self._seats[seat_id]
 
-        # Create roles
-        if person.seat.roles is not None:
-            for person_role in person.seat.roles:
-                # Create any bodies for roles
-                person_role_body_db_model: Optional[db_models.Body]
-                if person_role.body is not None:
-                    # Use or default role body start_datetime
-                    if person_role.body.start_datetime is None:
-                        person_role_body_start_datetime = (
-                            default_session.session_datetime
-                        )
-                    else:
-                        person_role_body_start_datetime = (
-                            person_role.body.start_datetime
-                        )
 
-                    person_role_body_db_model = db_functions.create_body(
-                        body=person_role.body,
-                        start_datetime=person_role_body_start_datetime,
-                    )
-                    person_role_body_db_model = db_functions.upload_db_model(
-                        db_model=person_role_body_db_model,
-                        credentials_file=credentials_file,
-                    )
-                else:
-                    person_role_body_db_model = None
+def _create_write_planner(
+    credentials_file: str,
+    write_cache_path: Optional[str] = None,
+) -> db_functions.BatchedWritePlanner:
+    return db_functions.BatchedWritePlanner(
+        credentials_file=credentials_file,
+        write_cache=(
+            write_cache.get_write_cache(write_cache_path)
+            if write_cache_path is not None
+            else None
+        ),
+    )
+
+
+def _get_event_persons(
+    event: EventIngestionModel,
+) -> Iterator[ingestion_models.Person]:
+    # All of the persons that are stored alongside an event
+    if event.event_minutes_items is None:
+        return
+
+    for event_minutes_item in event.event_minutes_items:
+        if event_minutes_item.matter is not None:
+            if event_minutes_item.matter.sponsors is not None:
+                yield from event_minutes_item.matter.sponsors
+
+            # Votes are only stored when the overall decision is known
+            if (
+                event_minutes_item.votes is not None
+                and event_minutes_item.decision is not None
+            ):
+                for vote in event_minutes_item.votes:
+                    yield vote.person
 
-                # Use or default role start_datetime
-                if person_role.start_datetime is None:
-                    person_role_start_datetime = default_session.session_datetime
-                else:
-                    person_role_start_datetime = person_role.start_datetime
-
-                # Actual role creation
-                person_role_db_model = db_functions.create_role(
-                    role=person_role,
-                    person_ref=person_db_model,
-                    seat_ref=person_seat_db_model,
-                    start_datetime=person_role_start_datetime,
-                    body_ref=person_role_body_db_model,
-                )
-                person_role_db_model = db_functions.upload_db_model(
-                    db_model=person_role_db_model,
-                    credentials_file=credentials_file,
-                )
 
-    return person_db_model
+@task
+def store_event_entities(
+    events: List[EventIngestionModel],
+    credentials_file: str,
+    bucket: str,
+    stage_limits: Optional[Dict[str, int]] = None,
+    write_cache_path: Optional[str] = None,
+) -> IngestedEntities:
+    """
+    Archive and store every unique body, person, seat, and role of all events once.
+
+    Failures are logged rather than raised so that they don't keep any event from
+    being stored: a body or person that fails (or every entity, when the write
+    fails) is left out of the ingested entities, and is stored (or fails) with the
+    events it belongs to instead.
+
+    Parameters
+    ----------
+    events: List[EventIngestionModel]
+        All events of the current run.
+    credentials_file: str
+        Path to Google Service Account Credentials JSON file.
+    bucket: str
+        The name of the GCS bucket to archive pictures and images to.
+    stage_limits: Optional[Dict[str, int]]
+        Overrides for the maximum number of concurrent database writes.
+        Default: None (use concurrency_utils.DEFAULT_STAGE_LIMITS)
+    write_cache_path: Optional[str]
+        Path to the database write cache to skip unchanged documents with.
+        Default: None (write every document)
+
+    Returns
+    -------
+    ingested_entities: IngestedEntities
+        The stored bodies and persons for reuse when storing each event.
+    """
+    # Check all person websites at once, model validation then reuses the results
+    validators.prevalidate_resources(
+        [person.website for event in events for person in _get_event_persons(event)],
+        google_credentials_file=credentials_file,
+    )
+
+    write_planner = _create_write_planner(credentials_file, write_cache_path)
+    entity_planner = EntityIngestionPlanner(
+        credentials_file=credentials_file,
+        bucket=bucket,
+        write_planner=write_planner,
+    )
+    for event in events:
+        first_session = min(event.sessions, key=attrgetter("session_index"))
+        try:
+            entity_planner.add_body(
+                body=event.body,
+                default_start_datetime=first_session.session_datetime,
+            )
+        except Exception as e:
+            log.error(f"Failed to plan storage of body ('{event.body.name}'): {e}")
+
+        for person in _get_event_persons(event):
+            try:
+                entity_planner.add_person(person=person, default_session=first_session)
+            except Exception as e:
+                log.error(f"Failed to plan storage of person ('{person.name}'): {e}")
+
+    try:
+        with stage_limit(PipelineStage.DATABASE_WRITE, stage_limits):
+            write_planner.commit()
+    except Exception as e:
+        log.error(f"Failed to store the bodies and persons of all events: {e}")
+        return IngestedEntities(bodies={}, persons={})
+
+    return entity_planner.ingested_entities
 
 
 def _calculate_in_majority(
@@ -974,6 +1912,33 @@ def _calculate_in_majority(
     return None
 
 
+def _get_event_resource_uris(
+    event: EventIngestionModel,
+    session_processing_results: List[SessionProcessingResult],
+) -> List[Optional[str]]:
+    # All of the URIs that are validated when storing an event
+    uris = [event.agenda_uri, event.minutes_uri]
+    for session_result in session_processing_results:
+        uris += [
+            session_result.session.video_uri,
+            session_result.session.caption_uri,
+            session_result.audio_uri,
+            session_result.transcript_uri,
+            session_result.static_thumbnail_uri,
+            session_result.hover_thumbnail_uri,
+        ]
+
+    if event.event_minutes_items is not None:
+        for event_minutes_item in event.event_minutes_items:
+            if event_minutes_item.supporting_files is not None:
+                uris += [
+                    supporting_file.uri
+                    for supporting_file in event_minutes_item.supporting_files
+                ]
+
+    return uris
+
+
 @task
 def store_event_processing_results(
     event: EventIngestionModel,
@@ -981,28 +1946,59 @@ def store_event_processing_results(
     credentials_file: str,
     bucket: str,
     from_local: bool = False,
+    stage_limits: Optional[Dict[str, int]] = None,
+    ingested_entities: Optional[IngestedEntities] = None,
+    write_cache_path: Optional[str] = None,
+) -> None:
+    with stage_limit(PipelineStage.DATABASE_WRITE, stage_limits):
+        _store_event_processing_results(
+            event=event,
+            session_processing_results=session_processing_results,
+            credentials_file=credentials_file,
+            bucket=bucket,
+            from_local=from_local,
+            ingested_entities=ingested_entities,
+            write_cache_path=write_cache_path,
+        )
+
+
+def _store_event_processing_results(
+    event: EventIngestionModel,
+    session_processing_results: List[SessionProcessingResult],
+    credentials_file: str,
+    bucket: str,
+    from_local: bool = False,
+    ingested_entities: Optional[IngestedEntities] = None,
+    write_cache_path: Optional[str] = None,
 ) -> None:
     # TODO: check metadata before pipeline runs to avoid the many try excepts
 
+    # Check all URIs at once, model validation then reuses the results
+    validators.prevalidate_resources(
+        _get_event_resource_uris(event, session_processing_results),
+        google_credentials_file=credentials_file,
+    )
+
+    # All database models are uploaded in write batches once fully planned
+    write_planner = _create_write_planner(credentials_file, write_cache_path)
+
+    # Bodies and persons already stored during this run are reused
+    entity_planner = EntityIngestionPlanner(
+        credentials_file=credentials_file,
+        bucket=bucket,
+        write_planner=write_planner,
+        ingested_entities=ingested_entities,
+    )
+
     # Get first session
     first_session = min(event.sessions, key=attrgetter("session_index"))
 
     # Get high level event metadata and db models
 
-    # Use or default body start_datetime
-    if event.body.start_datetime is None:
-        body_start_datetime = first_session.session_datetime
-    else:
-        body_start_datetime = event.body.start_datetime
-
     # Upload body
-    body_db_model = db_functions.create_body(
+    body_db_model = entity_planner.add_body(
         body=event.body,
-        start_datetime=body_start_datetime,
-    )
-    body_db_model = db_functions.upload_db_model(
-        db_model=body_db_model,
-        credentials_file=credentials_file,
+        default_start_datetime=first_session.session_datetime,
     )
 
     event_static_thumbnail_file_db_model = None
@@ -1014,9 +2010,8 @@ def store_event_processing_results(
             uri=session_result.static_thumbnail_uri,
             credentials_file=credentials_file,
         )
-        static_thumbnail_file_db_model = db_functions.upload_db_model(
-            db_model=static_thumbnail_file_db_model,
-            credentials_file=credentials_file,
+        static_thumbnail_file_db_model = write_planner.add(
+            static_thumbnail_file_db_model
         )
         if event_static_thumbnail_file_db_model is None:
             event_static_thumbnail_file_db_model = static_thumbnail_file_db_model
@@ -1026,10 +2021,7 @@ def store_event_processing_results(
             uri=session_result.hover_thumbnail_uri,
             credentials_file=credentials_file,
         )
-        hover_thumbnail_file_db_model = db_functions.upload_db_model(
-            db_model=hover_thumbnail_file_db_model,
-            credentials_file=credentials_file,
-        )
+        hover_thumbnail_file_db_model = write_planner.add(hover_thumbnail_file_db_model)
         if event_hover_thumbnail_file_db_model is None:
             event_hover_thumbnail_file_db_model = hover_thumbnail_file_db_model
 
@@ -1045,10 +2037,7 @@ def store_event_processing_results(
             external_source_id=event.external_source_id,
             credentials_file=credentials_file,
         )
-        event_db_model = db_functions.upload_db_model(
-            db_model=event_db_model,
-            credentials_file=credentials_file,
-        )
+        event_db_model = write_planner.add(event_db_model)
     except FieldValidationFailed:
         event_db_model = db_functions.create_event(
             body_ref=body_db_model,
@@ -1058,10 +2047,7 @@ def store_event_processing_results(
             external_source_id=event.external_source_id,
             credentials_file=credentials_file,
         )
-        event_db_model = db_functions.upload_db_model(
-            db_model=event_db_model,
-            credentials_file=credentials_file,
-        )
+        event_db_model = write_planner.add(event_db_model)
 
     # Iter sessions
     for session_result in session_processing_results:
@@ -1070,24 +2056,18 @@ def store_event_processing_results(
             uri=session_result.audio_uri,
             credentials_file=credentials_file,
         )
-        audio_file_db_model = db_functions.upload_db_model(
-            db_model=audio_file_db_model,
-            credentials_file=credentials_file,
-        )
+        audio_file_db_model = write_planner.add(audio_file_db_model)
 
         # Upload transcript file
         transcript_file_db_model = db_functions.create_file(
             uri=session_result.transcript_uri,
             credentials_file=credentials_file,
         )
-        transcript_file_db_model = db_functions.upload_db_model(
-            db_model=transcript_file_db_model,
-            credentials_file=credentials_file,
-        )
+        transcript_file_db_model = write_planner.add(transcript_file_db_model)
 
         # Account for uri's from local files
         if from_local:
-            fs = GCSFileSystem(token=credentials_file)
+            fs = fs_functions.initialize_gcs_file_system(credentials_file)
             stream_url = str(fs.url(session_result.session.video_uri))
             session_result.session.video_uri = stream_url
 
@@ -1097,10 +2077,7 @@ def store_event_processing_results(
             event_ref=event_db_model,
             credentials_file=credentials_file,
         )
-        session_db_model = db_functions.upload_db_model(
-            db_model=session_db_model,
-            credentials_file=credentials_file,
-        )
+        session_db_model = write_planner.add(session_db_model)
 
         # Create transcript
         transcript_db_model = db_functions.create_transcript(
@@ -1108,10 +2085,7 @@ def store_event_processing_results(
             session_ref=session_db_model,
             transcript=session_result.transcript,
         )
-        transcript_db_model = db_functions.upload_db_model(
-            db_model=transcript_db_model,
-            credentials_file=credentials_file,
-        )
+        transcript_db_model = write_planner.add(transcript_db_model)
 
     # Add event metadata
     if event.event_minutes_items is not None:
@@ -1121,19 +2095,14 @@ def store_event_processing_results(
                 matter_db_model = db_functions.create_matter(
                     matter=event_minutes_item.matter,
                 )
-                matter_db_model = db_functions.upload_db_model(
-                    db_model=matter_db_model,
-                    credentials_file=credentials_file,
-                )
+                matter_db_model = write_planner.add(matter_db_model)
 
                 # Add people from matter sponsors
                 if event_minutes_item.matter.sponsors is not None:
                     for sponsor_person in event_minutes_item.matter.sponsors:
-                        sponsor_person_db_model = _process_person_ingestion(
+                        sponsor_person_db_model = entity_planner.add_person(
                             person=sponsor_person,
                             default_session=first_session,
-                            credentials_file=credentials_file,
-                            bucket=bucket,
                         )
 
                         # Create matter sponsor association
@@ -1141,9 +2110,8 @@ def store_event_processing_results(
                             matter_ref=matter_db_model,
                             person_ref=sponsor_person_db_model,
                         )
-                        matter_sponsor_db_model = db_functions.upload_db_model(
-                            db_model=matter_sponsor_db_model,
-                            credentials_file=credentials_file,
+                        matter_sponsor_db_model = write_planner.add(
+                            matter_sponsor_db_model
                         )
 
             else:
@@ -1154,10 +2122,7 @@ def store_event_processing_results(
                 minutes_item=event_minutes_item.minutes_item,
                 matter_ref=matter_db_model,
             )
-            minutes_item_db_model = db_functions.upload_db_model(
-                db_model=minutes_item_db_model,
-                credentials_file=credentials_file,
-            )
+            minutes_item_db_model = write_planner.add(minutes_item_db_model)
 
             # Handle event minutes item index
             if event_minutes_item.index is None:
@@ -1173,9 +2138,8 @@ def store_event_processing_results(
                     minutes_item_ref=minutes_item_db_model,
                     index=event_minutes_item_index,
                 )
-                event_minutes_item_db_model = db_functions.upload_db_model(
-                    db_model=event_minutes_item_db_model,
-                    credentials_file=credentials_file,
+                event_minutes_item_db_model = write_planner.add(
+                    event_minutes_item_db_model
                 )
             except (FieldValidationFailed, InvalidFieldType):
                 event_minutes_item_db_model = (
@@ -1185,9 +2149,8 @@ def store_event_processing_results(
                         index=event_minutes_item_index,
                     )
                 )
-                event_minutes_item_db_model = db_functions.upload_db_model(
-                    db_model=event_minutes_item_db_model,
-                    credentials_file=credentials_file,
+                event_minutes_item_db_model = write_planner.add(
+                    event_minutes_item_db_model
                 )
 
             # Create matter status
@@ -1200,9 +2163,8 @@ def store_event_processing_results(
                         update_datetime=first_session.session_datetime,
                     )
                     try:
-                        matter_status_db_model = db_functions.upload_db_model(
-                            db_model=matter_status_db_model,
-                            credentials_file=credentials_file,
+                        matter_status_db_model = write_planner.add(
+                            matter_status_db_model
                         )
                     except FieldValidationFailed:
                         allowed_matter_decisions = (
@@ -1231,9 +2193,8 @@ def store_event_processing_results(
                                 supporting_file=supporting_file,
                                 credentials_file=credentials_file,
                             )
-                            matter_file_db_model = db_functions.upload_db_model(
-                                db_model=matter_file_db_model,
-                                credentials_file=credentials_file,
+                            matter_file_db_model = write_planner.add(
+                                matter_file_db_model
                             )
                         except FieldValidationFailed:
                             log.error(
@@ -1250,9 +2211,8 @@ def store_event_processing_results(
                                 credentials_file=credentials_file,
                             )
                         )
-                        event_minutes_item_file_db_model = db_functions.upload_db_model(
-                            db_model=event_minutes_item_file_db_model,
-                            credentials_file=credentials_file,
+                        event_minutes_item_file_db_model = write_planner.add(
+                            event_minutes_item_file_db_model
                         )
                     except FieldValidationFailed:
                         log.error(
@@ -1269,11 +2229,9 @@ def store_event_processing_results(
                 ):
                     for vote in event_minutes_item.votes:
                         # Add people from voters
-                        vote_person_db_model = _process_person_ingestion(
+                        vote_person_db_model = entity_planner.add_person(
                             person=vote.person,
                             default_session=first_session,
-                            credentials_file=credentials_file,
-                            bucket=bucket,
                         )
 
                         # Create vote
@@ -1290,10 +2248,7 @@ def store_event_processing_results(
                                 ),
                                 external_source_id=vote.external_source_id,
                             )
-                            vote_db_model = db_functions.upload_db_model(
-                                db_model=vote_db_model,
-                                credentials_file=credentials_file,
-                            )
+                            vote_db_model = write_planner.add(vote_db_model)
                         except (FieldValidationFailed, RequiredField, InvalidFieldType):
                             allowed_vote_decisions = (
                                 constants_utils.get_all_class_attr_values(
@@ -1315,3 +2270,5 @@ def store_event_processing_results(
                         f"Votes were present but overall decision for the "
                         f"event minutes item was 'None'."
                     )
+
+    write_planner.commit()
@@ -2,28 +2,25 @@
 # -*- coding: utf-8 -*-
 
 import logging
-import math
-from dataclasses import dataclass
-from datetime import datetime
+from datetime import timedelta
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Dict, List, NamedTuple, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 import fireo
+import numpy as np
 import pandas as pd
-import pytz
-import rapidfuzz
-from dataclasses_json import dataclass_json
-from gcsfs import GCSFileSystem
-from nltk import ngrams
-from nltk.stem import SnowballStemmer
 from prefect import Flow, task, unmapped
 
 from ..database import functions as db_functions
 from ..database import models as db_models
+from ..file_store import functions as fs_functions
 from ..utils import string_utils
+from ..utils.stem_cache import get_stem_cache
+from .event_index_scoring import compute_tfidf_scores
+from .event_index_state import EventIndexState
 from .pipeline_config import EventIndexPipelineConfig
-from .transcript_model import Sentence, Transcript
+from .transcript_model import Transcript
 
 ###############################################################################
 
@@ -31,6 +28,15 @@ log = logging.getLogger(__name__)
 
 ###############################################################################
 
+INDEX_STATE_DIR = "index-state"
+
+# Transcripts created shortly before the watermark may have been stored after the
+# previous incremental run, they are checked again (already selected transcripts
+# are ignored)
+INDEX_WATERMARK_OVERLAP = timedelta(days=1)
+
+###############################################################################
+
 
 @task
 def get_transcripts(credentials_file: str) -> List[db_models.Transcript]:
@@ -49,18 +55,26 @@ def get_transcripts(credentials_file: str) -> List[db_models.Transcript]:
 
     Notes
     -----
-    This _can_ become a dangerous operation if the database has millions of transcript
-    documents as this will additionally pull all referenced Event, Session, Body,
-    and File database models.
+    Referenced Session, Event, Body, and File database models are loaded after all
+    transcripts are pulled with batched reads, each referenced document is only read
+    once.
     """
-    # Fetch all transcripts
-    # This comes with references to Session and File models
+    # Fetch all transcripts without loading their references one by one
+    transcripts = list(
+        db_functions.iter_collection(
+            db_model=db_models.Transcript,
+            credentials_file=credentials_file,
+            load_references=False,
+        )
+    )
+
+    # Transcript models come with references to Session and File models
     # Session models come with reference to Event model
     # Event models come with reference to Body model
-    return db_functions.get_all_of_collection(
-        db_model=db_models.Transcript,
-        credentials_file=credentials_file,
+    db_functions.ReferenceResolver(credentials_file=credentials_file).resolve(
+        transcripts
     )
+    return transcripts
 
 
 @task
@@ -133,35 +147,50 @@ def get_transcripts_per_event(
     return list(event_transcripts.values())
 
 
-@dataclass_json
-@dataclass
-class SentenceManager:
-    original_details: Sentence
-    cleaned_text: str
-    n_grams: List[Tuple[str]]
+class EventGrams(NamedTuple):
+    """
+    The grams of a single event in columnar form.
+
+    There is a single value in each array for each unique stemmed gram of the event.
+    Context spans are not built per gram, they are built from the original text of
+    the sentence of each gram's first occurrence (kept once per sentence in the
+    sentences table) and the index of the gram's first term in it.
+    """
+
+    event: db_models.Event
+    stemmed_grams: np.ndarray
+    unstemmed_grams: np.ndarray
+    tfs: np.ndarray
+    sentence_indices: np.ndarray
+    term_indices: np.ndarray
+    sentences: List[str]
+
 
+def _get_context_span(terms: List[str], target_term_index: int) -> str:
+    # Get left and right indices
+    left_i = 0 if target_term_index - 8 < 0 else target_term_index - 8
+    right_i = None if target_term_index + 7 >= len(terms) - 1 else target_term_index + 7
+    context_span = " ".join(terms[left_i:right_i])
 
-@dataclass_json
-@dataclass
-class ContextualizedGram:
-    # Note: we attach both the event ref and the unpacked id and datetime
-    # We attach the event ref for later "foreign key" attachment
-    # We attach the id for simpler gram grouping
-    # We attach the datetime for simpler datetime weighting
-    event_ref: db_models.Event
-    event_id: str
-    event_datetime: datetime
-    unstemmed_gram: str
-    stemmed_gram: str
-    context_span: str
+    # Append ellipsis
+    if left_i != 0:
+        context_span = f"... {context_span}"
+    if right_i is not None:
+        context_span = f"{context_span}..."
+
+    return context_span
 
 
 @task
 def read_transcripts_and_generate_grams(
-    event_transcripts: EventTranscripts, n_grams: int, credentials_file: str
-) -> List[ContextualizedGram]:
+    event_transcripts: EventTranscripts,
+    n_grams: int,
+    credentials_file: str,
+    stem_vocabulary_path: Optional[str] = None,
+) -> EventGrams:
     """
-    Parse all documents and create a list of contextualized grams for later weighting.
+    Parse all documents and create the columnar grams of the event for later
+    weighting.
 
     Parameters
     ----------
@@ -171,16 +200,26 @@ def read_transcripts_and_generate_grams(
         N number of terms to act as a unique entity.
     credentials_file: str
         Path to Google Service Account Credentials JSON file.
+    stem_vocabulary_path: Optional[str]
+        A stem vocabulary file to warm the shared stem cache with.
+        Default: None (don't warm the stem cache)
 
     Returns
     -------
-    grams: List[ContextualizedGram]
-        All grams found in all transcripts provided.
+    grams: EventGrams
+        A single gram for each unique stemmed gram found in all transcripts provided
+        with the number of times it was found (tf), and the unstemmed gram and context
+        span location of its first occurrence.
     """
-    fs = GCSFileSystem(token=credentials_file)
+    fs = fs_functions.initialize_gcs_file_system(credentials_file)
+    tokenizer = string_utils.get_text_tokenizer()
+    stem_cache = get_stem_cache(stem_vocabulary_path)
 
-    # Store all n_gram results
-    event_n_grams: List[ContextualizedGram] = []
+    # Count each stemmed gram of the event and keep its first occurrence
+    # as (unstemmed gram, sentence index, term index)
+    gram_counts: Dict[str, int] = {}
+    first_occurrences: Dict[str, Tuple[str, int, int]] = {}
+    sentences: List[str] = []
 
     # Iter over each transcript
     for transcript in event_transcripts.transcripts:
@@ -198,98 +237,106 @@ def read_transcripts_and_generate_grams(
             with open(local_transcript_filepath, "r") as open_f:
                 transcript = Transcript.from_json(open_f.read())  # type: ignore
 
-            # Get cleaned sentences by removing stop words
-            cleaned_sentences: List[SentenceManager] = [
-                SentenceManager(
-                    original_details=sentence,
-                    cleaned_text=string_utils.clean_text(
-                        sentence.text,
-                        clean_stop_words=True,
-                    ),
-                    n_grams=[],
-                )
-                for sentence in transcript.sentences
-            ]
-
-            # Filter any empty sentences
-            cleaned_sentences = [
-                sm for sm in cleaned_sentences if len(sm.cleaned_text) > 1
-            ]
-
-            # Get all n_grams for each sentence
-            for sm in cleaned_sentences:
-                sm.n_grams = [*ngrams(sm.cleaned_text.split(), n_grams)]
-
-            # Init stemmer and stem all grams
-            stemmer = SnowballStemmer("english")
-            for sm in cleaned_sentences:
-                for n_gram in sm.n_grams:
-                    # Join into a single n gram
-                    unstemmed_n_gram = " ".join(n_gram)
-
+            # Tokenize each sentence once, cleaning, n grams, stemming, and context
+            # spans all use the same tokens
+            for sentence in transcript.sentences:
+                tokenized = tokenizer.tokenize(sentence.text)
+                sentence_index: Optional[int] = None
+
+                # Filter any sentences cleaned down to a single character
+                content_indices = tokenized.content_indices
+                if (
+                    len(content_indices) == 1
+                    and len(tokenized.tokens[content_indices[0]]) == 1
+                ):
+                    continue
+
+                for n_gram in tokenized.get_content_n_grams(n_grams):
                     # Join, lower, and stem the n gram
                     stemmed_n_gram = " ".join(
-                        [stemmer.stem(term.lower()) for term in n_gram]
+                        [stem_cache.stem(tokenized.lowered_tokens[i]) for i in n_gram]
                     )
 
-                    # Get context span
-                    # Because ngrams function, cleaning, and split may affect the exact
-                    # matchup of the term, use fuzzy diff to find closest
-                    closest_term = ""
-                    closest_term_score = 0.0
-                    for term in sm.original_details.text.split():
-                        similarity = rapidfuzz.fuzz.QRatio(term, n_gram[0])
-                        if similarity > closest_term_score:
-                            closest_term = term
-                            closest_term_score = similarity
-
-                    # Get surrounding terms
-                    terms = sm.original_details.text.split()
-                    target_term_index = terms.index(closest_term)
-
-                    # Get left and right indices
-                    left_i = 0 if target_term_index - 8 < 0 else target_term_index - 8
-                    right_i = (
-                        None
-                        if target_term_index + 7 >= len(terms) - 1
-                        else target_term_index + 7
-                    )
-                    context_span = " ".join(terms[left_i:right_i])
-
-                    # Append ellipsis
-                    if left_i != 0:
-                        context_span = f"... {context_span}"
-                    if right_i is not None:
-                        context_span = f"{context_span}..."
-
-                    # Append to event list
-                    event_n_grams.append(
-                        ContextualizedGram(
-                            event_ref=event_transcripts.event,
-                            event_id=event_transcripts.event.id,
-                            event_datetime=event_transcripts.event.event_datetime,
-                            unstemmed_gram=unstemmed_n_gram,
-                            stemmed_gram=stemmed_n_gram,
-                            context_span=context_span,
+                    # Only the first occurrence is kept for the context span
+                    if stemmed_n_gram in gram_counts:
+                        gram_counts[stemmed_n_gram] += 1
+                    else:
+                        # Keep the sentence for the context span
+                        if sentence_index is None:
+                            sentence_index = len(sentences)
+                            sentences.append(sentence.text)
+
+                        gram_counts[stemmed_n_gram] = 1
+                        first_occurrences[stemmed_n_gram] = (
+                            " ".join([tokenized.tokens[i] for i in n_gram]),
+                            sentence_index,
+                            tokenized.term_indices[n_gram[0]],
                         )
-                    )
 
-    return event_n_grams
+    # Pack into columns
+    unstemmed_grams, sentence_indices, term_indices = (
+        zip(*first_occurrences.values()) if len(first_occurrences) > 0 else ([], [], [])
+    )
+    return EventGrams(
+        event=event_transcripts.event,
+        stemmed_grams=np.array(list(first_occurrences), dtype=str),
+        unstemmed_grams=np.array(unstemmed_grams, dtype=str),
+        tfs=np.fromiter(gram_counts.values(), dtype="int64", count=len(gram_counts)),
+        sentence_indices=np.array(sentence_indices, dtype="int32"),
+        term_indices=np.array(term_indices, dtype="int32"),
+        sentences=sentences,
+    )
 
 
 @task
 def convert_all_n_grams_to_dataframe(
-    all_events_n_grams: List[List[ContextualizedGram]],
+    all_events_n_grams: List[EventGrams],
 ) -> pd.DataFrame:
     """
-    Flatten all n grams from all events into one single dataframe.
+    Concatenate the grams from all events into one single dataframe.
+
+    Gram columns are concatenated as arrays and event columns are taken from a
+    single value per event by integer event code. Context spans are built from the
+    sentences tables.
     """
+    # Integer code the event of every gram
+    event_codes = np.repeat(
+        np.arange(len(all_events_n_grams)),
+        [len(event_grams.tfs) for event_grams in all_events_n_grams],
+    )
+    events = pd.Series(
+        [event_grams.event for event_grams in all_events_n_grams], dtype=object
+    )
+
+    # Get the context span of each gram's first occurrence
+    context_spans: List[str] = []
+    for event_grams in all_events_n_grams:
+        sentences_terms = [sentence.split() for sentence in event_grams.sentences]
+        context_spans.extend(
+            _get_context_span(sentences_terms[sentence_index], term_index)
+            for sentence_index, term_index in zip(
+                event_grams.sentence_indices, event_grams.term_indices
+            )
+        )
+
+    def concatenate(column: str, dtype: str) -> np.ndarray:
+        return np.concatenate(
+            [np.array([], dtype=dtype)]
+            + [getattr(event_grams, column) for event_grams in all_events_n_grams]
+        )
+
     return pd.DataFrame(
-        [
-            n_gram.to_dict()  # type: ignore
-            for single_event_n_grams in all_events_n_grams
-            for n_gram in single_event_n_grams
-        ]
+        {
+            "event_ref": events.to_numpy()[event_codes],
+            "event_id": events.map(lambda event: event.id).to_numpy()[event_codes],
+            "event_datetime": pd.Series([event.event_datetime for event in events])
+            .take(event_codes)
+            .reset_index(drop=True),
+            "unstemmed_gram": concatenate("unstemmed_grams", "str").astype(object),
+            "stemmed_gram": concatenate("stemmed_grams", "str").astype(object),
+            "context_span": np.array(context_spans, dtype=object),
+            "tf": concatenate("tfs", "int64"),
+        }
     )
 
 
@@ -299,50 +346,228 @@ def compute_tfidf(
     datetime_weighting_days_decay: int = 30,
 ) -> pd.DataFrame:
     """
-    Compute term frequencies, inverse document frequencies, tfidf, and weighted tfidf
-    values for each n_gram in the dataframe.
+    Compute inverse document frequencies, tfidf, and weighted tfidf values for each
+    n_gram (a single row per event and stemmed gram with its term frequency) in the
+    dataframe.
     """
-    # Get term frequencies
-    n_grams["tf"] = n_grams.groupby(
-        ["event_id", "stemmed_gram"]
-    ).stemmed_gram.transform("count")
+    scores = compute_tfidf_scores(
+        event_ids=n_grams.event_id,
+        stemmed_grams=n_grams.stemmed_gram,
+        tfs=n_grams.tf,
+        event_datetimes=n_grams.event_datetime,
+        datetime_weighting_days_decay=datetime_weighting_days_decay,
+    )
+    n_grams = n_grams.assign(
+        idf=scores.idf,
+        tfidf=scores.tfidf,
+        datetime_weighted_tfidf=scores.datetime_weighted_tfidf,
+    )
+
+    # Drop terms worth nothing
+    return n_grams[n_grams.tfidf != 0]
 
-    # Drop duplicates for inverse-document-frequencies
-    n_grams = n_grams.drop_duplicates(["event_id", "stemmed_gram"])
 
-    # Get idf
-    N = len(n_grams.event_id.unique())
-    n_grams["idf"] = (
-        n_grams.groupby("stemmed_gram")
-        .event_id.transform("count")
-        .apply(lambda df: math.log(N / df))
+@task
+def load_index_state(
+    config: EventIndexPipelineConfig,
+    n_grams: int,
+    store_local: bool = False,
+) -> EventIndexState:
+    """
+    Load the stored state of the index for incremental indexing.
+
+    The state is stored in the GCS bucket, or in a local directory when the index
+    itself is stored locally.
+    """
+    if store_local:
+        index_state = EventIndexState(str(Path(INDEX_STATE_DIR) / f"{n_grams}-grams"))
+    else:
+        index_state = EventIndexState(
+            f"{config.validated_gcs_bucket_name}/{INDEX_STATE_DIR}/{n_grams}-grams",
+            fs=fs_functions.initialize_gcs_file_system(config.google_credentials_file),
+        )
+
+    index_state.load()
+    return index_state
+
+
+@task
+def get_transcripts_created_after_watermark(
+    index_state: EventIndexState,
+    credentials_file: str,
+) -> List[db_models.Transcript]:
+    """
+    Pull the Transcript models created since the index state watermark.
+
+    All transcripts are pulled when the index state has no watermark.
+    """
+    if index_state.watermark is None:
+        return get_transcripts.run(credentials_file=credentials_file)
+
+    transcripts = list(
+        db_functions.iter_collection(
+            db_model=db_models.Transcript,
+            credentials_file=credentials_file,
+            load_references=False,
+            filters=[
+                ("created", ">", index_state.watermark - INDEX_WATERMARK_OVERLAP),
+            ],
+        )
+    )
+    db_functions.ReferenceResolver(credentials_file=credentials_file).resolve(
+        transcripts
     )
 
-    # Store tfidf
-    n_grams["tfidf"] = n_grams.tf * n_grams.idf
+    log.info(
+        f"Found {len(transcripts)} transcripts created since: {index_state.watermark}"
+    )
+    return transcripts
 
-    # Drop terms worth nothing
-    n_grams = n_grams[n_grams.tfidf != 0]
-
-    # Add datetime weighted tfidf
-    UTCNOW = datetime.utcnow()
-    UTCNOW = pytz.timezone("UTC").localize(UTCNOW)
-    n_grams["datetime_weighted_tfidf"] = n_grams.apply(
-        # Unit of decay is in months (`/ 30`)
-        # `+ 2` protects against divison by zero
-        lambda row: row.tfidf
-        / math.log(
-            ((UTCNOW - row.event_datetime).days / datetime_weighting_days_decay) + 2
-        ),
-        axis=1,
+
+@task(nout=2)
+def get_updated_event_transcripts(
+    transcripts: List[db_models.Transcript],
+    index_state: EventIndexState,
+) -> Tuple[EventIndexState, List[EventTranscripts]]:
+    """
+    Update the selected transcript of each session with the new transcripts and
+    group the selected transcripts of every event with a new selection.
+
+    Transcripts of the updated events that were selected in previous runs are only
+    created with the file details required to read them. The provided index state
+    is not changed, the updated copy is returned with the event transcripts.
+    """
+    index_state = index_state.copy()
+    updated_event_ids = index_state.select_transcripts(transcripts)
+    log.info(f"Events with new selected transcripts: {len(updated_event_ids)}")
+
+    new_transcripts = {transcript.id: transcript for transcript in transcripts}
+    events = {
+        transcript.session_ref.event_ref.id: transcript.session_ref.event_ref
+        for transcript in transcripts
+    }
+
+    event_transcripts: List[EventTranscripts] = []
+    for event_id, selections in index_state.get_selected_transcripts(
+        updated_event_ids
+    ).items():
+        selected_transcripts: List[db_models.Transcript] = []
+        for selected in selections:
+            if selected.transcript_id in new_transcripts:
+                selected_transcripts.append(new_transcripts[selected.transcript_id])
+            else:
+                db_file = db_models.File()
+                db_file.name = selected.file_name
+                db_file.uri = selected.file_uri
+
+                transcript = db_models.Transcript()
+                transcript.id = selected.transcript_id
+                transcript.confidence = selected.confidence
+                transcript.file_ref = db_file
+                selected_transcripts.append(transcript)
+
+        event_transcripts.append(
+            EventTranscripts(event=events[event_id], transcripts=selected_transcripts)
+        )
+
+    return index_state, event_transcripts
+
+
+@task(nout=2)
+def update_index_state_and_score(
+    index_state: EventIndexState,
+    event_transcripts: List[EventTranscripts],
+    n_grams_df: pd.DataFrame,
+    datetime_weighting_days_decay: int = 30,
+) -> Tuple[EventIndexState, pd.DataFrame]:
+    """
+    Replace the postings of the updated events in a copy of the index state and
+    compute the tfidf and weighted tfidf values of all postings.
+    """
+    index_state = index_state.copy()
+    index_state.update_postings(
+        event_ids=[et.event.id for et in event_transcripts],
+        n_grams=n_grams_df,
+    )
+    return index_state, index_state.score(
+        datetime_weighting_days_decay=datetime_weighting_days_decay,
     )
 
-    return n_grams
+
+@task
+def get_postings_to_store(
+    index_state: EventIndexState,
+    scored_postings: pd.DataFrame,
+    event_transcripts: List[EventTranscripts],
+    credentials_file: str,
+    rescore_tolerance: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Select the postings that have to be stored again and attach their event refs.
+
+    Event models of updated events come with the new transcripts, all others are
+    read from the database in batches.
+    """
+    postings = index_state.get_postings_to_store(
+        scored_postings=scored_postings,
+        event_ids=[et.event.id for et in event_transcripts],
+        tolerance=rescore_tolerance,
+    )
+    log.info(
+        f"Storing {len(postings)} of {len(scored_postings)} scored postings "
+        f"({len(event_transcripts)} updated events)"
+    )
+
+    events: Dict[str, db_models.Event] = {
+        et.event.id: et.event for et in event_transcripts
+    }
+    missing_event_ids = set(postings.event_id) - set(events)
+    if len(missing_event_ids) > 0:
+        events.update(
+            db_functions.ReferenceResolver(credentials_file=credentials_file).get(
+                db_models.Event, missing_event_ids
+            )
+        )
+
+    postings = postings[postings.event_id.isin(set(events))].copy()
+    postings["event_ref"] = postings.event_id.map(events)
+    return postings
+
+
+@task
+def save_index_state(
+    index_state: EventIndexState,
+    stored_postings: pd.DataFrame,
+) -> None:
+    """
+    Record the stored postings in a copy of the index state and store it.
+
+    Must only run once all postings were stored.
+    """
+    index_state = index_state.copy()
+    index_state.mark_stored(stored_postings)
+    index_state.save()
+
+
+@task
+def store_stem_vocabulary(stem_vocabulary_path: str) -> None:
+    """
+    Store the shared stem cache to the stem vocabulary file for later runs.
+
+    The cache is warmed from the file first so that its stems are kept, and the
+    file isn't stored again when no new term was stemmed.
+    """
+    stem_cache = get_stem_cache(stem_vocabulary_path)
+    if stem_cache.misses == 0:
+        log.info(f"No new stems to store to: '{stem_vocabulary_path}'")
+        return
+
+    stem_cache.save(stem_vocabulary_path)
 
 
 @task
 def store_local_index(n_grams_df: pd.DataFrame, n_grams: int) -> None:
-    n_grams_df = n_grams_df.drop(columns=["event_ref"])
+    n_grams_df = n_grams_df.drop(columns=["event_ref"], errors="ignore")
     n_grams_df.to_parquet(f"tfidf-{n_grams}.parquet")
 
 
@@ -411,6 +636,7 @@ def create_event_index_pipeline(
     config: EventIndexPipelineConfig,
     n_grams: int = 1,
     store_local: bool = False,
+    incremental: bool = False,
 ) -> Flow:
     """
     Create the Prefect Flow object to preview, run, or visualize for indexing
@@ -427,12 +653,26 @@ def create_event_index_pipeline(
         Storing the local index is useful for testing search result rankings with the
         `search_cdp_events` bin script.
         Default: False (store to database)
+    incremental: bool
+        Should only the events with transcripts created since the previous
+        incremental run be read and indexed again. Term and document frequencies
+        are persisted between runs (see EventIndexState) and only the postings of
+        updated events, and those whose scores moved by more than the configured
+        rescore tolerance, are stored.
+        Default: False (index all events)
 
     Returns
     -------
     flow: Flow
         The constructed CDP Event Index Pipeline as a Prefect Flow.
     """
+    if incremental:
+        return _create_incremental_event_index_pipeline(
+            config=config,
+            n_grams=n_grams,
+            store_local=store_local,
+        )
+
     with Flow("CDP Event Index Pipeline") as flow:
         # Get all transcripts
         all_transcripts = get_transcripts(
@@ -452,8 +692,16 @@ def create_event_index_pipeline(
             event_transcripts=event_transcripts,
             n_grams=unmapped(n_grams),
             credentials_file=unmapped(config.google_credentials_file),
+            stem_vocabulary_path=unmapped(config.stem_vocabulary_path),
         )
 
+        # Keep the stems for later runs
+        if config.stem_vocabulary_path is not None:
+            store_stem_vocabulary(
+                stem_vocabulary_path=config.stem_vocabulary_path,
+                upstream_tasks=[all_event_transcript_n_grams],
+            )
+
         # Convert to dataframe for tfidf calc
         all_events_n_grams = convert_all_n_grams_to_dataframe(
             all_events_n_grams=all_event_transcript_n_grams,
@@ -478,3 +726,83 @@ def create_event_index_pipeline(
             )
 
     return flow
+
+
+def _create_incremental_event_index_pipeline(
+    config: EventIndexPipelineConfig,
+    n_grams: int = 1,
+    store_local: bool = False,
+) -> Flow:
+    with Flow("CDP Incremental Event Index Pipeline") as flow:
+        index_state = load_index_state(
+            config=config,
+            n_grams=n_grams,
+            store_local=store_local,
+        )
+
+        # Get the transcripts created since the last run
+        new_transcripts = get_transcripts_created_after_watermark(
+            index_state=index_state,
+            credentials_file=config.google_credentials_file,
+        )
+
+        # Get all transcripts for each event with a new selected transcript
+        selected_index_state, event_transcripts = get_updated_event_transcripts(
+            transcripts=new_transcripts,
+            index_state=index_state,
+        )
+
+        # Read all transcripts for each updated event and generate grams
+        all_event_transcript_n_grams = read_transcripts_and_generate_grams.map(
+            event_transcripts=event_transcripts,
+            n_grams=unmapped(n_grams),
+            credentials_file=unmapped(config.google_credentials_file),
+            stem_vocabulary_path=unmapped(config.stem_vocabulary_path),
+        )
+
+        # Keep the stems for later runs
+        if config.stem_vocabulary_path is not None:
+            store_stem_vocabulary(
+                stem_vocabulary_path=config.stem_vocabulary_path,
+                upstream_tasks=[all_event_transcript_n_grams],
+            )
+        all_events_n_grams = convert_all_n_grams_to_dataframe(
+            all_events_n_grams=all_event_transcript_n_grams,
+        )
+
+        # Update the persisted frequencies and weight all n grams by tfidf
+        updated_index_state, scored_n_grams = update_index_state_and_score(
+            index_state=selected_index_state,
+            event_transcripts=event_transcripts,
+            n_grams_df=all_events_n_grams,
+            datetime_weighting_days_decay=config.datetime_weighting_days_decay,
+        )
+
+        # The local index is always fully rewritten
+        if store_local:
+            stored_n_grams = scored_n_grams
+            stored = store_local_index(n_grams_df=scored_n_grams, n_grams=n_grams)
+
+        # Only upload the postings that changed
+        else:
+            stored_n_grams = get_postings_to_store(
+                index_state=updated_index_state,
+                scored_postings=scored_n_grams,
+                event_transcripts=event_transcripts,
+                credentials_file=config.google_credentials_file,
+                rescore_tolerance=config.rescore_tolerance,
+            )
+            chunked_scored_n_grams = chunk_n_grams(stored_n_grams)
+            stored = store_n_gram_chunk.map(
+                n_gram_chunk=chunked_scored_n_grams,
+                credentials_file=unmapped(config.google_credentials_file),
+            )
+
+        # Only persist the state once everything was stored
+        save_index_state(
+            index_state=updated_index_state,
+            stored_postings=stored_n_grams,
+            upstream_tasks=[stored],
+        )
+
+    return flow
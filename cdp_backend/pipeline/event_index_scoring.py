@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+_NANOSECONDS_PER_DAY = 24 * 60 * 60 * 10**9
+
+###############################################################################
+
+
+class TfidfScores(NamedTuple):
+    # A value per posting (event and stemmed gram), in the order of the postings
+    df: np.ndarray
+    idf: np.ndarray
+    tfidf: np.ndarray
+    datetime_weighted_tfidf: np.ndarray
+
+
+def compute_tfidf_scores(
+    event_ids: pd.Series,
+    stemmed_grams: pd.Series,
+    tfs: pd.Series,
+    event_datetimes: pd.Series,
+    datetime_weighting_days_decay: int = 30,
+    now: Optional[datetime] = None,
+    document_frequencies: Optional[pd.Series] = None,
+) -> TfidfScores:
+    """
+    Compute the document frequency, inverse document frequency, tfidf, and datetime
+    weighted tfidf values of postings.
+
+    Event ids and stemmed grams are integer coded so that document frequencies are
+    counted, and datetime weights computed, with NumPy operations over codes
+    instead of grouping and applying Python functions per row.
+
+    Parameters
+    ----------
+    event_ids: pd.Series
+        The event id of each posting.
+    stemmed_grams: pd.Series
+        The stemmed gram of each posting. A stemmed gram must only have a single
+        posting per event.
+    tfs: pd.Series
+        The term frequency of each posting.
+    event_datetimes: pd.Series
+        The event datetime of each posting. Naive datetimes are treated as UTC.
+    datetime_weighting_days_decay: int
+        The number of days that grams from an event should be labeled as more
+        relevant.
+        Default: 30
+    now: Optional[datetime]
+        The datetime to weight the event datetimes against.
+        Default: None (now)
+    document_frequencies: Optional[pd.Series]
+        The number of events each stemmed gram is found in, indexed by stemmed gram.
+        Default: None (count from the postings)
+
+    Returns
+    -------
+    scores: TfidfScores
+        The scores of each posting.
+    """
+    # Integer code the events and grams
+    event_codes, unique_event_ids = pd.factorize(event_ids)
+    gram_codes, unique_stemmed_grams = pd.factorize(stemmed_grams)
+
+    # Get idf
+    if document_frequencies is None:
+        gram_document_frequencies = np.bincount(
+            gram_codes, minlength=len(unique_stemmed_grams)
+        )
+    else:
+        gram_document_frequencies = document_frequencies.reindex(
+            unique_stemmed_grams
+        ).to_numpy()
+    df = gram_document_frequencies[gram_codes]
+    idf = np.log(len(unique_event_ids) / df)
+
+    # Store tfidf
+    tfidf = np.asarray(tfs, dtype="float64") * idf
+
+    # Get the datetime weight of each event once
+    # Unit of decay is in months (`/ 30`)
+    # `+ 2` protects against divison by zero
+    _, first_event_rows = np.unique(event_codes, return_index=True)
+    event_nanoseconds = (
+        pd.to_datetime(event_datetimes.iloc[first_event_rows], utc=True)
+        .to_numpy(dtype="datetime64[ns]")
+        .astype("int64")
+    )
+    now_timestamp = pd.Timestamp(datetime.now(timezone.utc) if now is None else now)
+    if now_timestamp.tzinfo is None:
+        now_timestamp = now_timestamp.tz_localize("UTC")
+    event_days = (now_timestamp.value - event_nanoseconds) // _NANOSECONDS_PER_DAY
+    event_weights = np.log((event_days / datetime_weighting_days_decay) + 2)
+
+    return TfidfScores(
+        df=df,
+        idf=idf,
+        tfidf=tfidf,
+        datetime_weighted_tfidf=tfidf / event_weights[event_codes],
+    )
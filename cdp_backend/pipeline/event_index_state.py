@@ -0,0 +1,399 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+import numpy as np
+import pandas as pd
+from fsspec.core import url_to_fs
+from fsspec.spec import AbstractFileSystem
+
+from ..database import models as db_models
+from .event_index_scoring import compute_tfidf_scores
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+STATE_FILENAME = "state.json"
+POSTINGS_FILENAME = "postings.parquet"
+DOCUMENT_FREQUENCIES_FILENAME = "document-frequencies.parquet"
+
+# A single row per (event, stemmed gram)
+POSTING_KEY = ["event_id", "stemmed_gram"]
+POSTING_COLUMNS = [
+    "event_id",
+    "event_datetime",
+    "unstemmed_gram",
+    "stemmed_gram",
+    "context_span",
+    "tf",
+]
+# The document frequency and scores last stored for each posting
+STORED_COLUMNS = ["stored_df", "stored_tfidf", "stored_datetime_weighted_tfidf"]
+
+###############################################################################
+
+
+class SelectedTranscript(NamedTuple):
+    transcript_id: str
+    confidence: float
+    event_id: str
+    file_name: str
+    file_uri: str
+
+
+def _to_utc(dt: datetime) -> datetime:
+    # Firestore returns timezone aware datetimes, naive datetimes are treated as UTC
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+
+    return dt.astimezone(timezone.utc)
+
+
+class EventIndexState:
+    """
+    The persisted state of an event index, used to index events incrementally.
+
+    Stores the transcript selected for each session, the term frequency of every
+    (event, stemmed gram) posting, the document frequency of every stemmed gram,
+    and the creation datetime of the newest indexed transcript (the watermark).
+    With it, only the events with a new selected transcript have to be read and
+    tokenized again, and only the postings whose scores changed have to be stored
+    again.
+
+    Parameters
+    ----------
+    storage_path: str
+        The directory (on the provided file system) to store the state in.
+    fs: Optional[AbstractFileSystem]
+        The file system to store the state on.
+        Default: None (the file system inferred from storage_path)
+
+    Examples
+    --------
+    >>> fs = fs_functions.initialize_gcs_file_system(credentials_file)
+    >>> state = EventIndexState(f"{bucket}/index-state/1-grams", fs=fs)
+    >>> state.load()
+    >>> updated_event_ids = state.select_transcripts(new_transcripts)
+    """
+
+    def __init__(self, storage_path: str, fs: Optional[AbstractFileSystem] = None):
+        if fs is None:
+            fs, storage_path = url_to_fs(storage_path)
+
+        self.fs = fs
+        self.storage_path = storage_path.rstrip("/")
+
+        self.watermark: Optional[datetime] = None
+        self.selected_transcripts: Dict[str, SelectedTranscript] = {}
+        self.postings = pd.DataFrame(columns=POSTING_COLUMNS + STORED_COLUMNS)
+        self.document_frequencies = pd.Series(dtype="int64", name="df")
+
+    def copy(self) -> "EventIndexState":
+        """
+        Copy the state so that it can be updated without changing this state.
+
+        Returns
+        -------
+        state: EventIndexState
+            The copied state, stored at the same path.
+        """
+        state = EventIndexState(self.storage_path, fs=self.fs)
+        state.watermark = self.watermark
+        state.selected_transcripts = dict(self.selected_transcripts)
+        state.postings = self.postings.copy()
+        state.document_frequencies = self.document_frequencies.copy()
+        return state
+
+    def _get_path(self, filename: str) -> str:
+        return f"{self.storage_path}/{filename}"
+
+    def load(self) -> bool:
+        """
+        Load the stored state if it exists.
+
+        Returns
+        -------
+        loaded: bool
+            Whether a stored state was found and loaded.
+        """
+        if not self.fs.exists(self._get_path(STATE_FILENAME)):
+            log.info(f"No event index state found at: '{self.storage_path}'")
+            return False
+
+        with self.fs.open(self._get_path(STATE_FILENAME), "r") as open_f:
+            state = json.load(open_f)
+        with self.fs.open(self._get_path(POSTINGS_FILENAME), "rb") as open_f:
+            self.postings = pd.read_parquet(open_f)
+        with self.fs.open(
+            self._get_path(DOCUMENT_FREQUENCIES_FILENAME), "rb"
+        ) as open_f:
+            self.document_frequencies = pd.read_parquet(open_f).df
+
+        self.watermark = (
+            None
+            if state["watermark"] is None
+            else datetime.fromisoformat(state["watermark"])
+        )
+        self.selected_transcripts = {
+            session_id: SelectedTranscript(**selected)
+            for session_id, selected in state["selected_transcripts"].items()
+        }
+
+        log.info(
+            f"Loaded event index state with {len(self.postings)} postings "
+            f"(watermark: {self.watermark})"
+        )
+        return True
+
+    def save(self) -> None:
+        """
+        Store the state, replacing any previously stored state.
+        """
+        self.fs.makedirs(self.storage_path, exist_ok=True)
+
+        with self.fs.open(self._get_path(POSTINGS_FILENAME), "wb") as open_f:
+            self.postings.to_parquet(open_f, index=False)
+        with self.fs.open(
+            self._get_path(DOCUMENT_FREQUENCIES_FILENAME), "wb"
+        ) as open_f:
+            self.document_frequencies.to_frame().to_parquet(open_f)
+
+        # Written last so that a partially stored state is never loaded as complete
+        with self.fs.open(self._get_path(STATE_FILENAME), "w") as open_f:
+            json.dump(
+                {
+                    "watermark": (
+                        None if self.watermark is None else self.watermark.isoformat()
+                    ),
+                    "selected_transcripts": {
+                        session_id: selected._asdict()
+                        for session_id, selected in self.selected_transcripts.items()
+                    },
+                },
+                open_f,
+            )
+
+    def select_transcripts(
+        self,
+        transcripts: Iterable[db_models.Transcript],
+    ) -> Set[str]:
+        """
+        Update the selected (highest confidence) transcript of each session with
+        new transcripts and advance the watermark.
+
+        Parameters
+        ----------
+        transcripts: Iterable[db_models.Transcript]
+            The new transcripts with their session and event references loaded.
+
+        Returns
+        -------
+        event_ids: Set[str]
+            The ids of the events that have a new selected transcript.
+        """
+        event_ids: Set[str] = set()
+        for transcript in transcripts:
+            session_id = transcript.session_ref.id
+            selected = self.selected_transcripts.get(session_id)
+            if selected is None or (
+                transcript.id != selected.transcript_id
+                and transcript.confidence > selected.confidence
+            ):
+                self.selected_transcripts[session_id] = SelectedTranscript(
+                    transcript_id=transcript.id,
+                    confidence=transcript.confidence,
+                    event_id=transcript.session_ref.event_ref.id,
+                    file_name=transcript.file_ref.name,
+                    file_uri=transcript.file_ref.uri,
+                )
+                event_ids.add(transcript.session_ref.event_ref.id)
+
+            if transcript.created is not None:
+                created = _to_utc(transcript.created)
+                if self.watermark is None or created > self.watermark:
+                    self.watermark = created
+
+        return event_ids
+
+    def get_selected_transcripts(
+        self,
+        event_ids: Iterable[str],
+    ) -> Dict[str, List[SelectedTranscript]]:
+        """
+        Get the selected transcripts of every session of events.
+
+        Parameters
+        ----------
+        event_ids: Iterable[str]
+            The ids of the events to get the selected transcripts of.
+
+        Returns
+        -------
+        selected_transcripts: Dict[str, List[SelectedTranscript]]
+            The selected transcripts mapped by event id.
+        """
+        event_selected_transcripts: Dict[str, List[SelectedTranscript]] = {
+            event_id: [] for event_id in event_ids
+        }
+        for selected in self.selected_transcripts.values():
+            if selected.event_id in event_selected_transcripts:
+                event_selected_transcripts[selected.event_id].append(selected)
+
+        return event_selected_transcripts
+
+    def update_postings(self, event_ids: Iterable[str], n_grams: pd.DataFrame) -> None:
+        """
+        Replace the postings of events and update the document frequencies.
+
+        Parameters
+        ----------
+        event_ids: Iterable[str]
+            The ids of the events that were indexed again.
+        n_grams: pd.DataFrame
+            The contextualized grams (with term frequencies) of the indexed events.
+        """
+        replaced = self.postings.event_id.isin(set(event_ids))
+
+        # Aggregate the grams into a posting per (event, stemmed gram)
+        # the first unstemmed gram and context span are kept as in a full index
+        if len(n_grams) == 0:
+            new_postings = pd.DataFrame(columns=POSTING_COLUMNS)
+        else:
+            new_postings = (
+                n_grams.groupby(POSTING_KEY, sort=False)
+                .agg(
+                    event_datetime=("event_datetime", "first"),
+                    unstemmed_gram=("unstemmed_gram", "first"),
+                    context_span=("context_span", "first"),
+                    tf=("tf", "sum"),
+                )
+                .reset_index()
+            )
+        for column in STORED_COLUMNS:
+            new_postings[column] = np.nan
+
+        # Remove the replaced postings from and add the new postings to the counts
+        document_frequencies = self.document_frequencies.sub(
+            self.postings[replaced].stemmed_gram.value_counts(),
+            fill_value=0,
+        ).add(new_postings.stemmed_gram.value_counts(), fill_value=0)
+        self.document_frequencies = (
+            document_frequencies[document_frequencies > 0].astype("int64").rename("df")
+        )
+
+        self.postings = pd.concat(
+            [self.postings[~replaced], new_postings[POSTING_COLUMNS + STORED_COLUMNS]],
+            ignore_index=True,
+        )
+        self.postings["event_datetime"] = pd.to_datetime(
+            self.postings.event_datetime, utc=True
+        )
+        self.postings["tf"] = self.postings.tf.astype("int64")
+
+    def score(
+        self,
+        datetime_weighting_days_decay: int = 30,
+        now: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """
+        Compute the tfidf and datetime weighted tfidf values of all postings.
+
+        Parameters
+        ----------
+        datetime_weighting_days_decay: int
+            The number of days that grams from an event should be labeled as more
+            relevant.
+            Default: 30
+        now: Optional[datetime]
+            The datetime to weight the event datetimes against.
+            Default: None (now)
+
+        Returns
+        -------
+        scored_postings: pd.DataFrame
+            All postings (indexed the same as the stored postings) worth something,
+            with df, idf, tfidf, and datetime_weighted_tfidf columns.
+        """
+        scored = self.postings[POSTING_COLUMNS]
+        scores = compute_tfidf_scores(
+            event_ids=scored.event_id,
+            stemmed_grams=scored.stemmed_gram,
+            tfs=scored.tf,
+            event_datetimes=scored.event_datetime,
+            datetime_weighting_days_decay=datetime_weighting_days_decay,
+            now=now,
+            document_frequencies=self.document_frequencies,
+        )
+        scored = scored.assign(
+            df=scores.df,
+            idf=scores.idf,
+            tfidf=scores.tfidf,
+            datetime_weighted_tfidf=scores.datetime_weighted_tfidf,
+        )
+
+        # Drop terms worth nothing
+        return scored[scored.tfidf != 0]
+
+    def get_postings_to_store(
+        self,
+        scored_postings: pd.DataFrame,
+        event_ids: Iterable[str],
+        tolerance: float = 0.0,
+    ) -> pd.DataFrame:
+        """
+        Select the scored postings that have to be stored.
+
+        All postings of the updated events and of the grams with a changed document
+        frequency are selected. Any other posting is only selected when one of its
+        scores moved (because of the number of events or the datetime weighting) by
+        more than the tolerance relative to the last stored score.
+
+        Parameters
+        ----------
+        scored_postings: pd.DataFrame
+            The scored postings (see score).
+        event_ids: Iterable[str]
+            The ids of the events that were indexed again.
+        tolerance: float
+            The relative change of a score under which it is not stored again.
+            Default: 0.0 (store every changed score)
+
+        Returns
+        -------
+        postings_to_store: pd.DataFrame
+            The selected scored postings.
+        """
+        stored = self.postings.loc[scored_postings.index, STORED_COLUMNS]
+
+        selected = scored_postings.event_id.isin(set(event_ids)) | (
+            scored_postings.df != stored.stored_df
+        )
+        for column, stored_column in zip(
+            ["tfidf", "datetime_weighted_tfidf"], STORED_COLUMNS[1:]
+        ):
+            drift = (scored_postings[column] - stored[stored_column]).abs()
+            selected |= stored[stored_column].isna() | (
+                drift > tolerance * stored[stored_column].abs()
+            )
+
+        return scored_postings[selected]
+
+    def mark_stored(self, stored_postings: pd.DataFrame) -> None:
+        """
+        Record the scores of postings that were stored.
+
+        Parameters
+        ----------
+        stored_postings: pd.DataFrame
+            The scored postings that were stored (see get_postings_to_store).
+        """
+        self.postings.loc[stored_postings.index, STORED_COLUMNS] = stored_postings[
+            ["df", "tfidf", "datetime_weighted_tfidf"]
+        ].to_numpy()
@@ -238,6 +238,7 @@ RANDOM_FLOW_CONFIG = EventGatherPipelineConfig(
     google_credentials_file="",
     get_events_function_path="cdp_backend.pipeline.mock_get_events.get_events",
     gcs_bucket_name="",
+    preflight_checks=False,
 )
 RANDOM_FLOW_CONFIG._validated_gcs_bucket_name = ""
 
@@ -252,6 +253,7 @@ MINIMAL_FLOW_CONFIG = EventGatherPipelineConfig(
     google_credentials_file="",
     get_events_function_path="cdp_backend.pipeline.mock_get_events.min_get_events",
     gcs_bucket_name="",
+    preflight_checks=False,
 )
 MINIMAL_FLOW_CONFIG._validated_gcs_bucket_name = ""
 
@@ -265,6 +267,7 @@ FILLED_FLOW_CONFIG = EventGatherPipelineConfig(
     google_credentials_file="",
     get_events_function_path="cdp_backend.pipeline.mock_get_events.filled_get_events",
     gcs_bucket_name="",
+    preflight_checks=False,
 )
 FILLED_FLOW_CONFIG._validated_gcs_bucket_name = ""
 
@@ -278,5 +281,6 @@ MANY_FLOW_CONFIG = EventGatherPipelineConfig(
     google_credentials_file="",
     get_events_function_path="cdp_backend.pipeline.mock_get_events.many_get_events",
     gcs_bucket_name="",
+    preflight_checks=False,
 )
 MANY_FLOW_CONFIG._validated_gcs_bucket_name = ""
@@ -3,10 +3,11 @@
 
 import json
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Dict, Optional
 
 from dataclasses_json import dataclass_json
-from gcsfs import GCSFileSystem
+
+from ..utils import client_registry
 
 ###############################################################################
 
@@ -35,6 +36,39 @@ class EventGatherPipelineConfig:
         Default number of days to subtract from current time to then pass to the
         provided get_events function as the `from_dt` datetime.
         Default: 2 (from_dt will be set to current datetime - 2 days)
+    stream_audio_only_sessions: bool
+        For sessions that only need audio from the video (the event provides the
+        thumbnails), stream the audio straight from the remote video URI to the
+        bucket instead of downloading the video. The videos must be streamable
+        (i.e. MP4 files with the "moov" atom at the start of the file).
+        Default: False
+    stage_concurrency_limits: Optional[Dict[str, int]]
+        Overrides for the maximum number of sessions that can be running each
+        processing stage (see concurrency_utils.PipelineStage) at the same time.
+        A limit of zero means the stage is unbounded.
+        Default: None (use concurrency_utils.DEFAULT_STAGE_LIMITS)
+    preflight_checks: bool
+        Before creating the flow, check the file store for sessions that were already
+        processed (and the database for events and sessions that were already
+        stored) so that processed sessions skip every processing stage.
+        Default: True
+    skip_stored_events: bool
+        Leave out events that are already stored and have every session already
+        processed and stored. Note: changes to a stored event (i.e. new votes or
+        minutes items) will not be stored.
+        Default: False (store all events again)
+    database_write_cache_path: Optional[str]
+        Path to a local SQLite file to record the documents written to the database
+        in. Documents that are known to be stored with the same content are not
+        written again by later runs. See bin/refresh_cdp_write_cache.py to invalidate.
+        Default: None (write every document)
+    media_cache_dir: Optional[str]
+        The directory to cache downloaded session videos in.
+        Default: None (a "cdp-media-cache" directory in the system temp directory)
+    media_cache_max_bytes: Optional[int]
+        The disk quota for the cached session videos, the least recently used videos
+        are removed to stay under it.
+        Default: None (20 GiB)
     """
 
     google_credentials_file: str
@@ -48,6 +82,13 @@ class EventGatherPipelineConfig:
     caption_new_speaker_turn_pattern: Optional[str] = None
     caption_confidence: Optional[float] = None
     default_event_gather_from_days_timedelta: int = 2
+    stream_audio_only_sessions: bool = False
+    stage_concurrency_limits: Optional[Dict[str, int]] = None
+    preflight_checks: bool = True
+    skip_stored_events: bool = False
+    database_write_cache_path: Optional[str] = None
+    media_cache_dir: Optional[str] = None
+    media_cache_max_bytes: Optional[int] = None
 
     @property
     def validated_gcs_bucket_name(self) -> str:
@@ -65,7 +106,7 @@ class EventGatherPipelineConfig:
                 bucket = f"{project_id}.appspot.com"
 
             # Validate
-            fs = GCSFileSystem(token=self.google_credentials_file)
+            fs = client_registry.get_gcs_file_system(self.google_credentials_file)
             try:
                 fs.ls(bucket)
                 self._validated_gcs_bucket_name = bucket
@@ -95,6 +136,14 @@ class EventIndexPipelineConfig:
         The number of days that grams from an event should be labeled as more relevant.
         Default: 30 (grams from events less than 30 days old will generally be valued
         higher than their pure relevance score)
+    rescore_tolerance: float
+        When indexing incrementally, the relative change of an unchanged event's gram
+        score under which the gram is not stored again.
+        Default: 0.05 (scores that moved by less than 5% are not stored again)
+    stem_vocabulary_path: Optional[str]
+        Path (or fsspec URI) to a stem vocabulary file. The shared stem cache is warmed
+        from the file before indexing and the file is updated after indexing.
+        Default: None (the stem cache starts empty and isn't stored)
     """
 
     google_credentials_file: str
@@ -105,6 +154,8 @@ class EventIndexPipelineConfig:
         default=None,
     )
     datetime_weighting_days_decay: int = 30
+    rescore_tolerance: float = 0.05
+    stem_vocabulary_path: Optional[str] = None
 
     @property
     def validated_gcs_bucket_name(self) -> str:
@@ -122,7 +173,7 @@ class EventIndexPipelineConfig:
                 bucket = f"{project_id}.appspot.com"
 
             # Validate
-            fs = GCSFileSystem(token=self.google_credentials_file)
+            fs = client_registry.get_gcs_file_system(self.google_credentials_file)
             try:
                 fs.ls(bucket)
                 self._validated_gcs_bucket_name = bucket
@@ -10,6 +10,7 @@ from google.cloud import speech_v1p1beta1 as speech
 from spacy.lang.en import English
 
 from ..pipeline import transcript_model
+from ..utils.phrase_budget import PhraseBudget
 from ..version import __version__
 from .sr_model import SRModel
 
@@ -26,24 +27,22 @@ class GoogleCloudSRModel(SRModel):
         self.credentials_file = Path(credentials_file).resolve(strict=True)
 
     @staticmethod
-    def _clean_phrases(phrases: Optional[List[str]] = None) -> List[str]:
-        if phrases:
-            # Clean and apply usage limits
-            cleaned = []
-            total_character_count = 0
-            for phrase in [p for p in phrases[:500] if isinstance(p, str)]:
-                if total_character_count <= 9900:
-                    cleaned_phrase = phrase[:100]
+    def _clean_phrase(phrase: str) -> str:
+        cleaned_phrase = phrase[:100]
 
-                    # Make the phrase a bit nicer by chunking to nearest complete word
-                    if " " in cleaned_phrase:
-                        cleaned_phrase = cleaned_phrase[: cleaned_phrase.rfind(" ")]
+        # Make the phrase a bit nicer by chunking to nearest complete word
+        if " " in cleaned_phrase:
+            cleaned_phrase = cleaned_phrase[: cleaned_phrase.rfind(" ")]
 
-                    # Append cleaned phrase and increase character count
-                    cleaned.append(cleaned_phrase)
-                    total_character_count += len(cleaned_phrase)
+        return cleaned_phrase
 
-            return cleaned
+    @staticmethod
+    def _clean_phrases(phrases: Optional[List[str]] = None) -> List[str]:
+        if phrases:
+            # Clean and apply usage limits
+            budget = PhraseBudget(clean_phrase=GoogleCloudSRModel._clean_phrase)
+            budget.extend(phrases)
+            return budget.phrases
         return []
 
     def transcribe(
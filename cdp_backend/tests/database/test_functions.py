@@ -1,11 +1,20 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+from unittest import mock
+from unittest.mock import MagicMock
+
 import pytest
 from fireo.models import Model
+from fireo.queries.query_wrapper import ReferenceDocLoader
 
 from cdp_backend.database import functions as db_functions
 from cdp_backend.database import models as db_models
+from cdp_backend.database.write_cache import DocumentWriteCache
+from cdp_backend.pipeline import ingestion_models
 
 ###############################################################################
 # Tests
@@ -34,6 +43,217 @@ def test_generate_and_attach_doc_hash_as_id(model: Model, expected_id: str) -> N
     assert updated_model.id == expected_id
 
 
+def test_generate_and_attach_doc_hash_as_id_memoized() -> None:
+    body = db_models.Body()
+    body.name = "Body A"
+    event = db_models.Event()
+    event.body_ref = body
+    event.event_datetime = datetime(2021, 1, 1)
+
+    event_id = db_functions.generate_and_attach_doc_hash_as_id(event).id
+    assert db_functions.generate_and_attach_doc_hash_as_id(event).id == event_id
+    assert body.id == "0a8a8e139258"
+
+    # Reassigning a primary key of the referenced model changes both ids
+    body.name = "Body B"
+    assert db_functions.generate_and_attach_doc_hash_as_id(event).id != event_id
+    assert body.id == "1535fef479ff"
+
+    # And reassigning it back restores them
+    body.name = "Body A"
+    assert db_functions.generate_and_attach_doc_hash_as_id(event).id == event_id
+
+
+@mock.patch("cdp_backend.database.functions.upload_db_model")
+@mock.patch("cdp_backend.database.functions.client_registry")
+@mock.patch("cdp_backend.database.functions.fireo")
+def test_batched_write_planner(
+    mock_fireo: MagicMock,
+    mock_client_registry: MagicMock,
+    mock_upload_db_model: MagicMock,
+) -> None:
+    mock_fireo.batch.side_effect = lambda: MagicMock()
+    planner = db_functions.BatchedWritePlanner(
+        "fake/credentials.json", max_batch_size=2
+    )
+
+    # Three independent models (two batches) and one that references another
+    planned_bodies = [
+        planner.add(db_functions.create_body(body=body, start_datetime=datetime.now()))
+        for body in [
+            ingestion_models.Body(name="Body A"),
+            ingestion_models.Body(name="Body B"),
+            ingestion_models.Body(name="Body C"),
+        ]
+    ]
+    planner.add(
+        db_functions.create_event(
+            body_ref=planned_bodies[0],
+            event_datetime=datetime.now(),
+        )
+    )
+
+    # Ids are attached before anything is written
+    assert all(body.id is not None for body in planned_bodies)
+
+    # Body batches are planned before the event batch
+    batches = [call.kwargs["batch"] for call in mock_upload_db_model.call_args_list]
+    assert len(set(map(id, batches))) == 3
+    assert batches[0] is batches[1]
+    assert batches[2] is not batches[3]
+
+    planner.commit()
+    for batch in batches:
+        batch.commit.assert_called_once()
+
+
+@mock.patch("cdp_backend.database.functions.upload_db_model")
+@mock.patch("cdp_backend.database.functions.client_registry")
+@mock.patch("cdp_backend.database.functions.fireo")
+def test_batched_write_planner_write_cache(
+    mock_fireo: MagicMock,
+    mock_client_registry: MagicMock,
+    mock_upload_db_model: MagicMock,
+    tmpdir: Path,
+) -> None:
+    write_cache = DocumentWriteCache(Path(tmpdir) / "write-cache.sqlite")
+
+    # First run writes and records the document
+    body = ingestion_models.Body(name="Body A")
+    start_datetime = datetime(2020, 1, 1)
+    planner = db_functions.BatchedWritePlanner(
+        "fake/credentials.json", write_cache=write_cache
+    )
+    planner.add(db_functions.create_body(body=body, start_datetime=start_datetime))
+    planner.commit()
+    assert mock_upload_db_model.call_count == 1
+
+    # Second run skips the unchanged document but writes the changed one
+    planner.add(db_functions.create_body(body=body, start_datetime=start_datetime))
+    planner.add(
+        db_functions.create_body(body=body, start_datetime=datetime(2021, 1, 1))
+    )
+    planner.commit()
+    assert mock_upload_db_model.call_count == 2
+
+
+def _make_doc(doc_id: str, doc_dict: Dict[str, Any]) -> MagicMock:
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.to_dict.return_value = doc_dict
+    return doc
+
+
+@mock.patch("cdp_backend.database.functions.client_registry")
+@mock.patch("cdp_backend.database.functions.fireo_db")
+def test_iter_collection(
+    mock_fireo_db: MagicMock,
+    mock_client_registry: MagicMock,
+) -> None:
+    session_ref = MagicMock()
+    pages = [
+        [
+            _make_doc("a", {"confidence": 0.9, "session_ref": session_ref}),
+            _make_doc("b", {"confidence": 0.8, "session_ref": session_ref}),
+        ],
+        [_make_doc("c", {"confidence": 0.7})],
+    ]
+    query = (
+        mock_fireo_db.conn.collection.return_value.order_by.return_value.limit
+    ).return_value
+    query.select.return_value = query
+    query.stream.return_value = iter(pages[0])
+    query.start_after.return_value.stream.return_value = iter(pages[1])
+
+    transcripts = db_functions.iter_collection(
+        db_models.Transcript,
+        "fake/credentials.json",
+        page_size=2,
+        fields=["confidence", "session_ref"],
+        load_references=False,
+    )
+
+    # Nothing is requested until iterated
+    query.stream.assert_not_called()
+    transcripts = list(transcripts)
+
+    assert [transcript.id for transcript in transcripts] == ["a", "b", "c"]
+    assert [transcript.confidence for transcript in transcripts] == [0.9, 0.8, 0.7]
+    query.select.assert_called_once_with(["confidence", "session_ref"])
+    query.start_after.assert_called_once_with(pages[0][-1])
+
+    # References are left unloaded
+    assert isinstance(transcripts[0].session_ref, ReferenceDocLoader)
+    assert transcripts[2].session_ref is None
+
+
+def _make_loader(model: Model, field_name: str, path: str) -> ReferenceDocLoader:
+    ref = MagicMock()
+    ref.path = path
+    return ReferenceDocLoader(model, model._meta.get_field(field_name), ref)
+
+
+@mock.patch("cdp_backend.database.functions.client_registry")
+@mock.patch("cdp_backend.database.functions.fireo_db")
+def test_reference_resolver(
+    mock_fireo_db: MagicMock,
+    mock_client_registry: MagicMock,
+) -> None:
+    # Two transcripts of the same session
+    transcripts = [db_models.Transcript(), db_models.Transcript()]
+    for transcript in transcripts:
+        transcript.session_ref = _make_loader(transcript, "session_ref", "session/s")
+
+    # The session references an event
+    event_doc = _make_doc("e", {"agenda_uri": "ex://agenda.pdf"})
+    event_doc.reference.path = "event/e"
+    session_doc = _make_doc("s", {"session_index": 0, "event_ref": event_doc.reference})
+    session_doc.reference.path = "session/s"
+    docs = {"session/s": session_doc, "event/e": event_doc}
+    mock_fireo_db.conn.get_all.side_effect = lambda refs: [
+        docs[ref.path] for ref in refs
+    ]
+
+    db_functions.ReferenceResolver("fake/credentials.json").resolve(transcripts)
+
+    # Each level is a single batched read and each document is read once
+    assert mock_fireo_db.conn.get_all.call_count == 2
+    assert transcripts[0].session_ref is transcripts[1].session_ref
+    assert transcripts[0].session_ref.id == "s"
+    assert transcripts[0].session_ref.event_ref.id == "e"
+    assert transcripts[0].session_ref.event_ref.agenda_uri == "ex://agenda.pdf"
+
+
+@mock.patch("cdp_backend.database.functions.client_registry")
+@mock.patch("cdp_backend.database.functions.fireo_db")
+def test_reference_resolver_get(
+    mock_fireo_db: MagicMock,
+    mock_client_registry: MagicMock,
+) -> None:
+    body_doc = _make_doc("b", {"name": "Full Council"})
+    body_doc.reference.path = "body/b"
+    event_doc = _make_doc("e", {"body_ref": body_doc.reference})
+    event_doc.reference.path = "event/e"
+    missing_doc = _make_doc("m", {})
+    missing_doc.reference.path = "event/m"
+    missing_doc.exists = False
+    docs = {"body/b": body_doc, "event/e": event_doc, "event/m": missing_doc}
+    mock_fireo_db.conn.get_all.side_effect = lambda refs: [
+        docs[ref.path] for ref in refs
+    ]
+    mock_fireo_db.conn.collection.return_value.document.side_effect = (
+        lambda doc_id: MagicMock(path=f"event/{doc_id}")
+    )
+
+    events = db_functions.ReferenceResolver("fake/credentials.json").get(
+        db_models.Event, ["e", "m"]
+    )
+
+    # Missing documents are left out and references are resolved
+    assert list(events) == ["e"]
+    assert events["e"].body_ref.name == "Full Council"
+
+
 ###############################################################################
 
 # Only test functions that do something besides parameter unpacking and assigning
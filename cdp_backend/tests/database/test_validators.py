@@ -116,6 +116,7 @@ def test_remote_resource_exists(
     gcsfs_exists: Optional[bool],
     kwargs: Optional[Dict],
 ) -> None:
+    validators.clear_resource_exists_cache()
     with mock.patch("gcsfs.credentials.GoogleCredentials.connect"):
         with mock.patch("gcsfs.GCSFileSystem.exists") as mock_exists:
             mock_exists.return_value = gcsfs_exists
@@ -126,6 +127,28 @@ def test_remote_resource_exists(
 
             assert actual_result == expected_result
 
+    validators.clear_resource_exists_cache()
+
+
+def test_prevalidate_resources() -> None:
+    validators.clear_resource_exists_cache()
+    with mock.patch(
+        "cdp_backend.database.validators._resource_exists"
+    ) as mock_resource_exists:
+        mock_resource_exists.side_effect = lambda uri, creds: uri == __file__
+        statuses = validators.prevalidate_resources(
+            [__file__, None, "file://does-not-exist.txt", __file__]
+        )
+        assert statuses == {__file__: True, "file://does-not-exist.txt": False}
+        assert mock_resource_exists.call_count == 2
+
+        # Later validations are answered from the cache
+        assert validators.resource_exists(__file__)
+        assert not validators.resource_exists("file://does-not-exist.txt")
+        assert mock_resource_exists.call_count == 2
+
+    validators.clear_resource_exists_cache()
+
 
 @pytest.mark.parametrize(
     "decision, expected_result",
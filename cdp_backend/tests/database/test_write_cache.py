@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+from cdp_backend.database import functions as db_functions
+from cdp_backend.database import models as db_models
+from cdp_backend.database.write_cache import (
+    DocumentWriteCache,
+    get_document_fingerprint,
+)
+
+###############################################################################
+
+
+def test_document_fingerprint() -> None:
+    body = db_functions.generate_and_attach_doc_hash_as_id(db_models.Body.Example())
+    fingerprint = get_document_fingerprint(body)
+    assert fingerprint.collection == "body"
+    assert fingerprint.doc_id == body.id
+
+    # Naive datetimes are stored as UTC
+    aware_body = db_models.Body.Example()
+    aware_body.start_datetime = body.start_datetime.replace(tzinfo=timezone.utc)
+    db_functions.generate_and_attach_doc_hash_as_id(aware_body)
+    assert get_document_fingerprint(aware_body) == fingerprint
+
+    # Any content change changes the fingerprint
+    body.description = "Changed"
+    assert get_document_fingerprint(body).fingerprint != fingerprint.fingerprint
+
+
+def test_document_write_cache(tmpdir: Path) -> None:
+    cache = DocumentWriteCache(Path(tmpdir) / "write-cache.sqlite")
+
+    body = db_functions.generate_and_attach_doc_hash_as_id(db_models.Body.Example())
+    event = db_functions.generate_and_attach_doc_hash_as_id(db_models.Event.Example())
+    body_fingerprint = get_document_fingerprint(body)
+    event_fingerprint = get_document_fingerprint(event)
+    assert not cache.contains(body_fingerprint)
+
+    cache.add([body_fingerprint, event_fingerprint])
+    assert cache.contains(body_fingerprint)
+    assert cache.contains(event_fingerprint)
+
+    # Changed content is written again
+    body.end_datetime = datetime(2020, 1, 1)
+    assert not cache.contains(get_document_fingerprint(body))
+
+    # Persisted between instances
+    cache.close()
+    cache = DocumentWriteCache(Path(tmpdir) / "write-cache.sqlite")
+    assert cache.contains(event_fingerprint)
+
+    # Invalidation by collection
+    assert cache.invalidate(["event"]) == 1
+    assert not cache.contains(event_fingerprint)
+    assert cache.contains(body_fingerprint)
+    cache.close()
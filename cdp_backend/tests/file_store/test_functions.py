@@ -2,10 +2,12 @@
 # -*- coding: utf-8 -*-
 
 import os.path
-from typing import Optional
+import struct
+from typing import List, Optional
 from unittest import mock
 
 import pytest
+from fsspec.implementations.memory import MemoryFileSystem
 from gcsfs import GCSFileSystem
 from py._path.local import LocalPath
 
@@ -48,12 +50,58 @@ def test_get_file_uri(
     exists: bool,
     expected: Optional[str],
 ) -> None:
+    functions.clear_bucket_manifests()
     with mock.patch("gcsfs.credentials.GoogleCredentials.connect"):
-        with mock.patch("gcsfs.GCSFileSystem.exists") as mock_exists:
-            mock_exists.return_value = exists
+        with mock.patch("gcsfs.GCSFileSystem.ls") as mock_ls:
+            mock_ls.return_value = [
+                {"name": f"{bucket}/other.txt", "type": "file"},
+                {"name": f"{bucket}/{filename}/", "type": "directory"},
+            ]
+            if exists:
+                mock_ls.return_value.append(
+                    {"name": f"{bucket}/{filename}", "type": "file"}
+                )
 
             assert expected == functions.get_file_uri(bucket, filename, "path/to/creds")
 
+            # Each prefix is only listed once
+            functions.get_file_uri(bucket, filename, "path/to/creds")
+            assert mock_ls.call_count == 1
+            assert functions.get_file_uri(bucket, "other.txt", "path/to/creds")
+            assert mock_ls.call_count == 2
+
+    functions.clear_bucket_manifests()
+
+
+def test_bucket_manifest() -> None:
+    fs = mock.MagicMock()
+    fs.ls.return_value = [
+        {"name": f"{BUCKET}/abc123-audio.wav", "type": "file"},
+        {"name": f"{BUCKET}/abc123-transcript.json", "type": "file"},
+    ]
+    manifest = functions.BucketManifest(fs=fs, bucket=BUCKET)
+
+    # All files of a content hash are listed with a single request
+    assert manifest.exists("abc123-audio.wav")
+    assert manifest.exists("abc123-transcript.json")
+    assert not manifest.exists("abc123-static-thumbnail.png")
+    fs.ls.assert_called_once_with(BUCKET, detail=True, prefix="abc123")
+
+    # Uploads are added without listing again
+    manifest.add("abc123-static-thumbnail.png")
+    assert manifest.exists("abc123-static-thumbnail.png")
+    assert fs.ls.call_count == 1
+
+    # Other prefixes are listed separately
+    fs.ls.return_value = []
+    assert not manifest.exists(FILENAME)
+    fs.ls.assert_called_with(BUCKET, detail=True, prefix=FILENAME)
+
+    # Nested files are listed per directory
+    assert not manifest.exists(f"nested/{FILENAME}")
+    fs.ls.assert_called_with(f"{BUCKET}/nested", detail=True, prefix=FILENAME)
+    assert fs.ls.call_count == 3
+
 
 @pytest.mark.parametrize(
     "bucket, filepath, save_name, remove_local, existing_file_uri, expected",
@@ -86,6 +134,53 @@ def test_upload_file(
                     )
 
 
+def _merge_memory_files(path: str, paths: List[str]) -> None:
+    fs = MemoryFileSystem()
+    fs.pipe_file(path, b"".join(fs.cat_file(part) for part in paths))
+
+
+@pytest.mark.parametrize("callable_save_name", [False, True])
+def test_upload_wav_stream(callable_save_name: bool) -> None:
+    functions.clear_bucket_manifests()
+    fs = MemoryFileSystem()
+    bucket = "wav-stream-bucket"
+    pcm_chunks = [b"\x01\x00" * 100, b"\x02\x00" * 50]
+
+    with mock.patch(
+        "cdp_backend.file_store.functions.initialize_gcs_file_system"
+    ) as mock_fs:
+        mock_fs.return_value = fs
+        with mock.patch.object(
+            MemoryFileSystem, "merge", create=True, side_effect=_merge_memory_files
+        ):
+            uri = functions.upload_wav_stream(
+                credentials_file="path/to/creds",
+                bucket=bucket,
+                pcm_chunks=iter(pcm_chunks),
+                save_name=(lambda: "audio.wav") if callable_save_name else "audio.wav",
+            )
+
+    assert uri == functions.GCS_URI.format(bucket=bucket, filename="audio.wav")
+
+    # Only the final file is left
+    assert fs.ls(bucket, detail=False) == [f"/{bucket}/audio.wav"]
+
+    # The header describes 16 kHz mono 16-bit PCM of the streamed length
+    content = fs.cat_file(f"{bucket}/audio.wav")
+    num_data_bytes = len(b"".join(pcm_chunks))
+    assert len(content) == 44 + num_data_bytes
+    assert content[:4] == b"RIFF"
+    assert struct.unpack("<I", content[4:8])[0] == 36 + num_data_bytes
+    assert content[8:16] == b"WAVEfmt "
+    assert struct.unpack("<HHIIHH", content[20:36]) == (1, 1, 16000, 32000, 2, 16)
+    assert content[36:40] == b"data"
+    assert struct.unpack("<I", content[40:44])[0] == num_data_bytes
+    assert content[44:] == b"".join(pcm_chunks)
+
+    fs.rm(bucket, recursive=True)
+    functions.clear_bucket_manifests()
+
+
 def test_remove_local_file(tmpdir: LocalPath) -> None:
     p = tmpdir.mkdir("sub").join("hello.txt")
     p.write("content")
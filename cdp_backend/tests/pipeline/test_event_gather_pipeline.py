@@ -2,8 +2,9 @@
 # -*- coding: utf-8 -*-
 
 import sys
+from hashlib import sha256
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Iterator, List, Optional
 from unittest import mock
 from unittest.mock import MagicMock
 
@@ -11,6 +12,8 @@ import pytest
 from prefect import Flow
 
 from cdp_backend.database import constants as db_constants
+from cdp_backend.database import models as db_models
+from cdp_backend.database.functions import create_seat as create_seat_db_model
 from cdp_backend.pipeline import event_gather_pipeline as pipeline
 from cdp_backend.pipeline import ingestion_models
 from cdp_backend.pipeline.ingestion_models import (
@@ -57,6 +60,103 @@ def test_create_event_gather_flow(config: EventGatherPipelineConfig) -> None:
     assert isinstance(flow, Flow)
 
 
+def test_group_session_processing_results() -> None:
+    events = [EXAMPLE_FILLED_EVENT, EXAMPLE_MINIMAL_EVENT, EXAMPLE_FILLED_EVENT]
+    session_processing_results = [
+        pipeline.SessionProcessingResult(
+            session=session,
+            audio_uri=f"ex://{i}-audio.wav",
+            transcript=EXAMPLE_TRANSCRIPT,
+            transcript_uri=f"ex://{i}-transcript.json",
+            static_thumbnail_uri=f"ex://{i}-static-thumbnail.png",
+            hover_thumbnail_uri=f"ex://{i}-hover-thumbnail.gif",
+        )
+        for i, session in enumerate(
+            [session for event in events for session in event.sessions]
+        )
+    ]
+
+    grouped_events, grouped = pipeline.group_session_processing_results.run(
+        events=events,
+        session_processing_results=session_processing_results,
+    )
+    assert grouped_events == events
+    assert len(grouped) == len(events)
+    for event, event_session_processing_results in zip(events, grouped):
+        assert [result.session for result in event_session_processing_results] == (
+            event.sessions
+        )
+
+    # Results of sessions processed by a prior run are put back in place
+    processed_session_indices = [0, 3]
+    regrouped = pipeline.group_session_processing_results.run(  # type: ignore
+        events=events,
+        session_processing_results=[
+            result
+            for i, result in enumerate(session_processing_results)
+            if i not in processed_session_indices
+        ],
+        processed_session_processing_results=[
+            session_processing_results[i] for i in processed_session_indices
+        ],
+        processed_session_indices=processed_session_indices,
+    )
+    assert regrouped == (grouped_events, grouped)
+
+    # Events with a failed session are left out
+    failed_session_processing_results = list(session_processing_results)
+    failed_session_processing_results[len(events[0].sessions)] = ValueError("STT")
+    failed_events, failed_grouped = pipeline.group_session_processing_results.run(
+        events=events,
+        session_processing_results=failed_session_processing_results,
+    )
+    assert failed_events == [events[0], events[2]]
+    assert failed_grouped == [grouped[0], grouped[2]]
+
+
+@mock.patch(f"{PIPELINE_PATH}._check_is_stored")
+@mock.patch(f"{PIPELINE_PATH}._plan_session_processing")
+@pytest.mark.parametrize(
+    "skip_stored_events, is_stored, expected_events_to_store",
+    [(False, True, 1), (True, False, 1), (True, True, 0)],
+)
+def test_plan_event_gather(
+    mocked_plan_session_processing: MagicMock,
+    mocked_check_is_stored: MagicMock,
+    skip_stored_events: bool,
+    is_stored: bool,
+    expected_events_to_store: int,
+) -> None:
+    mocked_plan_session_processing.side_effect = (
+        lambda session, **kwargs: pipeline.SessionPlan(
+            session=session,
+            session_content_hash=VIDEO_CONTENT_HASH,
+            audio_uri="ex://audio.wav",
+            transcript_uri="ex://transcript.json",
+            static_thumbnail_uri="ex://static-thumbnail.png",
+            hover_thumbnail_uri="ex://hover-thumbnail.gif",
+        )
+    )
+    mocked_check_is_stored.return_value = is_stored
+
+    config = EventGatherPipelineConfig(
+        google_credentials_file="",
+        get_events_function_path="cdp_backend.pipeline.mock_get_events.min_get_events",
+        gcs_bucket_name="",
+        skip_stored_events=skip_stored_events,
+    )
+    config._validated_gcs_bucket_name = ""
+
+    plan = pipeline.plan_event_gather(
+        config=config,
+        prefetched_events=[EXAMPLE_MINIMAL_EVENT],
+    )
+    report = plan.to_report()
+    assert report["events_found"] == 1
+    assert report["events_to_store"] == expected_events_to_store
+    assert all(event_plan.is_processed for event_plan in plan.events)
+
+
 @pytest.mark.skipif(
     sys.platform == "win32",
     reason="Path handling / splitting failing due to windows path separator",
@@ -103,10 +203,63 @@ def test_get_video_and_split_audio(
     assert audio_uri == audio_upload_file_return
 
 
+@mock.patch(f"{PIPELINE_PATH}.get_media_cache")
+@mock.patch(f"{PIPELINE_PATH}.FingerprintCache")
+@mock.patch(f"{PIPELINE_PATH}.fs_functions.initialize_gcs_file_system")
+@mock.patch(f"{PIPELINE_PATH}.fs_functions.upload_wav_stream")
+@mock.patch(f"{PIPELINE_PATH}.file_utils.stream_audio")
+def test_get_video_and_split_audio_streamed(
+    mock_stream_audio: MagicMock,
+    mock_upload_wav_stream: MagicMock,
+    mock_initialize_gcs_file_system: MagicMock,
+    mock_fingerprint_cache: MagicMock,
+    mock_get_media_cache: MagicMock,
+) -> None:
+    video_content = b"streamed video"
+    expected_session_content_hash = sha256(video_content).hexdigest()
+
+    def stream_audio(
+        video_read_uri: str, on_video_chunk: Callable[[bytes], None]
+    ) -> Iterator[bytes]:
+        for i in range(0, len(video_content), 4):
+            on_video_chunk(video_content[i : i + 4])
+            yield b"\x00\x00"
+
+    def upload_wav_stream(
+        pcm_chunks: Iterator[bytes], save_name: Callable[[], str], **kwargs: Any
+    ) -> str:
+        list(pcm_chunks)
+        return f"fake://{save_name()}"
+
+    mock_fingerprint_cache.return_value.get.return_value = None
+    mock_stream_audio.side_effect = stream_audio
+    mock_upload_wav_stream.side_effect = upload_wav_stream
+
+    (
+        session_content_hash,
+        audio_uri,
+    ) = pipeline.get_video_and_split_audio.run(  # type: ignore
+        video_uri="https://fake.video/video.mp4",
+        bucket="bucket",
+        credentials_file="/fake/credentials/path",
+        stream_audio=True,
+    )
+
+    # The video is hashed while streamed, it is never downloaded or read again
+    assert session_content_hash == expected_session_content_hash
+    assert audio_uri == f"fake://{expected_session_content_hash}-audio.wav"
+    mock_stream_audio.assert_called_once()
+    mock_get_media_cache.assert_not_called()
+    mock_fingerprint_cache.return_value.put.assert_called_once_with(
+        "https://fake.video/video.mp4", expected_session_content_hash
+    )
+
+
 @pytest.mark.skipif(
     sys.platform == "win32",
     reason="Path handling / splitting failing due to windows path separator",
 )
+@mock.patch(f"{PIPELINE_PATH}.fs_functions.get_file_uri")
 @mock.patch(f"{PIPELINE_PATH}.fs_functions.upload_file")
 @pytest.mark.parametrize(
     "example_static_thumbnail_url, example_hover_thumbnail_url,"
@@ -122,12 +275,15 @@ def test_get_video_and_split_audio(
 )
 def test_get_video_and_generate_thumbnails(
     mock_upload_file: MagicMock,
+    mock_get_file_uri: MagicMock,
     example_static_thumbnail_url: str,
     example_hover_thumbnail_url: str,
     example_session_content_hash: str,
     event: EventIngestionModel,
     example_video: Path,
 ) -> None:
+    mock_get_file_uri.return_value = None
+
     # Since mock_upload_file only allows for one return value and since the real
     # thumbnail generator calls upload_file twice, it is necessary to test each
     # thumbnail generation process separately
@@ -151,6 +307,37 @@ def test_get_video_and_generate_thumbnails(
     assert hover_thumbnail_url == example_hover_thumbnail_url
 
 
+@mock.patch(f"{PIPELINE_PATH}.get_media_cache")
+@mock.patch(f"{PIPELINE_PATH}.fs_functions.get_file_uri")
+@mock.patch(f"{PIPELINE_PATH}.fs_functions.upload_file")
+def test_get_video_and_generate_thumbnails_existing(
+    mock_upload_file: MagicMock,
+    mock_get_file_uri: MagicMock,
+    mock_get_media_cache: MagicMock,
+) -> None:
+    mock_get_file_uri.side_effect = [
+        f"fake://{VIDEO_CONTENT_HASH}-static-thumbnail.png",
+        f"fake://{VIDEO_CONTENT_HASH}-hover-thumbnail.gif",
+    ]
+
+    (
+        static_thumbnail_url,
+        hover_thumbnail_url,
+    ) = pipeline.get_video_and_generate_thumbnails.run(  # type: ignore
+        session_content_hash=VIDEO_CONTENT_HASH,
+        video_uri="fake://video.mp4",
+        event=EXAMPLE_MINIMAL_EVENT,
+        bucket="bucket",
+        credentials_file="/fake/credentials/path",
+    )
+
+    # Existing thumbnails are reused without touching the video
+    assert static_thumbnail_url == f"fake://{VIDEO_CONTENT_HASH}-static-thumbnail.png"
+    assert hover_thumbnail_url == f"fake://{VIDEO_CONTENT_HASH}-hover-thumbnail.gif"
+    mock_get_media_cache.assert_not_called()
+    mock_upload_file.assert_not_called()
+
+
 @pytest.mark.parametrize(
     "event, expected_phrases",
     [
@@ -212,7 +399,7 @@ def test_construct_speech_to_text_phrases_context(
         ),
     ],
 )
-def test_generate_transcript(
+def test_generate_session_transcript(
     mock_upload_transcript: MagicMock,
     mock_speech_to_text: MagicMock,
     mock_get_transcript_uri: MagicMock,
@@ -225,21 +412,23 @@ def test_generate_transcript(
     mock_speech_to_text.return_value = mock_speech_to_text_return
     mock_upload_transcript.return_value = mock_upload_transcript_return
 
-    with Flow("Test Generate Transcript") as flow:
-        pipeline.generate_transcript(
+    transcript_uri, transcript = pipeline.generate_session_transcript.run(
+        session_audio=pipeline.SessionAudio(
             session_content_hash="abc123",
             audio_uri="fake://doesn't-matter.wav",
-            session=session,
-            event=event,
-            bucket="bucket",
-            credentials_file="fake/creds.json",
-        )
+        ),
+        event=event,
+        session=session,
+        bucket="bucket",
+        credentials_file="fake/creds.json",
+    )
 
-    # Run the flow
-    state = flow.run()
+    # Check results
+    assert transcript_uri == mock_upload_transcript_return
+    assert transcript.session_datetime == session.session_datetime.isoformat()
 
-    # Check state and results
-    assert state.is_successful()  # type: ignore
+    # Speech-to-Text is only used without captions
+    assert mock_speech_to_text.called == (session.caption_uri is None)
 
 
 example_person = ingestion_models.Person(name="Bob Boberson")
@@ -443,6 +632,8 @@ for i in range(6):
 @mock.patch(f"{PIPELINE_PATH}.fs_functions.upload_file")
 @mock.patch(f"{PIPELINE_PATH}.fs_functions.remove_local_file")
 @mock.patch(f"{PIPELINE_PATH}.db_functions.upload_db_model")
+@mock.patch(f"{PIPELINE_PATH}.db_functions.client_registry")
+@mock.patch(f"{PIPELINE_PATH}.db_functions.fireo")
 @pytest.mark.parametrize(
     "event, session_processing_results, fail_file_uploads",
     [
@@ -486,6 +677,8 @@ for i in range(6):
     ],
 )
 def test_store_event_processing_results(
+    mock_fireo: MagicMock,
+    mock_client_registry: MagicMock,
     mock_upload_db_model: MagicMock,
     mock_remove_local_file: MagicMock,
     mock_upload_file: MagicMock,
@@ -502,10 +695,135 @@ def test_store_event_processing_results(
     # Set file upload side effect
     if fail_file_uploads:
         mock_upload_file.side_effect = FileNotFoundError()
+    else:
+        mock_upload_file.return_value = "gs://doesnt/matter/doesnt-matter.ext"
+
+    # Don't check the example URIs over the network
+    with mock.patch(f"{PIPELINE_PATH}.validators.prevalidate_resources"):
+        pipeline.store_event_processing_results.run(  # type: ignore
+            event=event,
+            session_processing_results=session_processing_results,
+            credentials_file="fake/credentials.json",
+            bucket="doesnt://matter",
+        )
+
+
+@mock.patch(f"{PIPELINE_PATH}.file_utils.resource_copy")
+@mock.patch(f"{PIPELINE_PATH}.fs_functions.upload_file")
+@mock.patch(f"{PIPELINE_PATH}.fs_functions.remove_local_file")
+@mock.patch(f"{PIPELINE_PATH}.db_functions.upload_db_model")
+@mock.patch(f"{PIPELINE_PATH}.db_functions.client_registry")
+@mock.patch(f"{PIPELINE_PATH}.db_functions.fireo")
+@mock.patch(f"{PIPELINE_PATH}.validators.prevalidate_resources")
+def test_store_event_entities(
+    mock_prevalidate_resources: MagicMock,
+    mock_fireo: MagicMock,
+    mock_client_registry: MagicMock,
+    mock_upload_db_model: MagicMock,
+    mock_remove_local_file: MagicMock,
+    mock_upload_file: MagicMock,
+    mock_resource_copy: MagicMock,
+) -> None:
+    mock_resource_copy.return_value = "doesnt-matter.ext"
+    mock_upload_file.side_effect = lambda filepath, **kwargs: f"ex://{filepath}"
+
+    # The same persons vote and sponsor in every event
+    events = [_get_example_event(), _get_example_event()]
+    ingested_entities = pipeline.store_event_entities.run(  # type: ignore
+        events=events,
+        credentials_file="fake/credentials.json",
+        bucket="doesnt://matter",
+    )
 
+    persons = {
+        person.name: person
+        for event in events
+        for person in pipeline._get_event_persons(event)
+    }
+    assert len(ingested_entities.persons) == len(persons)
+
+    # Each unique picture and seat image is only archived once
+    archived_uris = {person.picture_uri for person in persons.values()} | {
+        person.seat.image_uri for person in persons.values() if person.seat
+    }
+    archived_uris.discard(None)
+    assert mock_resource_copy.call_count == len(archived_uris)
+
+    # Reusing the ingested entities doesn't store any of them again
+    mock_resource_copy.reset_mock()
+    mock_upload_db_model.reset_mock()
     pipeline.store_event_processing_results.run(  # type: ignore
-        event=event,
-        session_processing_results=session_processing_results,
+        event=events[0],
+        session_processing_results=[],
+        credentials_file="fake/credentials.json",
+        bucket="doesnt://matter",
+        ingested_entities=ingested_entities,
+    )
+    mock_resource_copy.assert_not_called()
+    stored_types = {
+        type(call.kwargs["db_model"]) for call in mock_upload_db_model.call_args_list
+    }
+    assert db_models.Person not in stored_types
+    assert db_models.Body not in stored_types
+
+
+@mock.patch(f"{PIPELINE_PATH}.file_utils.resource_copy")
+@mock.patch(f"{PIPELINE_PATH}.fs_functions.upload_file")
+@mock.patch(f"{PIPELINE_PATH}.fs_functions.remove_local_file")
+@mock.patch(f"{PIPELINE_PATH}.db_functions.create_seat")
+@mock.patch(f"{PIPELINE_PATH}.db_functions.upload_db_model")
+@mock.patch(f"{PIPELINE_PATH}.db_functions.client_registry")
+@mock.patch(f"{PIPELINE_PATH}.db_functions.fireo")
+@mock.patch(f"{PIPELINE_PATH}.validators.prevalidate_resources")
+def test_store_event_entities_failures(
+    mock_prevalidate_resources: MagicMock,
+    mock_fireo: MagicMock,
+    mock_client_registry: MagicMock,
+    mock_upload_db_model: MagicMock,
+    mock_create_seat: MagicMock,
+    mock_remove_local_file: MagicMock,
+    mock_upload_file: MagicMock,
+    mock_resource_copy: MagicMock,
+) -> None:
+    mock_resource_copy.return_value = "doesnt-matter.ext"
+    mock_upload_file.side_effect = lambda filepath, **kwargs: f"ex://{filepath}"
+
+    # A single seat fails
+    failing_seat_name = "Example Seat Position 1"
+
+    def create_seat(seat: ingestion_models.Seat, **kwargs: Any) -> db_models.Seat:
+        if seat.name == failing_seat_name:
+            raise ValueError("Bad seat")
+
+        return create_seat_db_model(seat, **kwargs)
+
+    mock_create_seat.side_effect = create_seat
+
+    events = [_get_example_event()]
+    persons = {person.name: person for person in pipeline._get_event_persons(events[0])}
+    failing_persons = {
+        name
+        for name, person in persons.items()
+        if person.seat is not None and person.seat.name == failing_seat_name
+    }
+    assert 0 < len(failing_persons) < len(persons)
+
+    # Persons that fail are left to be stored with their events
+    ingested_entities = pipeline.store_event_entities.run(  # type: ignore
+        events=events,
+        credentials_file="fake/credentials.json",
+        bucket="doesnt://matter",
+    )
+    assert {person.name for person in ingested_entities.persons.values()} == (
+        set(persons) - failing_persons
+    )
+    assert len(ingested_entities.bodies) > 0
+
+    # Nothing is reused when the write fails
+    mock_fireo.batch.return_value.commit.side_effect = ValueError("Write failed")
+    ingested_entities = pipeline.store_event_entities.run(  # type: ignore
+        events=events,
         credentials_file="fake/credentials.json",
         bucket="doesnt://matter",
     )
+    assert ingested_entities == pipeline.IngestedEntities(bodies={}, persons={})
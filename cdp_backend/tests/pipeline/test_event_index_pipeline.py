@@ -4,20 +4,24 @@
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import List, Set
 from unittest import mock
 from unittest.mock import MagicMock
 
+import numpy as np
 import pandas as pd
 import pytest
 import pytz
+from fsspec.implementations.local import LocalFileSystem
 from prefect import Flow
 
 from cdp_backend.database import functions as db_functions
 from cdp_backend.database import models as db_models
 from cdp_backend.pipeline import event_index_pipeline as pipeline
+from cdp_backend.pipeline.event_index_state import EventIndexState
 from cdp_backend.pipeline.pipeline_config import EventIndexPipelineConfig
 from cdp_backend.utils.file_utils import resource_copy
+from cdp_backend.utils.stem_cache import StemCache
 
 #############################################################################
 
@@ -39,11 +43,15 @@ PIPELINE_PATH = "cdp_backend.pipeline.event_index_pipeline"
 
 @pytest.mark.parametrize("n_grams", [1, 2, 3])
 @pytest.mark.parametrize("store_local", [True, False])
-def test_create_event_index_flow(n_grams: int, store_local: bool) -> None:
+@pytest.mark.parametrize("incremental", [True, False])
+def test_create_event_index_flow(
+    n_grams: int, store_local: bool, incremental: bool
+) -> None:
     flow = pipeline.create_event_index_pipeline(
         config=EventIndexPipelineConfig("/fake/creds.json", "doesn't-matter"),
         n_grams=n_grams,
         store_local=store_local,
+        incremental=incremental,
     )
     assert isinstance(flow, Flow)
 
@@ -201,6 +209,91 @@ def test_get_transcripts_per_event(
         )
 
 
+def test_convert_all_n_grams_to_dataframe() -> None:
+    all_events_n_grams = [
+        pipeline.EventGrams(
+            event=event_one,
+            stemmed_grams=np.array(["hous", "council"]),
+            unstemmed_grams=np.array(["housing", "Council"]),
+            tfs=np.array([3, 1], dtype="int64"),
+            sentence_indices=np.array([0, 1], dtype="int32"),
+            term_indices=np.array([2, 0], dtype="int32"),
+            sentences=["We discussed housing.", "Council adjourned."],
+        ),
+        pipeline.EventGrams(
+            event=event_two,
+            stemmed_grams=np.array([], dtype=str),
+            unstemmed_grams=np.array([], dtype=str),
+            tfs=np.array([], dtype="int64"),
+            sentence_indices=np.array([], dtype="int32"),
+            term_indices=np.array([], dtype="int32"),
+            sentences=[],
+        ),
+        pipeline.EventGrams(
+            event=event_two,
+            stemmed_grams=np.array(["hous"]),
+            unstemmed_grams=np.array(["Housing"]),
+            tfs=np.array([2], dtype="int64"),
+            sentence_indices=np.array([0], dtype="int32"),
+            term_indices=np.array([0], dtype="int32"),
+            sentences=["Housing first."],
+        ),
+    ]
+
+    result = pipeline.convert_all_n_grams_to_dataframe.run(  # type: ignore
+        all_events_n_grams
+    )
+
+    assert list(result.columns) == [
+        "event_ref",
+        "event_id",
+        "event_datetime",
+        "unstemmed_gram",
+        "stemmed_gram",
+        "context_span",
+        "tf",
+    ]
+    assert list(result.event_ref) == [event_one, event_one, event_two]
+    assert list(result.event_id) == [event_one.id, event_one.id, event_two.id]
+    assert list(result.event_datetime) == [
+        event_one.event_datetime,
+        event_one.event_datetime,
+        event_two.event_datetime,
+    ]
+    assert list(result.unstemmed_gram) == ["housing", "Council", "Housing"]
+    assert list(result.stemmed_gram) == ["hous", "council", "hous"]
+    assert list(result.context_span) == [
+        "We discussed housing.",
+        "Council adjourned.",
+        "Housing first.",
+    ]
+    assert list(result.tf) == [3, 1, 2]
+
+    # No grams
+    result = pipeline.convert_all_n_grams_to_dataframe.run([])  # type: ignore
+    assert len(result) == 0
+    assert "stemmed_gram" in result.columns
+
+
+@mock.patch(f"{PIPELINE_PATH}.get_stem_cache")
+def test_store_stem_vocabulary(
+    mocked_get_stem_cache: MagicMock,
+    tmp_path: Path,
+) -> None:
+    stem_vocabulary_path = str(tmp_path / "stem-vocabulary.json")
+    stem_cache = StemCache()
+    mocked_get_stem_cache.return_value = stem_cache
+
+    # Nothing new was stemmed
+    pipeline.store_stem_vocabulary.run(stem_vocabulary_path)  # type: ignore
+    mocked_get_stem_cache.assert_called_once_with(stem_vocabulary_path)
+    assert not Path(stem_vocabulary_path).exists()
+
+    stem_cache.stem("housing")
+    pipeline.store_stem_vocabulary.run(stem_vocabulary_path)  # type: ignore
+    assert StemCache().warm(stem_vocabulary_path) == 1
+
+
 @mock.patch(f"{PIPELINE_PATH}.get_transcripts.run")
 @mock.patch("gcsfs.credentials.GoogleCredentials.connect")
 @mock.patch("gcsfs.GCSFileSystem.get")
@@ -282,3 +375,159 @@ def test_mocked_pipeline_run(
 
     # Cleanup
     os.remove("tfidf-1.parquet")
+
+
+def _make_transcript(
+    event: db_models.Event,
+    session_id: str,
+    transcript_path: Path,
+    confidence: float,
+    created: datetime,
+) -> db_models.Transcript:
+    session = db_models.Session.Example()
+    session.id = session_id
+    session.event_ref = event
+
+    db_file = db_models.File()
+    db_file.name = transcript_path.name
+    db_file.uri = str(transcript_path)
+
+    transcript = db_models.Transcript()
+    transcript.id = f"{session_id}-{confidence}"
+    transcript.session_ref = session
+    transcript.file_ref = db_file
+    transcript.confidence = confidence
+    transcript.created = created
+    return transcript
+
+
+@mock.patch(f"{PIPELINE_PATH}.store_n_gram_chunk.run")
+@mock.patch(f"{PIPELINE_PATH}.db_functions.ReferenceResolver")
+@mock.patch(f"{PIPELINE_PATH}.db_functions.iter_collection")
+@mock.patch(f"{PIPELINE_PATH}.get_transcripts.run")
+@mock.patch(f"{PIPELINE_PATH}.fs_functions.initialize_gcs_file_system")
+def test_mocked_incremental_pipeline_run(
+    mocked_initialize_fs: MagicMock,
+    mocked_get_transcript_models: MagicMock,
+    mocked_iter_transcript_models: MagicMock,
+    mocked_reference_resolver: MagicMock,
+    mocked_store_n_gram_chunk: MagicMock,
+    resources_dir: Path,
+    tmp_path: Path,
+) -> None:
+    # Use the local file system for both the transcripts and the index state
+    mocked_initialize_fs.return_value = LocalFileSystem()
+    config = EventIndexPipelineConfig("/fake/creds.json", "doesn't-matter")
+    config._validated_gcs_bucket_name = str(tmp_path)
+    index_state_path = tmp_path / pipeline.INDEX_STATE_DIR / "1-grams"
+
+    # Set up mock data
+    fake_captions_path = resources_dir / "generated_transcript_from_fake_captions.json"
+    brief_path = resources_dir / "generated_transcript_from_brief_080221_2012161.json"
+    event_a = db_models.Event.Example()
+    event_a.id = "event-a"
+    event_a.event_datetime = datetime(2021, 1, 1, tzinfo=pytz.utc)
+    event_b = db_models.Event.Example()
+    event_b.id = "event-b"
+    event_b.event_datetime = datetime(2021, 1, 2, tzinfo=pytz.utc)
+    event_c = db_models.Event.Example()
+    event_c.id = "event-c"
+    event_c.event_datetime = datetime(2021, 1, 2, tzinfo=pytz.utc)
+    event_a_transcript = _make_transcript(
+        event_a,
+        "session-a",
+        fake_captions_path,
+        confidence=0.5,
+        created=datetime(2021, 1, 3, tzinfo=pytz.utc),
+    )
+    event_b_transcript = _make_transcript(
+        event_b,
+        "session-b",
+        brief_path,
+        confidence=0.5,
+        created=datetime(2021, 1, 4, tzinfo=pytz.utc),
+    )
+    event_c_transcript = _make_transcript(
+        event_c,
+        "session-c",
+        fake_captions_path,
+        confidence=0.5,
+        created=datetime(2021, 1, 3, tzinfo=pytz.utc),
+    )
+    # A better transcript of event a, with the grams of event b
+    new_event_a_transcript = _make_transcript(
+        event_a,
+        "session-a",
+        brief_path,
+        confidence=0.9,
+        created=datetime(2021, 1, 5, tzinfo=pytz.utc),
+    )
+
+    def get_stored_event_ids() -> Set[str]:
+        return {
+            ieg.event_ref.id
+            for call in mocked_store_n_gram_chunk.call_args_list
+            for ieg in call.kwargs["n_gram_chunk"]
+        }
+
+    # First run has no state so every transcript is indexed
+    mocked_get_transcript_models.return_value = [
+        event_a_transcript,
+        event_b_transcript,
+        event_c_transcript,
+    ]
+    flow = pipeline.create_event_index_pipeline(
+        config=config,
+        n_grams=1,
+        incremental=True,
+    )
+    assert flow.run().is_successful()
+
+    mocked_iter_transcript_models.assert_not_called()
+    assert get_stored_event_ids() == {"event-a", "event-b", "event-c"}
+    mocked_reference_resolver.return_value.get.assert_not_called()
+
+    index_state = EventIndexState(str(index_state_path))
+    assert index_state.load()
+    assert index_state.watermark == event_b_transcript.created
+    assert set(index_state.postings.event_id) == {"event-a", "event-b", "event-c"}
+
+    # Second run only reads the new transcript and stores the changed postings
+    mocked_store_n_gram_chunk.reset_mock()
+    mocked_iter_transcript_models.return_value = [new_event_a_transcript]
+    mocked_reference_resolver.return_value.get.return_value = {
+        "event-b": event_b,
+        "event-c": event_c,
+    }
+    assert flow.run().is_successful()
+
+    mocked_get_transcript_models.assert_called_once()
+    assert mocked_iter_transcript_models.call_args.kwargs["filters"] == [
+        (
+            "created",
+            ">",
+            event_b_transcript.created - pipeline.INDEX_WATERMARK_OVERLAP,
+        )
+    ]
+    # The document frequencies of the grams of every other event changed
+    assert get_stored_event_ids() == {"event-a", "event-b", "event-c"}
+    mocked_reference_resolver.return_value.get.assert_called_once_with(
+        db_models.Event, {"event-b", "event-c"}
+    )
+
+    index_state = EventIndexState(str(index_state_path))
+    assert index_state.load()
+    assert index_state.watermark == new_event_a_transcript.created
+    assert (
+        index_state.selected_transcripts["session-a"].transcript_id
+        == new_event_a_transcript.id
+    )
+    assert set(index_state.postings.event_id) == {"event-a", "event-b", "event-c"}
+    assert (
+        index_state.postings[index_state.postings.event_id == "event-a"]
+        .stemmed_gram.sort_values()
+        .tolist()
+        == index_state.postings[index_state.postings.event_id == "event-b"]
+        .stemmed_gram.sort_values()
+        .tolist()
+    )
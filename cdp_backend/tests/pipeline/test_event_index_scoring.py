@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import math
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from cdp_backend.pipeline.event_index_scoring import compute_tfidf_scores
+
+#############################################################################
+
+POSTINGS = pd.DataFrame(
+    [
+        ("e1", datetime(2021, 1, 31), "hous", 2),
+        ("e1", datetime(2021, 1, 31), "zone", 1),
+        ("e2", datetime(2020, 8, 4), "hous", 3),
+        ("e2", datetime(2020, 8, 4), "afford", 4),
+    ],
+    columns=["event_id", "event_datetime", "stemmed_gram", "tf"],
+)
+
+#############################################################################
+
+
+@pytest.mark.parametrize(
+    "event_datetimes",
+    [
+        POSTINGS.event_datetime,
+        # Timezone aware datetimes are weighted the same
+        POSTINGS.event_datetime.apply(pytz.utc.localize),
+    ],
+)
+def test_compute_tfidf_scores(event_datetimes: pd.Series) -> None:
+    scores = compute_tfidf_scores(
+        event_ids=POSTINGS.event_id,
+        stemmed_grams=POSTINGS.stemmed_gram,
+        tfs=POSTINGS.tf,
+        event_datetimes=event_datetimes,
+        datetime_weighting_days_decay=30,
+        now=datetime(2021, 2, 1, 12),
+    )
+
+    np.testing.assert_array_equal(scores.df, [2, 1, 2, 1])
+    np.testing.assert_allclose(scores.tfidf, [0, math.log(2), 0, 4 * math.log(2)])
+
+    # 1 and 181 days old
+    np.testing.assert_allclose(
+        scores.datetime_weighted_tfidf,
+        [
+            0,
+            math.log(2) / math.log(1 / 30 + 2),
+            0,
+            4 * math.log(2) / math.log(181 / 30 + 2),
+        ],
+    )
+
+
+def test_compute_tfidf_scores_document_frequencies() -> None:
+    # Document frequencies of other events are used when provided
+    scores = compute_tfidf_scores(
+        event_ids=POSTINGS.event_id,
+        stemmed_grams=POSTINGS.stemmed_gram,
+        tfs=POSTINGS.tf,
+        event_datetimes=POSTINGS.event_datetime,
+        document_frequencies=pd.Series({"hous": 1, "zone": 2, "afford": 1}),
+    )
+
+    np.testing.assert_array_equal(scores.df, [1, 2, 1, 1])
+    np.testing.assert_allclose(scores.idf, [math.log(2), 0, math.log(2), math.log(2)])
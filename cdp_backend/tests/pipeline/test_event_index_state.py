@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import math
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+
+from cdp_backend.database import models as db_models
+from cdp_backend.pipeline.event_index_state import EventIndexState
+
+#############################################################################
+
+
+def _make_transcript(
+    transcript_id: str,
+    session_id: str,
+    event_id: str,
+    confidence: float,
+    created: datetime,
+) -> db_models.Transcript:
+    event = db_models.Event()
+    event.id = event_id
+    session = db_models.Session()
+    session.id = session_id
+    session.event_ref = event
+    db_file = db_models.File()
+    db_file.name = f"{transcript_id}.json"
+    db_file.uri = f"fake://{transcript_id}.json"
+
+    transcript = db_models.Transcript()
+    transcript.id = transcript_id
+    transcript.session_ref = session
+    transcript.file_ref = db_file
+    transcript.confidence = confidence
+    transcript.created = created
+    return transcript
+
+
+def _make_n_grams(event_id: str, stemmed_grams: List[str]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "event_id": event_id,
+                "event_datetime": datetime(2021, 1, 1),
+                "unstemmed_gram": gram,
+                "stemmed_gram": gram,
+                "context_span": f"... {gram} ...",
+                "tf": tf,
+            }
+            for gram, tf in Counter(stemmed_grams).items()
+        ]
+    )
+
+
+def test_select_transcripts() -> None:
+    state = EventIndexState("memory://index-state/select")
+
+    updated = state.select_transcripts(
+        [
+            _make_transcript("t1", "s1", "e1", 0.9, datetime(2021, 1, 1)),
+            _make_transcript("t2", "s1", "e1", 0.8, datetime(2021, 1, 3)),
+            _make_transcript("t3", "s2", "e2", 0.5, datetime(2021, 1, 2)),
+        ]
+    )
+    assert updated == {"e1", "e2"}
+    assert state.selected_transcripts["s1"].transcript_id == "t1"
+    assert state.watermark == pd.Timestamp("2021-01-03", tz="UTC")
+
+    # Already selected and lower confidence transcripts don't update events
+    updated = state.select_transcripts(
+        [
+            _make_transcript("t1", "s1", "e1", 0.9, datetime(2021, 1, 1)),
+            _make_transcript("t4", "s2", "e2", 0.4, datetime(2021, 1, 4)),
+            _make_transcript("t5", "s3", "e3", 0.7, datetime(2021, 1, 4)),
+        ]
+    )
+    assert updated == {"e3"}
+
+    # Higher confidence transcripts do
+    updated = state.select_transcripts(
+        [_make_transcript("t6", "s2", "e2", 0.6, datetime(2021, 1, 5))]
+    )
+    assert updated == {"e2"}
+    assert [
+        selected.transcript_id
+        for selected in state.get_selected_transcripts(["e2"])["e2"]
+    ] == ["t6"]
+
+
+def test_incremental_update_and_rescore(tmp_path: Path) -> None:
+    state = EventIndexState(str(tmp_path / "index-state"))
+    assert not state.load()
+    now = datetime(2021, 2, 1)
+
+    # Initial index
+    state.update_postings(
+        ["e1", "e2"],
+        pd.concat(
+            [
+                _make_n_grams("e1", ["a", "a", "b", "c"]),
+                _make_n_grams("e2", ["b", "d"]),
+            ]
+        ),
+    )
+    scored = state.score(now=now)
+    to_store = state.get_postings_to_store(scored, ["e1", "e2"], tolerance=0.05)
+
+    # "b" is in every event and worth nothing
+    assert set(scored.stemmed_gram) == {"a", "c", "d"}
+    assert len(to_store) == 3
+    a = scored[scored.stemmed_gram == "a"].iloc[0]
+    assert a.tf == 2
+    assert math.isclose(a.tfidf, 2 * math.log(2))
+
+    state.mark_stored(to_store)
+    state.save()
+
+    # Reload and index a new event
+    state = EventIndexState(str(tmp_path / "index-state"))
+    assert state.load()
+    state.update_postings(["e3"], _make_n_grams("e3", ["a", "e"]))
+    assert state.document_frequencies.to_dict() == {
+        "a": 2,
+        "b": 2,
+        "c": 1,
+        "d": 1,
+        "e": 1,
+    }
+
+    scored = state.score(now=now)
+    to_store = state.get_postings_to_store(scored, ["e3"], tolerance=1.0)
+
+    # The new event's postings, the postings of grams with a changed document
+    # frequency, and the postings with a now non zero value are stored again
+    # Postings whose value only moved (within tolerance) with the number of events
+    # are not
+    assert set(zip(to_store.event_id, to_store.stemmed_gram)) == {
+        ("e3", "a"),
+        ("e3", "e"),
+        ("e1", "a"),
+        ("e1", "b"),
+        ("e2", "b"),
+    }
+    assert len(state.get_postings_to_store(scored, ["e3"], tolerance=0.05)) == 7
+
+    # Replacing an event's postings updates the document frequencies
+    state.update_postings(["e2"], _make_n_grams("e2", ["d"]))
+    assert state.document_frequencies["b"] == 1
+    assert set(state.postings[state.postings.event_id == "e2"].stemmed_gram) == {"d"}
+
+
+def test_copy() -> None:
+    state = EventIndexState("memory://index-state/copy")
+    state.select_transcripts(
+        [_make_transcript("t1", "s1", "e1", 0.9, datetime(2021, 1, 1))]
+    )
+    state.update_postings(["e1"], _make_n_grams("e1", ["a", "b"]))
+
+    # Updating the copy doesn't change the original state
+    copied = state.copy()
+    copied.select_transcripts(
+        [_make_transcript("t2", "s2", "e2", 0.9, datetime(2021, 1, 2))]
+    )
+    copied.update_postings(["e2"], _make_n_grams("e2", ["a", "c"]))
+    copied.mark_stored(copied.score())
+
+    assert copied.storage_path == state.storage_path
+    assert set(state.selected_transcripts) == {"s1"}
+    assert state.watermark == pd.Timestamp("2021-01-01", tz="UTC")
+    assert set(state.postings.event_id) == {"e1"}
+    assert state.postings.stored_tfidf.isna().all()
+    assert state.document_frequencies.to_dict() == {"a": 1, "b": 1}
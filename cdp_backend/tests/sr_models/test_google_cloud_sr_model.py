@@ -116,7 +116,9 @@ def test_google_cloud_sr_model_init(fake_creds_path: str) -> None:
                 "is the maximum allowed by"
             ],
         ),
-        (["-" * 100] * 200, ["-" * 100] * 100),
+        # Duplicates are only kept once
+        (["-" * 100] * 200, ["-" * 100]),
+        ([f"{i:0100}" for i in range(200)], [f"{i:0100}" for i in range(100)]),
     ],
 )
 def test_clean_phrases(phrases: List[str], cleaned: List[str]) -> None:
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from unittest import mock
+
+from cdp_backend.utils import client_registry
+
+###############################################################################
+
+
+def test_get_gcs_file_system() -> None:
+    client_registry.reset_clients()
+    with mock.patch("gcsfs.credentials.GoogleCredentials.connect"):
+        fs = client_registry.get_gcs_file_system("path/to/credentials")
+        assert client_registry.get_gcs_file_system("path/to/credentials") is fs
+        assert client_registry.get_gcs_file_system("path/to/other") is not fs
+
+    client_registry.reset_clients()
+
+
+@mock.patch("cdp_backend.utils.client_registry.fireo")
+def test_connect_firestore(mock_fireo: mock.MagicMock) -> None:
+    client_registry.reset_clients()
+    client_registry.connect_firestore("path/to/credentials")
+    client_registry.connect_firestore("path/to/credentials")
+    assert mock_fireo.connection.call_count == 1
+
+    # Changing credentials reconnects
+    client_registry.connect_firestore("path/to/other")
+    assert mock_fireo.connection.call_count == 2
+
+    client_registry.reset_clients()
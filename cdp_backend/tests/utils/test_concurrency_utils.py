@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from typing import Dict, List
+
+import pytest
+
+from cdp_backend.utils.concurrency_utils import PipelineStage, stage_limit
+
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "stage_limits, expected_max_concurrent",
+    [
+        ({PipelineStage.FFMPEG: 1}, 1),
+        ({PipelineStage.FFMPEG: 3}, 3),
+        ({PipelineStage.FFMPEG: 0}, 6),
+    ],
+)
+def test_stage_limit(
+    stage_limits: Dict[str, int], expected_max_concurrent: int
+) -> None:
+    running: List[int] = []
+    max_running: List[int] = []
+    lock = threading.Lock()
+
+    def run_stage() -> None:
+        with stage_limit(PipelineStage.FFMPEG, stage_limits):
+            with lock:
+                running.append(1)
+                max_running.append(len(running))
+
+            time.sleep(0.1)
+            with lock:
+                running.pop()
+
+    threads = [threading.Thread(target=run_stage) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(max_running) == expected_max_concurrent
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import os
 import sys
+from hashlib import sha256
 from pathlib import Path
 from typing import Optional
 from unittest import mock
@@ -18,6 +19,7 @@ from cdp_backend.utils.file_utils import (
     MAX_THUMBNAIL_HEIGHT,
     MAX_THUMBNAIL_WIDTH,
     resource_copy,
+    stream_resource_copy,
 )
 
 from ..conftest import EXAMPLE_VIDEO_FILENAME, EXAMPLE_VIDEO_HD_FILENAME
@@ -52,6 +54,17 @@ def test_resource_copy(tmpdir: LocalPath, example_video: Path) -> None:
     resource_copy(str(example_video), save_path)
 
 
+def test_stream_resource_copy(tmpdir: LocalPath) -> None:
+    test_file = Path(tmpdir) / "a.txt"
+    test_file.write_bytes(b"video" * 1000)
+    save_path = Path(tmpdir) / "b.txt"
+
+    # Content is hashed in the same pass as the copy
+    content_hash = stream_resource_copy(str(test_file), save_path, buffer_size=64)
+    assert save_path.read_bytes() == test_file.read_bytes()
+    assert content_hash == file_utils.hash_file_contents(str(test_file))
+
+
 def test_hash_file_contents(tmpdir: LocalPath) -> None:
     test_file = Path(tmpdir) / "a.txt"
 
@@ -203,3 +216,112 @@ def test_hover_thumbnail_generator(
     assert image.shape[1] <= MAX_THUMBNAIL_WIDTH
 
     os.remove(result)
+
+
+@pytest.mark.skipif(
+    sys.platform == "win32",
+    reason="File removal for test cleanup sometimes fails on Windows",
+)
+def test_get_thumbnails(resources_dir: Path) -> None:
+    static_result, hover_result = file_utils.get_thumbnails(
+        str(resources_dir / EXAMPLE_VIDEO_HD_FILENAME), "example5", 30, 5
+    )
+    assert static_result == "example5-static-thumbnail.png"
+    assert hover_result == "example5-hover-thumbnail.gif"
+
+    image = imageio.imread(static_result)
+    assert image.shape[0] <= MAX_THUMBNAIL_HEIGHT
+    assert image.shape[1] <= MAX_THUMBNAIL_WIDTH
+    assert len(imageio.mimread(hover_result)) == 5
+
+    os.remove(static_result)
+    os.remove(hover_result)
+
+
+def test_parse_thumbnail_frames() -> None:
+    metadata = file_utils.VideoMetadata(duration=3.0, fps=30.0, width=2, height=1)
+    timestamps = [2.0, 0.0, 1.0]
+    frames_output = file_utils._get_thumbnail_frames_output(
+        "video.mp4", timestamps, metadata
+    )
+    frames = {0.0: b"\x00" * 6, 1.0: b"\x01" * 6, 2.0: b"\x02" * 6}
+
+    # A frame for each timestamp is split in timestamp order
+    with mock.patch("ffmpeg.run") as mocked_ffmpeg:
+        images = file_utils._parse_thumbnail_frames(
+            frames[0.0] + frames[1.0] + frames[2.0],
+            frames_output,
+            timestamps,
+            "video.mp4",
+            metadata,
+        )
+        mocked_ffmpeg.assert_not_called()
+    assert [image[0, 0, 0] for image in images] == [2, 0, 1]
+
+    # A missing frame is read for each timestamp separately and filled with the
+    # frame of the previous timestamp
+    with mock.patch("ffmpeg.run") as mocked_ffmpeg:
+        mocked_ffmpeg.side_effect = [(frames[0.0], b""), (b"", b""), (frames[2.0], b"")]
+        images = file_utils._parse_thumbnail_frames(
+            frames[0.0] + frames[2.0],
+            frames_output,
+            timestamps,
+            "video.mp4",
+            metadata,
+        )
+        assert mocked_ffmpeg.call_count == 3
+    assert [image[0, 0, 0] for image in images] == [2, 0, 0]
+
+
+@pytest.mark.skipif(
+    sys.platform == "win32",
+    reason="File removal for test cleanup sometimes fails on Windows",
+)
+def test_derive_media(resources_dir: Path, tmpdir: LocalPath) -> None:
+    derived_media = file_utils.derive_media(
+        video_read_path=str(resources_dir / EXAMPLE_VIDEO_HD_FILENAME),
+        audio_save_path=str(Path(tmpdir) / "test.wav"),
+        session_content_hash="example6",
+    )
+
+    # Audio and logs
+    assert Path(derived_media.audio_path).stat().st_size > 0
+    assert Path(derived_media.ffmpeg_stdout_path).exists()
+    assert Path(derived_media.ffmpeg_stderr_path).exists()
+
+    # Thumbnails
+    assert derived_media.static_thumbnail_path == "example6-static-thumbnail.png"
+    assert derived_media.hover_thumbnail_path == "example6-hover-thumbnail.gif"
+    assert len(imageio.mimread(derived_media.hover_thumbnail_path)) == 10
+
+    os.remove(derived_media.static_thumbnail_path)
+    os.remove(derived_media.hover_thumbnail_path)
+
+
+def test_stream_audio(resources_dir: Path) -> None:
+    audio = b"".join(
+        file_utils.stream_audio(str(resources_dir / EXAMPLE_VIDEO_HD_FILENAME))
+    )
+
+    # 16 kHz mono 16-bit PCM of a ~6 second video
+    assert len(audio) % 2 == 0
+    assert 5 * 16000 * 2 < len(audio) < 7 * 16000 * 2
+
+
+def test_stream_audio_hashes_video(resources_dir: Path) -> None:
+    video_path = str(resources_dir / EXAMPLE_VIDEO_HD_FILENAME)
+    video_hasher = sha256()
+    audio = b"".join(
+        file_utils.stream_audio(video_path, on_video_chunk=video_hasher.update)
+    )
+
+    # The video is hashed while it is piped to ffmpeg
+    assert len(audio) > 0
+    assert video_hasher.hexdigest() == file_utils.hash_file_contents(video_path)
+
+
+def test_stream_audio_invalid(resources_dir: Path) -> None:
+    import ffmpeg
+
+    with pytest.raises(ffmpeg.Error):
+        list(file_utils.stream_audio(str(resources_dir / "fake_creds.json")))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+from pathlib import Path
+from unittest import mock
+from unittest.mock import MagicMock
+
+from py._path.local import LocalPath
+from requests.structures import CaseInsensitiveDict
+
+from cdp_backend.utils.fingerprint_cache import (
+    FingerprintCache,
+    get_resource_fingerprint,
+)
+
+#############################################################################
+
+
+def test_get_resource_fingerprint(tmpdir: LocalPath) -> None:
+    resource = Path(tmpdir) / "video.mp4"
+    resource.write_bytes(b"video")
+
+    fingerprint = get_resource_fingerprint(str(resource))
+    assert fingerprint is not None
+
+    # Rewriting the resource changes the fingerprint
+    resource.write_bytes(b"changed")
+    os.utime(resource, (0, 0))
+    assert get_resource_fingerprint(str(resource)) != fingerprint
+
+
+def test_get_resource_fingerprint_gcs_info() -> None:
+    info = {"size": 5, "md5Hash": "abc==", "crc32c": "def=="}
+    assert (
+        get_resource_fingerprint("gs://bucket/video.mp4", info=info)
+        == "size=5;md5Hash=abc==;crc32c=def=="
+    )
+
+    # Size alone is not a fingerprint
+    assert get_resource_fingerprint("gs://bucket/video.mp4", info={"size": 5}) is None
+
+
+@mock.patch("requests.head")
+def test_get_resource_fingerprint_http_headers(mocked_head: MagicMock) -> None:
+    mocked_head.return_value.headers = CaseInsensitiveDict(
+        {
+            "content-length": "5",
+            "etag": '"abc"',
+            "last-modified": "Fri, 01 Jan 2021 00:00:00 GMT",
+            "content-type": "video/mp4",
+        }
+    )
+    assert (
+        get_resource_fingerprint("https://example.com/video.mp4")
+        == 'size=5;ETag="abc";Last-Modified=Fri, 01 Jan 2021 00:00:00 GMT'
+    )
+    mocked_head.assert_called_once_with(
+        "https://example.com/video.mp4",
+        allow_redirects=True,
+        timeout=mock.ANY,
+    )
+
+    # Content length alone is not a fingerprint
+    mocked_head.return_value.headers = CaseInsensitiveDict({"content-length": "5"})
+    assert get_resource_fingerprint("https://example.com/video.mp4") is None
+
+
+def test_fingerprint_cache(tmpdir: LocalPath) -> None:
+    resource = Path(tmpdir) / "video.mp4"
+    resource.write_bytes(b"video")
+    cache = FingerprintCache(str(Path(tmpdir) / "fingerprints"))
+
+    assert cache.get(str(resource)) is None
+    cache.put(str(resource), "content-hash")
+    assert cache.get(str(resource)) == "content-hash"
+
+    # Entries persist between cache instances
+    assert (
+        FingerprintCache(str(Path(tmpdir) / "fingerprints")).get(str(resource))
+        == "content-hash"
+    )
+
+    # A changed resource is a cache miss
+    resource.write_bytes(b"changed")
+    os.utime(resource, (0, 0))
+    assert cache.get(str(resource)) is None
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+from hashlib import sha256
+from pathlib import Path
+
+import fsspec
+import pytest
+from py._path.local import LocalPath
+
+from cdp_backend.utils.media_cache import LocalMediaCache, get_media_cache
+
+#############################################################################
+
+
+def _write_remote(uri: str, content: bytes) -> None:
+    with fsspec.open(uri, "wb") as open_f:
+        open_f.write(content)
+
+
+@pytest.fixture
+def media_cache(tmpdir: LocalPath) -> LocalMediaCache:
+    return LocalMediaCache(cache_dir=Path(tmpdir) / "cache", max_bytes=10)
+
+
+def test_get_downloads_once(media_cache: LocalMediaCache) -> None:
+    _write_remote("memory://media-cache/a.mp4", b"aaaa")
+
+    first = media_cache.get("memory://media-cache/a.mp4")
+    assert Path(first).read_bytes() == b"aaaa"
+    assert first.endswith(".mp4")
+
+    # Remove the remote to prove the second get is served from the cache
+    fsspec.filesystem("memory").rm("media-cache/a.mp4")
+    second = media_cache.get("memory://media-cache/a.mp4")
+    assert first == second
+
+
+def test_get_local_file_is_not_copied(
+    media_cache: LocalMediaCache, tmpdir: LocalPath
+) -> None:
+    local_file = Path(tmpdir) / "local.mp4"
+    local_file.write_bytes(b"local")
+
+    assert media_cache.get(str(local_file)) == str(local_file.resolve())
+    assert len(list(media_cache.cache_dir.iterdir())) == 0
+
+
+def test_lru_eviction(media_cache: LocalMediaCache) -> None:
+    for name in ["a", "b", "c"]:
+        _write_remote(f"memory://media-cache/{name}.mp4", b"1234")
+
+    path_a = Path(media_cache.get("memory://media-cache/a.mp4"))
+    path_b = Path(media_cache.get("memory://media-cache/b.mp4"))
+
+    # Make "a" the most recently used entry
+    past = time.time() - 100
+    os.utime(path_b, (past, past))
+
+    # Adding "c" goes over quota and "b" should be evicted
+    path_c = Path(media_cache.get("memory://media-cache/c.mp4"))
+    assert path_a.is_file()
+    assert not path_b.is_file()
+    assert path_c.is_file()
+
+
+def test_leased_entries_are_not_evicted(media_cache: LocalMediaCache) -> None:
+    for name in ["a", "b", "c"]:
+        _write_remote(f"memory://media-cache/{name}.mp4", b"123456")
+
+    with media_cache.open("memory://media-cache/a.mp4") as leased_path:
+        media_cache.get("memory://media-cache/b.mp4")
+        media_cache.get("memory://media-cache/c.mp4")
+        assert Path(leased_path).is_file()
+
+    # Once released the entry can be evicted again
+    media_cache.evict()
+    assert not Path(leased_path).is_file()
+
+
+def test_add(media_cache: LocalMediaCache, tmpdir: LocalPath) -> None:
+    local_file = Path(tmpdir) / "upload.mp4"
+    local_file.write_bytes(b"video")
+
+    entry = media_cache.add("gs://bucket/upload.mp4", local_file)
+    assert Path(entry).read_bytes() == b"video"
+    assert media_cache.get_entry_path("gs://bucket/upload.mp4") == Path(entry)
+
+    # The original file is left in place
+    assert local_file.is_file()
+
+
+def test_get_content_hash(media_cache: LocalMediaCache) -> None:
+    _write_remote("memory://media-cache/hashed.mp4", b"hash me")
+
+    content_hash = media_cache.get_content_hash("memory://media-cache/hashed.mp4")
+    assert content_hash == sha256(b"hash me").hexdigest()
+
+    # The hash is stored alongside the entry rather than recomputed from disk
+    entry_path = media_cache.get_entry_path("memory://media-cache/hashed.mp4")
+    assert Path(f"{entry_path}.sha256").read_text() == content_hash
+
+
+def test_get_media_cache(tmpdir: LocalPath) -> None:
+    cache_dir = Path(tmpdir) / "configured-cache"
+
+    media_cache = get_media_cache(cache_dir=cache_dir, max_bytes=1024)
+    assert media_cache.cache_dir == cache_dir.resolve()
+    assert media_cache.max_bytes == 1024
+
+    # Caches are shared per directory and quota
+    assert get_media_cache(cache_dir=str(cache_dir), max_bytes=1024) is media_cache
+    assert get_media_cache(cache_dir=cache_dir, max_bytes=2048) is not media_cache
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import List, Optional
+
+import pytest
+
+from cdp_backend.utils.phrase_budget import PhraseBudget
+
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "tiers, max_phrases, max_total_chars, expected",
+    [
+        ([[]], 500, 10000, []),
+        ([["a", None, "b", "a"]], 500, 10000, ["a", "b"]),
+        ([["b"], ["a", "b"]], 500, 10000, ["b", "a"]),
+        ([[str(i) for i in range(600)]], 500, 10000, [str(i) for i in range(500)]),
+        ([[f"{i:03}" for i in range(10)]], 500, 10, ["000", "001", "002"]),
+        # Longer phrases are skipped but shorter ones still fit
+        ([["aaaa", "bbbbbbbb", "cc"], ["dddd"]], 500, 10, ["aaaa", "cc", "dddd"]),
+        ([["-" * 100] * 200], 500, 10000, ["-" * 100]),
+        (
+            [[f"{i:0100}" for i in range(200)]],
+            500,
+            10000,
+            [f"{i:0100}" for i in range(100)],
+        ),
+    ],
+)
+def test_phrase_budget(
+    tiers: List[List[Optional[str]]],
+    max_phrases: int,
+    max_total_chars: int,
+    expected: List[str],
+) -> None:
+    budget = PhraseBudget(max_phrases=max_phrases, max_total_chars=max_total_chars)
+    for tier in tiers:
+        budget.extend(tier)
+
+    assert budget.phrases == expected
+    assert budget.total_chars == sum(len(phrase) for phrase in expected)
+
+
+def test_phrase_budget_clean_phrase() -> None:
+    budget = PhraseBudget(clean_phrase=str.strip)
+    budget.extend([" a ", "a", "b "])
+    assert budget.phrases == ["a", "b"]
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+
+from cdp_backend.utils.stem_cache import StemCache
+
+#############################################################################
+
+
+def test_stem_cache() -> None:
+    cache = StemCache(max_size=2)
+
+    assert cache.stem("housing") == "hous"
+    assert cache.stem("housing") == "hous"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # The least recently used stem is dropped
+    cache.stem("zoning")
+    cache.stem("housing")
+    cache.stem("affordability")
+    assert len(cache) == 2
+    cache.stem("zoning")
+    assert cache.misses == 4
+
+
+def test_stem_cache_vocabulary(tmp_path: Path) -> None:
+    vocabulary_path = str(tmp_path / "stem-vocabulary.json")
+
+    # No vocabulary yet
+    cache = StemCache()
+    assert cache.warm(vocabulary_path) == 0
+
+    for term in ["housing", "zoning", "affordability"]:
+        cache.stem(term)
+    cache.save(vocabulary_path)
+
+    # Warmed stems don't have to be stemmed again
+    warmed_cache = StemCache()
+    assert warmed_cache.warm(vocabulary_path) == 3
+    assert warmed_cache.stem("zoning") == "zone"
+    assert (warmed_cache.hits, warmed_cache.misses) == (1, 0)
+
+    # Vocabularies of other languages are ignored
+    assert StemCache(language="german").warm(vocabulary_path) == 0
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from typing import List
+
 import pytest
 
 from cdp_backend.utils import string_utils
@@ -29,6 +31,69 @@ def test_clean_text(text: str, expected: str, clean_stop_words: bool) -> None:
     assert string_utils.clean_text(text, clean_stop_words=clean_stop_words) == expected
 
 
+@pytest.mark.parametrize("clean_stop_words", [True, False])
+@pytest.mark.parametrize(
+    "texts",
+    [
+        [],
+        ["hello and goodbye", "and", "", "   \t\n  hello -- and   ", "good-bye  "],
+        # Texts containing the batch separator are still cleaned separately
+        ["hello\x00and", "goodbye"],
+    ],
+)
+def test_text_cleaner_clean_batch(texts: List[str], clean_stop_words: bool) -> None:
+    cleaner = string_utils.TextCleaner(clean_stop_words=clean_stop_words)
+    assert cleaner.clean_batch(texts) == [cleaner.clean(text) for text in texts]
+
+
+@pytest.mark.parametrize(
+    "text, expected_tokens, expected_term_indices, expected_stop_words",
+    [
+        ("Hello, world.", ["Hello", "world"], [0, 1], [False, False]),
+        (
+            "I said I will vote",
+            ["I", "said", "I", "will", "vote"],
+            [0, 1, 2, 3, 4],
+            [False, False, False, True, False],
+        ),
+        # Terms split by cleaning come from the same original term
+        (
+            "does intend--she does",
+            ["does", "intend", "she", "does"],
+            [0, 1, 1, 2],
+            [True, False, True, True],
+        ),
+        # Stop words within a term are removed
+        ("council’s   \t\n", ["council’"], [0], [False]),
+    ],
+)
+def test_text_tokenizer(
+    text: str,
+    expected_tokens: List[str],
+    expected_term_indices: List[int],
+    expected_stop_words: List[bool],
+) -> None:
+    tokenized = string_utils.TextTokenizer(
+        stop_words=["will", "does", "she", "s"]
+    ).tokenize(text)
+
+    assert tokenized.tokens == expected_tokens
+    assert tokenized.lowered_tokens == [token.lower() for token in expected_tokens]
+    assert tokenized.term_indices == expected_term_indices
+    assert tokenized.stop_words == expected_stop_words
+
+
+def test_text_tokenizer_content_n_grams() -> None:
+    tokenized = string_utils.TextTokenizer(stop_words=["and"]).tokenize(
+        "Zoning and housing affordability"
+    )
+    assert [
+        [tokenized.lowered_tokens[i] for i in n_gram]
+        for n_gram in tokenized.get_content_n_grams(2)
+    ] == [["zoning", "housing"], ["housing", "affordability"]]
+    assert len(tokenized.get_content_n_grams(4)) == 0
+
+
 @pytest.mark.parametrize(
     "text, expected",
     [
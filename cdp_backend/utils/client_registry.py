@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import fireo
+from gcsfs import GCSFileSystem
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Clients are keyed by process so that forked workers never share a connection
+_CLIENTS_LOCK = threading.Lock()
+_FIRESTORE_CONNECTION: Optional[Tuple[int, str]] = None
+_GCS_FILE_SYSTEMS: Dict[Tuple[int, str], GCSFileSystem] = {}
+
+###############################################################################
+
+
+def _get_client_key(credentials_file: Union[str, Path]) -> Tuple[int, str]:
+    return (os.getpid(), str(Path(credentials_file).expanduser().resolve()))
+
+
+def connect_firestore(credentials_file: Union[str, Path]) -> None:
+    """
+    Connect to the Firestore database for the provided credentials.
+
+    The (global) fireo connection is only created the first time this is called in a
+    process, or when the credentials change, and is reused for all other calls.
+
+    Parameters
+    ----------
+    credentials_file: Union[str, Path]
+        Path to Google Service Account Credentials JSON file.
+    """
+    global _FIRESTORE_CONNECTION
+
+    client_key = _get_client_key(credentials_file)
+    with _CLIENTS_LOCK:
+        if _FIRESTORE_CONNECTION != client_key:
+            fireo.connection(from_file=str(credentials_file))
+            _FIRESTORE_CONNECTION = client_key
+            log.debug(f"Connected to Firestore with credentials: {credentials_file}")
+
+
+def get_gcs_file_system(credentials_file: Union[str, Path]) -> GCSFileSystem:
+    """
+    Get the shared GCSFileSystem for the provided credentials.
+
+    A single file system (and therefore a single pool of keep-alive HTTP connections)
+    is created per process and credentials file.
+
+    Parameters
+    ----------
+    credentials_file: Union[str, Path]
+        Path to Google Service Account Credentials JSON file.
+
+    Returns
+    -------
+    file_system: GCSFileSystem
+        The shared, authenticated, GCSFileSystem.
+    """
+    client_key = _get_client_key(credentials_file)
+    with _CLIENTS_LOCK:
+        if client_key not in _GCS_FILE_SYSTEMS:
+            _GCS_FILE_SYSTEMS[client_key] = GCSFileSystem(token=str(credentials_file))
+
+        return _GCS_FILE_SYSTEMS[client_key]
+
+
+def reset_clients() -> None:
+    """
+    Forget all shared clients. The next request for a client creates a new one.
+    """
+    global _FIRESTORE_CONNECTION
+
+    with _CLIENTS_LOCK:
+        _FIRESTORE_CONNECTION = None
+        _GCS_FILE_SYSTEMS.clear()
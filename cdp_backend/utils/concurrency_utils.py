@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class PipelineStage:
+    DOWNLOAD = "download"
+    FFMPEG = "ffmpeg"
+    SPEECH_TO_TEXT = "speech_to_text"
+    DATABASE_WRITE = "database_write"
+
+
+DEFAULT_STAGE_LIMITS: Dict[str, int] = {
+    PipelineStage.DOWNLOAD: 4,
+    PipelineStage.FFMPEG: 2,
+    PipelineStage.SPEECH_TO_TEXT: 8,
+    PipelineStage.DATABASE_WRITE: 4,
+}
+
+###############################################################################
+
+_LOCAL_SEMAPHORES: Dict[Tuple[str, int], threading.BoundedSemaphore] = {}
+_LOCAL_SEMAPHORES_LOCK = threading.Lock()
+
+
+def _get_distributed_semaphore(stage: str, max_concurrent: int) -> Optional[Any]:
+    # Only use a cluster wide semaphore when running inside a Dask worker
+    try:
+        from distributed import Semaphore, get_worker
+
+        get_worker()
+    except (ImportError, ValueError):
+        return None
+
+    return Semaphore(max_leases=max_concurrent, name=f"cdp-stage-{stage}")
+
+
+def _get_local_semaphore(stage: str, max_concurrent: int) -> threading.BoundedSemaphore:
+    with _LOCAL_SEMAPHORES_LOCK:
+        key = (stage, max_concurrent)
+        if key not in _LOCAL_SEMAPHORES:
+            _LOCAL_SEMAPHORES[key] = threading.BoundedSemaphore(max_concurrent)
+
+        return _LOCAL_SEMAPHORES[key]
+
+
+@contextmanager
+def stage_limit(
+    stage: str, stage_limits: Optional[Dict[str, int]] = None
+) -> Iterator[None]:
+    """
+    Context manager that bounds how many tasks can be running a pipeline stage at the
+    same time.
+
+    When running on a Dask cluster the bound is shared by all workers of the cluster,
+    otherwise it is shared by all threads of the current process.
+
+    Parameters
+    ----------
+    stage: str
+        The name of the pipeline stage. See PipelineStage for the standard stages.
+    stage_limits: Optional[Dict[str, int]]
+        Overrides for the maximum number of concurrent tasks per stage. A limit of zero
+        (or less) means the stage is unbounded.
+        Default: None (use DEFAULT_STAGE_LIMITS)
+
+    Examples
+    --------
+    >>> with stage_limit(PipelineStage.FFMPEG):
+    ...     file_utils.split_audio(video_path, "audio.wav")
+    """
+    max_concurrent = {**DEFAULT_STAGE_LIMITS, **(stage_limits or {})}.get(stage, 0)
+    if max_concurrent <= 0:
+        yield
+        return
+
+    semaphore = _get_distributed_semaphore(stage, max_concurrent)
+    if semaphore is None:
+        semaphore = _get_local_semaphore(stage, max_concurrent)
+
+    with semaphore:
+        yield
@@ -4,13 +4,28 @@
 import logging
 import math
 import tempfile
+import threading
 from hashlib import sha256
 from pathlib import Path
-from typing import Optional, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import fsspec
 from fsspec.core import url_to_fs
 
+if TYPE_CHECKING:
+    import numpy as np
+
 ###############################################################################
 
 log = logging.getLogger(__name__)
@@ -59,6 +74,26 @@ def get_media_type(uri: str) -> Optional[str]:
     return None
 
 
+def _get_resource_copy_dst(
+    uri: str, dst: Optional[Union[str, Path]] = None, overwrite: bool = False
+) -> Path:
+    if dst is None:
+        dst = uri.split("/")[-1]
+
+    # Create tmp directory to save file in
+    dirpath = tempfile.mkdtemp()
+    dst = Path(dirpath) / dst
+
+    # Ensure dst doesn't exist
+    dst = Path(dst).resolve()
+    if dst.is_dir():
+        dst = dst / uri.split("/")[-1]
+    if dst.is_file() and not overwrite:
+        raise FileExistsError(dst)
+
+    return dst
+
+
 def resource_copy(
     uri: str, dst: Optional[Union[str, Path]] = None, overwrite: bool = False
 ) -> str:
@@ -81,19 +116,7 @@ def resource_copy(
     saved_path: str
         The path of where the resource ended up getting copied to.
     """
-    if dst is None:
-        dst = uri.split("/")[-1]
-
-    # Create tmp directory to save file in
-    dirpath = tempfile.mkdtemp()
-    dst = Path(dirpath) / dst
-
-    # Ensure dst doesn't exist
-    dst = Path(dst).resolve()
-    if dst.is_dir():
-        dst = dst / uri.split("/")[-1]
-    if dst.is_file() and not overwrite:
-        raise FileExistsError(dst)
+    dst = _get_resource_copy_dst(uri=uri, dst=dst, overwrite=overwrite)
 
     # Open requests connection to uri as a stream
     log.info(f"Beginning resource copy from: {uri}")
@@ -114,6 +137,44 @@ def resource_copy(
         raise e
 
 
+def stream_resource_copy(
+    uri: str, dst: Union[str, Path], buffer_size: int = 2**22
+) -> str:
+    """
+    Stream a resource (local or remote) to an exact local path while computing the
+    SHA256 hash of the content as the chunks arrive.
+
+    Parameters
+    ----------
+    uri: str
+        The uri for the resource to copy.
+    dst: Union[str, Path]
+        The exact local path to write the resource to.
+    buffer_size: int
+        The number of bytes to read (and hash) at a time.
+        Default: 2^22 (4MB)
+
+    Returns
+    -------
+    hash: str
+        The SHA256 hash for the resource contents.
+    """
+    hasher = sha256()
+
+    fs, remote_path = url_to_fs(uri)
+    with fs.open(remote_path, "rb") as open_resource:
+        with open(dst, "wb") as open_dst:
+            while True:
+                block = open_resource.read(buffer_size)
+                if not block:
+                    break
+
+                hasher.update(block)
+                open_dst.write(block)
+
+    return hasher.hexdigest()
+
+
 def split_audio(
     video_read_path: str,
     audio_save_path: str,
@@ -181,6 +242,376 @@ def split_audio(
     )
 
 
+def _feed_process_stdin(
+    process: Any,
+    uri: str,
+    chunk_size: int,
+    on_chunk: Optional[Callable[[bytes], None]],
+    stop: threading.Event,
+    errors: List[BaseException],
+) -> None:
+    process_reading = True
+    try:
+        fs, path = url_to_fs(uri)
+        with fs.open(path, "rb") as open_resource:
+            while not stop.is_set():
+                chunk = open_resource.read(chunk_size)
+                if not chunk:
+                    break
+
+                if on_chunk is not None:
+                    on_chunk(chunk)
+
+                # ffmpeg may stop reading once it has all of the audio,
+                # the rest of the resource is still read for on_chunk
+                if process_reading:
+                    try:
+                        process.stdin.write(chunk)
+                    except BrokenPipeError:
+                        process_reading = False
+                        if on_chunk is None:
+                            break
+
+    except BaseException as e:
+        errors.append(e)
+
+    finally:
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def stream_audio(
+    video_read_uri: str,
+    chunk_size: int = 2**20,
+    on_video_chunk: Optional[Callable[[bytes], None]] = None,
+) -> Iterator[bytes]:
+    """
+    Split the audio from a (local or remote) video with ffmpeg and yield it as raw
+    16 kHz mono 16-bit little endian PCM chunks.
+
+    The video is read with fsspec (so remote file system credentials apply) and
+    piped into ffmpeg, it is never stored on disk. Because ffmpeg can't seek in
+    the piped video, the video must be streamable (i.e. an MP4 with the "moov" atom
+    at the start of the file).
+
+    Parameters
+    ----------
+    video_read_uri: str
+        The uri for the video to split the audio from.
+    chunk_size: int
+        The number of bytes of audio (and video) to read at a time.
+        Default: 2^20 (1MB)
+    on_video_chunk: Optional[Callable[[bytes], None]]
+        A function called with every chunk of the video as it is read, i.e. the
+        update function of a hash to compute the video content hash in the same
+        pass. The whole video is always read when provided.
+        Default: None
+
+    Yields
+    ------
+    chunk: bytes
+        The next chunk of PCM audio data.
+
+    Raises
+    ------
+    ffmpeg.Error
+        ffmpeg failed to split the audio.
+    """
+    import ffmpeg
+
+    stream = ffmpeg.output(
+        ffmpeg.input("pipe:").audio,
+        "pipe:",
+        format="s16le",
+        acodec="pcm_s16le",
+        ac=1,
+        ar="16k",
+    )
+
+    # Run dag
+    log.debug(f"Beginning audio stream for: {video_read_uri}")
+    process = ffmpeg.run_async(
+        stream, pipe_stdin=True, pipe_stdout=True, pipe_stderr=True
+    )
+
+    # Feed the video to ffmpeg in the background
+    stop_feeding = threading.Event()
+    feed_errors: List[BaseException] = []
+    feeder = threading.Thread(
+        target=_feed_process_stdin,
+        args=(
+            process,
+            video_read_uri,
+            chunk_size,
+            on_video_chunk,
+            stop_feeding,
+            feed_errors,
+        ),
+        daemon=True,
+    )
+    feeder.start()
+
+    # Drain stderr in the background so that ffmpeg never blocks on a full pipe
+    err_chunks: List[bytes] = []
+    err_reader = threading.Thread(
+        target=lambda: err_chunks.extend(iter(process.stderr.readline, b"")),
+        daemon=True,
+    )
+    err_reader.start()
+
+    completed = False
+    try:
+        while True:
+            chunk = process.stdout.read(chunk_size)
+            if not chunk:
+                break
+
+            yield chunk
+
+        completed = True
+    finally:
+        # Stop reading the video if the audio isn't consumed to the end
+        if not completed:
+            stop_feeding.set()
+
+        process.stdout.close()
+        process.wait()
+        feeder.join()
+        err_reader.join()
+
+    if len(feed_errors) > 0:
+        raise feed_errors[0]
+    if process.returncode != 0:
+        raise ffmpeg.Error("ffmpeg", b"", b"".join(err_chunks))
+
+    log.debug(f"Completed audio stream for: {video_read_uri}")
+
+
+class VideoMetadata(NamedTuple):
+    duration: float
+    fps: float
+    width: int
+    height: int
+
+
+def get_video_metadata(video_path: str) -> VideoMetadata:
+    """
+    Get the duration, frame rate, and frame size of a video from its container
+    metadata. No frames are decoded.
+
+    Parameters
+    ----------
+    video_path: str
+        Path to the video to read the metadata of.
+
+    Returns
+    -------
+    metadata: VideoMetadata
+        The video duration (in seconds), frames per second, and frame dimensions.
+    """
+    import imageio_ffmpeg
+
+    resolved_video_path = Path(video_path).resolve(strict=True)
+
+    # The first item produced by the frame generator is the parsed metadata,
+    # frames are only decoded when the generator is advanced further
+    frames = imageio_ffmpeg.read_frames(str(resolved_video_path))
+    try:
+        meta = next(frames)
+    except (IOError, RuntimeError, StopIteration) as e:
+        raise ValueError(f"Could not read video metadata from: {video_path}") from e
+    finally:
+        frames.close()
+
+    width, height = meta["size"]
+    return VideoMetadata(
+        duration=float(meta["duration"]),
+        fps=float(meta["fps"]),
+        width=int(width),
+        height=int(height),
+    )
+
+
+class _ThumbnailFramesOutput(NamedTuple):
+    stream: Any
+    timestamps: List[float]
+    width: int
+    height: int
+
+
+def _get_thumbnail_frames_output(
+    video_path: str, timestamps: List[float], metadata: VideoMetadata
+) -> _ThumbnailFramesOutput:
+    import ffmpeg
+
+    final_ratio = find_proper_resize_ratio(metadata.height, metadata.width)
+    if final_ratio < 1:
+        width = math.floor(metadata.width * final_ratio)
+        height = math.floor(metadata.height * final_ratio)
+    else:
+        width = metadata.width
+        height = metadata.height
+
+    # Every timestamp is its own input so that ffmpeg input seeking (-ss before -i)
+    # jumps straight to it instead of decoding the video from the start, and only
+    # reads a couple of frames worth of the input after seeking. The single frame
+    # from each is then scaled and concatenated into one output stream.
+    unique_timestamps = sorted(set(timestamps))
+    frame_read_duration = f"{max(2 / metadata.fps, 0.1):.3f}"
+    frame_streams = [
+        ffmpeg.input(video_path, ss=f"{timestamp:.3f}", t=frame_read_duration)
+        .video.trim(end_frame=1)
+        .setpts("PTS-STARTPTS")
+        .filter("scale", width, height)
+        .filter("setsar", 1)
+        for timestamp in unique_timestamps
+    ]
+    stream = ffmpeg.output(
+        ffmpeg.concat(*frame_streams, v=1, a=0),
+        "pipe:",
+        format="rawvideo",
+        pix_fmt="rgb24",
+        vsync="passthrough",
+    )
+
+    return _ThumbnailFramesOutput(
+        stream=stream,
+        timestamps=unique_timestamps,
+        width=width,
+        height=height,
+    )
+
+
+def _read_thumbnail_frame(
+    video_path: str, timestamp: float, metadata: VideoMetadata
+) -> Optional["np.ndarray"]:
+    import ffmpeg
+    import numpy as np
+
+    frames_output = _get_thumbnail_frames_output(video_path, [timestamp], metadata)
+    frame_size = frames_output.width * frames_output.height * 3
+    try:
+        out, _ = ffmpeg.run(
+            frames_output.stream, capture_stdout=True, capture_stderr=True
+        )
+    except ffmpeg.Error as e:
+        log.debug(f"Could not read frame at {timestamp}s from: {video_path} ({e})")
+        return None
+
+    if len(out) < frame_size:
+        return None
+
+    return np.frombuffer(out[:frame_size], dtype=np.uint8).reshape(
+        (frames_output.height, frames_output.width, 3)
+    )
+
+
+def _parse_thumbnail_frames(
+    out: bytes,
+    frames_output: _ThumbnailFramesOutput,
+    timestamps: List[float],
+    video_path: str,
+    metadata: VideoMetadata,
+) -> List["np.ndarray"]:
+    import numpy as np
+
+    width = frames_output.width
+    height = frames_output.height
+    frame_size = width * height * 3
+    num_frames = len(frames_output.timestamps)
+
+    images: List[Optional["np.ndarray"]]
+    if len(out) == frame_size * num_frames:
+        images = [
+            np.frombuffer(
+                out[i * frame_size : (i + 1) * frame_size], dtype=np.uint8
+            ).reshape((height, width, 3))
+            for i in range(num_frames)
+        ]
+
+    # Seeking to the very end of a stream can produce no frame, and the
+    # concatenated output doesn't tell which timestamp is missing one,
+    # so read the frame of each timestamp on its own instead
+    else:
+        log.debug(
+            f"Read {len(out) // frame_size} of {num_frames} thumbnail frames "
+            f"from: {video_path}, reading each frame separately"
+        )
+        images = [
+            _read_thumbnail_frame(video_path, timestamp, metadata)
+            for timestamp in frames_output.timestamps
+        ]
+
+    read_images = [image for image in images if image is not None]
+    if len(read_images) == 0:
+        raise ValueError(f"Could not read any frames from: {video_path}")
+
+    # Fill any missing frame with the frame of the closest earlier timestamp
+    # (or the first read frame when no earlier timestamp has one)
+    previous_image = read_images[0]
+    timestamp_images: Dict[float, "np.ndarray"] = {}
+    for timestamp, image in zip(frames_output.timestamps, images):
+        if image is None:
+            image = previous_image
+
+        timestamp_images[timestamp] = image
+        previous_image = image
+
+    return [timestamp_images[timestamp] for timestamp in timestamps]
+
+
+def _extract_thumbnail_frames(
+    video_path: str, timestamps: List[float], metadata: VideoMetadata
+) -> List["np.ndarray"]:
+    import ffmpeg
+
+    frames_output = _get_thumbnail_frames_output(video_path, timestamps, metadata)
+
+    log.debug(f"Beginning thumbnail frame extraction for: {video_path}")
+    out, _ = ffmpeg.run(frames_output.stream, capture_stdout=True, capture_stderr=True)
+    log.debug(f"Completed thumbnail frame extraction for: {video_path}")
+
+    return _parse_thumbnail_frames(out, frames_output, timestamps, video_path, metadata)
+
+
+def _write_static_thumbnail(image: "np.ndarray", session_content_hash: str) -> str:
+    import imageio
+
+    png_path = f"{session_content_hash}-static-thumbnail.png"
+    imageio.imwrite(png_path, image)
+
+    return png_path
+
+
+def _write_hover_thumbnail(
+    images: List["np.ndarray"], session_content_hash: str
+) -> str:
+    import imageio
+
+    gif_path = f"{session_content_hash}-hover-thumbnail.gif"
+    with imageio.get_writer(gif_path, mode="I") as writer:
+        for image in images:
+            writer.append_data(image)
+
+    return gif_path
+
+
+def _get_static_thumbnail_timestamp(metadata: VideoMetadata, seconds: int) -> float:
+    if seconds < metadata.duration:
+        return float(seconds)
+
+    return 0.0
+
+
+def _get_hover_thumbnail_timestamps(
+    metadata: VideoMetadata, num_frames: int
+) -> List[float]:
+    step_size = metadata.duration / num_frames
+    return [i * step_size for i in range(num_frames)]
+
+
 def get_static_thumbnail(
     video_path: str, session_content_hash: str, seconds: int = 30
 ) -> str:
@@ -204,35 +635,14 @@ def get_static_thumbnail(
         The name of the thumbnail file:
         Always session_content_hash + "-static-thumbnail.png"
     """
-    import imageio
-    from PIL import Image
-
-    reader = imageio.get_reader(video_path)
-    png_path = ""
-    if reader.get_length() > 1:
-        png_path = f"{session_content_hash}-static-thumbnail.png"
-
-    image = None
-    try:
-        frame_to_take = math.floor(reader.get_meta_data()["fps"] * seconds)
-        image = reader.get_data(frame_to_take)
-    except (ValueError, IndexError):
-        reader = imageio.get_reader(video_path)
-        image = reader.get_data(0)
-
-    final_ratio = find_proper_resize_ratio(image.shape[0], image.shape[1])
-
-    if final_ratio < 1:
-        image = Image.fromarray(image).resize(
-            (
-                math.floor(image.shape[1] * final_ratio),
-                math.floor(image.shape[0] * final_ratio),
-            )
-        )
-
-    imageio.imwrite(png_path, image)
+    metadata = get_video_metadata(video_path)
+    (image,) = _extract_thumbnail_frames(
+        video_path,
+        [_get_static_thumbnail_timestamp(metadata, seconds)],
+        metadata,
+    )
 
-    return png_path
+    return _write_static_thumbnail(image, session_content_hash)
 
 
 def get_hover_thumbnail(
@@ -257,37 +667,171 @@ def get_hover_thumbnail(
         The name of the thumbnail file:
         Always session_content_hash + "-hover-thumbnail.png"
     """
-    import imageio
-    import numpy as np
-    from PIL import Image
+    metadata = get_video_metadata(video_path)
+    images = _extract_thumbnail_frames(
+        video_path,
+        _get_hover_thumbnail_timestamps(metadata, num_frames),
+        metadata,
+    )
 
-    reader = imageio.get_reader(video_path)
-    gif_path = ""
-    if reader.get_length() > 1:
-        gif_path = f"{session_content_hash}-hover-thumbnail.gif"
+    return _write_hover_thumbnail(images, session_content_hash)
 
-    count = 0
-    for i, image in enumerate(reader):
-        count += 1
-    step_size = math.floor(count / num_frames)
 
-    height = image.shape[0]
-    width = image.shape[1]
-    final_ratio = find_proper_resize_ratio(height, width)
+def get_thumbnails(
+    video_path: str,
+    session_content_hash: str,
+    seconds: int = 30,
+    num_frames: int = 10,
+) -> Tuple[str, str]:
+    """
+    Produce both the static png and hover gif thumbnails for a video from a single
+    metadata probe. Each frame is read by seeking directly to its timestamp rather
+    than decoding the video from the start.
 
-    with imageio.get_writer(gif_path, mode="I") as writer:
-        for i in range(0, num_frames):
-            if final_ratio < 1:
-                image = Image.fromarray(reader.get_data(i * step_size)).resize(
-                    (math.floor(width * final_ratio), math.floor(height * final_ratio))
-                )
-            else:
-                image = Image.fromarray(reader.get_data(i * step_size))
+    Parameters
+    ----------
+    video_path: str
+        The path to the video from which the thumbnails will be produced
+    session_content_hash: str
+        The video content hash. This will be used in the produced image file names
+    seconds: int
+        Determines after how many seconds a frame will be selected to produce the
+        static thumbnail. The default is 30 seconds
+    num_frames: int
+        Determines the number of frames in the hover thumbnail
+
+    Returns
+    -------
+    static_thumbnail_path: str
+        Always session_content_hash + "-static-thumbnail.png"
+    hover_thumbnail_path: str
+        Always session_content_hash + "-hover-thumbnail.gif"
+    """
+    metadata = get_video_metadata(video_path)
+    static_image, *hover_images = _extract_thumbnail_frames(
+        video_path,
+        [
+            _get_static_thumbnail_timestamp(metadata, seconds),
+            *_get_hover_thumbnail_timestamps(metadata, num_frames),
+        ],
+        metadata,
+    )
+
+    return (
+        _write_static_thumbnail(static_image, session_content_hash),
+        _write_hover_thumbnail(hover_images, session_content_hash),
+    )
 
-            final_image = np.asarray(image, dtype="int32")
-            writer.append_data(final_image)
 
-    return gif_path
+class DerivedMedia(NamedTuple):
+    audio_path: str
+    ffmpeg_stdout_path: str
+    ffmpeg_stderr_path: str
+    static_thumbnail_path: str
+    hover_thumbnail_path: str
+
+
+def derive_media(
+    video_read_path: str,
+    audio_save_path: str,
+    session_content_hash: str,
+    overwrite: bool = False,
+    seconds: int = 30,
+    num_frames: int = 10,
+) -> DerivedMedia:
+    """
+    Split the audio from a video file and produce the static and hover thumbnails
+    with a single ffmpeg run.
+
+    The audio and the thumbnail frames are outputs of the same ffmpeg graph, so a
+    single ffmpeg process (and a single metadata probe) is used rather than one per
+    function (`split_audio`, `get_static_thumbnail`, and `get_hover_thumbnail`).
+    Within that process the video is opened once for the audio and once more for
+    each unique thumbnail timestamp, each of which seeks straight to its frame.
+
+    Parameters
+    ----------
+    video_read_path: str
+        Path to the video to derive media from.
+    audio_save_path: str
+        Path to where the audio should be stored.
+    session_content_hash: str
+        The video content hash. This will be used in the produced image file names
+    overwrite: bool
+        Boolean value indicating whether or not to overwrite an existing audio file.
+    seconds: int
+        Determines after how many seconds a frame will be selected to produce the
+        static thumbnail. The default is 30 seconds
+    num_frames: int
+        Determines the number of frames in the hover thumbnail
+
+    Returns
+    -------
+    derived_media: DerivedMedia
+        The paths to the split audio, the ffmpeg stdout and stderr log files, and the
+        static and hover thumbnails.
+    """
+    import ffmpeg
+
+    # Check paths
+    resolved_video_read_path = Path(video_read_path).resolve(strict=True)
+    resolved_audio_save_path = Path(audio_save_path).resolve()
+    if resolved_audio_save_path.is_file() and not overwrite:
+        raise FileExistsError(resolved_audio_save_path)
+    if resolved_audio_save_path.is_dir():
+        raise IsADirectoryError(resolved_audio_save_path)
+
+    # Construct ffmpeg dag
+    metadata = get_video_metadata(str(resolved_video_read_path))
+    timestamps = [
+        _get_static_thumbnail_timestamp(metadata, seconds),
+        *_get_hover_thumbnail_timestamps(metadata, num_frames),
+    ]
+    frames_output = _get_thumbnail_frames_output(
+        str(resolved_video_read_path), timestamps, metadata
+    )
+    audio_output = ffmpeg.output(
+        ffmpeg.input(str(resolved_video_read_path)).audio,
+        filename=resolved_audio_save_path,
+        format="wav",
+        acodec="pcm_s16le",
+        ac=1,
+        ar="16k",
+    )
+    stream = ffmpeg.merge_outputs(audio_output, frames_output.stream)
+
+    # Run dag
+    log.debug(f"Beginning media derivation for: {video_read_path}")
+    out, err = ffmpeg.run(
+        stream, capture_stdout=True, capture_stderr=True, overwrite_output=overwrite
+    )
+    log.debug(f"Completed media derivation for: {video_read_path}")
+    log.debug(f"Stored audio: {audio_save_path}")
+
+    # Store logs
+    # stdout is used for the thumbnail frames so only stderr has log content
+    ffmpeg_stdout_path = resolved_audio_save_path.with_suffix(".out")
+    ffmpeg_stderr_path = resolved_audio_save_path.with_suffix(".err")
+
+    with open(ffmpeg_stdout_path, "wb") as write_out:
+        write_out.write(b"")
+    with open(ffmpeg_stderr_path, "wb") as write_err:
+        write_err.write(err)
+
+    # Store thumbnails
+    static_image, *hover_images = _parse_thumbnail_frames(
+        out, frames_output, timestamps, str(resolved_video_read_path), metadata
+    )
+
+    return DerivedMedia(
+        audio_path=str(resolved_audio_save_path),
+        ffmpeg_stdout_path=str(ffmpeg_stdout_path),
+        ffmpeg_stderr_path=str(ffmpeg_stderr_path),
+        static_thumbnail_path=_write_static_thumbnail(
+            static_image, session_content_hash
+        ),
+        hover_thumbnail_path=_write_hover_thumbnail(hover_images, session_content_hash),
+    )
 
 
 def find_proper_resize_ratio(height: int, width: int) -> float:
@@ -324,7 +868,7 @@ def find_proper_resize_ratio(height: int, width: int) -> float:
     return 2
 
 
-def hash_file_contents(uri: str, buffer_size: int = 2 ** 16) -> str:
+def hash_file_contents(uri: str, buffer_size: int = 2**16) -> str:
     """
     Return the SHA256 hash of a file's content.
 
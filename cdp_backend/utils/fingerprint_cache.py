@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+from hashlib import sha256
+from typing import Any, Dict, Optional
+
+import requests
+from fsspec.core import url_to_fs
+from fsspec.implementations.local import LocalFileSystem
+from fsspec.spec import AbstractFileSystem
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Metadata fields that change whenever the content of a resource changes
+# GCS: md5Hash / crc32c, S3: ETag, HTTP: ETag / Content-MD5 / Digest
+_CONTENT_VALIDATOR_FIELDS = (
+    "md5Hash",
+    "crc32c",
+    "ETag",
+    "etag",
+    "Content-MD5",
+    "Digest",
+)
+
+# Metadata fields that change whenever a resource is rewritten
+_MODIFIED_FIELDS = (
+    "generation",
+    "updated",
+    "LastModified",
+    "Last-Modified",
+    "mtime",
+)
+
+# The validator headers of HTTP resources, fsspec's HTTP file system only reports
+# the size of a resource so they are requested with an explicit HEAD request
+_HTTP_VALIDATOR_HEADERS = (
+    "ETag",
+    "Content-MD5",
+    "Digest",
+    "Last-Modified",
+)
+
+HTTP_HEAD_TIMEOUT = 30
+
+###############################################################################
+
+
+def _get_http_info(uri: str) -> Dict[str, Any]:
+    response = requests.head(uri, allow_redirects=True, timeout=HTTP_HEAD_TIMEOUT)
+    response.raise_for_status()
+
+    info: Dict[str, Any] = {"size": response.headers.get("Content-Length")}
+    for header in _HTTP_VALIDATOR_HEADERS:
+        info[header] = response.headers.get(header)
+
+    return info
+
+
+def get_resource_fingerprint(
+    uri: str, info: Optional[Dict[str, Any]] = None
+) -> Optional[str]:
+    """
+    Get a fingerprint for a resource from its file system metadata alone (a HEAD
+    request for remote resources), without reading any of its content.
+
+    Parameters
+    ----------
+    uri: str
+        The uri for the resource to fingerprint.
+    info: Optional[Dict[str, Any]]
+        Already retrieved file system info for the resource.
+        Default: None (retrieve the info from the resource's file system, or the
+        headers of a HEAD request for HTTP resources)
+
+    Returns
+    -------
+    fingerprint: Optional[str]
+        The fingerprint for the resource. None if the file system does not provide
+        enough metadata to reliably detect content changes.
+    """
+    if info is None:
+        if uri.startswith(("http://", "https://")):
+            info = _get_http_info(uri)
+        else:
+            fs, remote_path = url_to_fs(uri)
+            info = fs.info(remote_path)
+
+    validators = [
+        f"{field}={info[field]}"
+        for field in (*_CONTENT_VALIDATOR_FIELDS, *_MODIFIED_FIELDS)
+        if info.get(field) is not None
+    ]
+
+    # Size alone is not enough to say that the content has not changed
+    if len(validators) == 0:
+        return None
+
+    return ";".join([f"size={info.get('size')}", *validators])
+
+
+class FingerprintCache:
+    """
+    A persistent mapping of resource fingerprints to the SHA256 hash of the resource
+    content.
+
+    Allows checking whether a remote resource has already been processed (all of our
+    derived artifacts are keyed by content hash) without downloading it again.
+
+    Parameters
+    ----------
+    storage_path: str
+        The directory (on the provided file system) to store the cache entries in.
+    fs: Optional[AbstractFileSystem]
+        The file system to store the cache entries on.
+        Default: None (the file system inferred from storage_path)
+
+    Examples
+    --------
+    Storing the cache in a GCS bucket so that it persists between pipeline runs.
+
+    >>> fs = fs_functions.initialize_gcs_file_system(credentials_file)
+    >>> cache = FingerprintCache(f"{bucket}/fingerprint-cache", fs=fs)
+    >>> session_content_hash = cache.get(video_uri)
+    """
+
+    def __init__(self, storage_path: str, fs: Optional[AbstractFileSystem] = None):
+        if fs is None:
+            fs, storage_path = url_to_fs(storage_path)
+
+        self.fs = fs
+        self.storage_path = storage_path.rstrip("/")
+        self._memo: Dict[str, str] = {}
+        self._memo_lock = threading.Lock()
+
+    def _get_entry_path(self, uri: str, fingerprint: str) -> str:
+        key = sha256(f"{uri}\n{fingerprint}".encode("utf-8")).hexdigest()
+        return f"{self.storage_path}/{key}"
+
+    @staticmethod
+    def _get_fingerprint(uri: str) -> Optional[str]:
+        try:
+            return get_resource_fingerprint(uri)
+        except Exception as e:
+            log.debug(f"Could not fingerprint resource: '{uri}' ({e})")
+            return None
+
+    def get(self, uri: str) -> Optional[str]:
+        """
+        Get the content hash of a resource if it was stored for the resource's current
+        fingerprint.
+
+        Parameters
+        ----------
+        uri: str
+            The uri for the resource to lookup.
+
+        Returns
+        -------
+        content_hash: Optional[str]
+            The SHA256 hash for the resource contents if known. Else, None.
+        """
+        fingerprint = self._get_fingerprint(uri)
+        if fingerprint is None:
+            return None
+
+        entry_path = self._get_entry_path(uri, fingerprint)
+        with self._memo_lock:
+            if entry_path in self._memo:
+                return self._memo[entry_path]
+
+        try:
+            content_hash = self.fs.cat_file(entry_path).decode("utf-8").strip()
+        except FileNotFoundError:
+            return None
+
+        with self._memo_lock:
+            self._memo[entry_path] = content_hash
+
+        log.debug(f"Fingerprint cache hit for: {uri}")
+        return content_hash
+
+    def put(self, uri: str, content_hash: str) -> None:
+        """
+        Store the content hash of a resource under the resource's current fingerprint.
+
+        Parameters
+        ----------
+        uri: str
+            The uri for the resource.
+        content_hash: str
+            The SHA256 hash for the resource contents.
+
+        Notes
+        -----
+        Resources that can not be fingerprinted are not stored.
+        """
+        fingerprint = self._get_fingerprint(uri)
+        if fingerprint is None:
+            return
+
+        entry_path = self._get_entry_path(uri, fingerprint)
+        if isinstance(self.fs, LocalFileSystem):
+            self.fs.makedirs(self.storage_path, exist_ok=True)
+
+        self.fs.pipe_file(entry_path, content_hash.encode("utf-8"))
+        with self._memo_lock:
+            self._memo[entry_path] = content_hash
@@ -0,0 +1,436 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from hashlib import sha256
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from uuid import uuid4
+
+from fsspec.core import url_to_fs
+from fsspec.implementations.local import LocalFileSystem
+
+from . import file_utils
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+DEFAULT_MEDIA_CACHE_DIR = Path(tempfile.gettempdir()) / "cdp-media-cache"
+DEFAULT_MEDIA_CACHE_MAX_BYTES = 20 * 2**30  # 20 GiB
+
+_LOCK_SUFFIX = ".lock"
+_LEASE_SUFFIX = ".lease"
+_PARTIAL_SUFFIX = ".partial"
+_HASH_SUFFIX = ".sha256"
+
+###############################################################################
+
+
+def _remove(path: Path) -> None:
+    # Path.unlink(missing_ok=True) is only available in Python 3.8+
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class LocalMediaCache:
+    """
+    A local, on disk, cache of remote media files keyed by their source URI.
+
+    Every entry is stored under the SHA256 hash of the source URI so that any number
+    of tasks (and Dask workers on the same machine) that request the same resource
+    share a single download. The cache is bounded by a disk quota and evicts the least
+    recently used entries that are not currently in use. The SHA256 hash of each
+    entry's content is computed while it is downloaded and stored alongside it.
+
+    Parameters
+    ----------
+    cache_dir: Optional[Union[str, Path]]
+        The directory to store cached resources in.
+        Default: None (a "cdp-media-cache" directory in the system temp directory)
+    max_bytes: int
+        The disk quota for the cache.
+        Default: 20 GiB
+    stale_seconds: float
+        The age at which a lock or lease file is considered abandoned (for example
+        because the worker holding it was killed) and may be removed.
+        Default: 6 hours
+
+    Notes
+    -----
+    Concurrency is handled purely with the file system so that it works across
+    processes: downloads are written to a unique partial file and atomically renamed
+    into place, a lock file created with O_EXCL ensures only a single worker downloads
+    any given URI, and lease files mark entries that must not be evicted while a task
+    is reading them.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_bytes: int = DEFAULT_MEDIA_CACHE_MAX_BYTES,
+        stale_seconds: float = 6 * 60 * 60,
+    ):
+        if cache_dir is None:
+            cache_dir = DEFAULT_MEDIA_CACHE_DIR
+
+        self.cache_dir = Path(cache_dir).resolve()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stale_seconds = stale_seconds
+
+    @staticmethod
+    def _get_key(uri: str) -> str:
+        return sha256(uri.encode("utf-8")).hexdigest()
+
+    def get_entry_path(self, uri: str) -> Path:
+        """
+        Get the path a resource would be (or is) stored at in the cache.
+
+        Parameters
+        ----------
+        uri: str
+            The source URI of the resource.
+
+        Returns
+        -------
+        entry_path: Path
+            The path for the cache entry. The original file extension is kept so that
+            format detection in downstream tools (ffmpeg, imageio) still works.
+        """
+        suffix = Path(uri.split("/")[-1].split("?")[0]).suffix
+        return self.cache_dir / f"{self._get_key(uri)}{suffix}"
+
+    def _is_stale(self, path: Path) -> bool:
+        try:
+            return time.time() - path.stat().st_mtime > self.stale_seconds
+        except FileNotFoundError:
+            return False
+
+    @contextmanager
+    def _download_lock(self, entry_path: Path) -> Iterator[None]:
+        lock_path = entry_path.with_name(entry_path.name + _LOCK_SUFFIX)
+        acquired = False
+        while not acquired:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                acquired = True
+            except FileExistsError:
+                # Another worker is downloading, wait for it to finish
+                if entry_path.is_file():
+                    break
+                if self._is_stale(lock_path):
+                    log.warning(f"Removing stale media cache lock: {lock_path}")
+                    _remove(lock_path)
+                    continue
+                time.sleep(0.5)
+
+        try:
+            yield
+        finally:
+            if acquired:
+                _remove(lock_path)
+
+    def _touch(self, entry_path: Path) -> None:
+        # Access time is unreliable (noatime mounts) so LRU order is tracked by mtime
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            pass
+
+    def _list_entries(self) -> List[Tuple[Path, os.stat_result]]:
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if path.name.endswith(
+                (_LOCK_SUFFIX, _LEASE_SUFFIX, _PARTIAL_SUFFIX, _HASH_SUFFIX)
+            ):
+                continue
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+
+        return entries
+
+    @staticmethod
+    def _get_hash_path(entry_path: Path) -> Path:
+        return entry_path.with_name(entry_path.name + _HASH_SUFFIX)
+
+    def _write_hash(self, entry_path: Path, content_hash: str) -> None:
+        hash_path = self._get_hash_path(entry_path)
+        partial_path = hash_path.with_name(
+            f"{hash_path.name}.{uuid4().hex}{_PARTIAL_SUFFIX}"
+        )
+        partial_path.write_text(content_hash)
+        os.replace(partial_path, hash_path)
+
+    def _is_leased(self, entry_path: Path) -> bool:
+        for lease_path in self.cache_dir.glob(f"{entry_path.name}.*{_LEASE_SUFFIX}"):
+            if self._is_stale(lease_path):
+                _remove(lease_path)
+            else:
+                return True
+
+        return False
+
+    def evict(self, reserve_bytes: int = 0) -> int:
+        """
+        Evict least recently used entries until the cache (plus any reserved space)
+        fits within the disk quota. Entries that are currently leased are never
+        evicted.
+
+        Parameters
+        ----------
+        reserve_bytes: int
+            Number of bytes to additionally free up for an incoming entry.
+            Default: 0
+
+        Returns
+        -------
+        freed_bytes: int
+            The number of bytes removed from the cache.
+        """
+        entries = sorted(self._list_entries(), key=lambda e: e[1].st_mtime)
+        total_bytes = sum(stat.st_size for _, stat in entries)
+
+        freed_bytes = 0
+        for entry_path, stat in entries:
+            if total_bytes + reserve_bytes <= self.max_bytes:
+                break
+            if self._is_leased(entry_path):
+                continue
+
+            _remove(entry_path)
+            _remove(self._get_hash_path(entry_path))
+            log.debug(f"Evicted media cache entry: {entry_path}")
+            total_bytes -= stat.st_size
+            freed_bytes += stat.st_size
+
+        return freed_bytes
+
+    def get(self, uri: str) -> str:
+        """
+        Get the local path for a resource, downloading it into the cache if needed.
+
+        Parameters
+        ----------
+        uri: str
+            The source URI of the resource.
+
+        Returns
+        -------
+        local_path: str
+            The local path to the resource. Resources that already live on the local
+            file system are returned as is rather than being copied.
+
+        Notes
+        -----
+        The returned path is not protected from eviction, use `open` when the
+        resource will be read by a long running process.
+        """
+        fs, remote_path = url_to_fs(uri)
+        if isinstance(fs, LocalFileSystem):
+            return str(Path(remote_path).resolve(strict=True))
+
+        entry_path = self.get_entry_path(uri)
+        if entry_path.is_file():
+            log.debug(f"Media cache hit for: {uri}")
+            self._touch(entry_path)
+            return str(entry_path)
+
+        with self._download_lock(entry_path):
+            # Another worker may have completed the download while we waited
+            if entry_path.is_file():
+                self._touch(entry_path)
+                return str(entry_path)
+
+            # Make space for the incoming resource when the size is known up front
+            try:
+                self.evict(reserve_bytes=int(fs.size(remote_path) or 0))
+            except Exception:
+                self.evict()
+
+            partial_path = entry_path.with_name(
+                f"{entry_path.name}.{uuid4().hex}{_PARTIAL_SUFFIX}"
+            )
+            log.info(f"Beginning media cache download from: {uri}")
+            try:
+                # Hash while downloading so the content is only read once
+                content_hash = file_utils.stream_resource_copy(
+                    uri=uri, dst=partial_path
+                )
+                self._write_hash(entry_path, content_hash)
+                os.replace(partial_path, entry_path)
+            except Exception as e:
+                _remove(partial_path)
+                log.error(
+                    f"Something went wrong during media cache download. "
+                    f"Attempted copy from: '{uri}', resulted in error."
+                )
+                raise e
+
+            log.info(f"Completed media cache download from: {uri}")
+
+        return str(entry_path)
+
+    def add(self, uri: str, local_path: Union[str, Path]) -> str:
+        """
+        Store an existing local file in the cache under the provided URI.
+
+        Useful after uploading a local file to remote storage so that later readers
+        of the remote URI do not need to download it again.
+
+        Parameters
+        ----------
+        uri: str
+            The URI to store the resource under.
+        local_path: Union[str, Path]
+            The path to the local file to add. The file is hard linked into the cache
+            when possible and copied otherwise, it is never moved.
+
+        Returns
+        -------
+        entry_path: str
+            The path of the new cache entry.
+        """
+        resolved_local_path = Path(local_path).resolve(strict=True)
+        entry_path = self.get_entry_path(uri)
+        if entry_path.is_file():
+            self._touch(entry_path)
+            return str(entry_path)
+
+        self.evict(reserve_bytes=resolved_local_path.stat().st_size)
+        partial_path = entry_path.with_name(
+            f"{entry_path.name}.{uuid4().hex}{_PARTIAL_SUFFIX}"
+        )
+        try:
+            os.link(resolved_local_path, partial_path)
+        except OSError:
+            LocalFileSystem().copy(str(resolved_local_path), str(partial_path))
+
+        # Carry over the content hash if the file came from another cache entry
+        source_hash_path = self._get_hash_path(resolved_local_path)
+        if source_hash_path.is_file():
+            self._write_hash(entry_path, source_hash_path.read_text())
+
+        os.replace(partial_path, entry_path)
+        self._touch(entry_path)
+        return str(entry_path)
+
+    def get_content_hash(self, uri: str) -> str:
+        """
+        Get the SHA256 hash of a resource's content, downloading it into the cache
+        if needed.
+
+        Parameters
+        ----------
+        uri: str
+            The source URI of the resource.
+
+        Returns
+        -------
+        hash: str
+            The SHA256 hash for the resource contents. For cached resources this is
+            the hash computed during download, local resources (and entries missing a
+            stored hash) are hashed from disk.
+        """
+        local_path = self.get(uri)
+        hash_path = self._get_hash_path(Path(local_path))
+        if hash_path.is_file():
+            return hash_path.read_text()
+
+        content_hash = file_utils.hash_file_contents(uri=local_path)
+        if Path(local_path).parent == self.cache_dir:
+            self._write_hash(Path(local_path), content_hash)
+
+        return content_hash
+
+    @contextmanager
+    def open(self, uri: str) -> Iterator[str]:
+        """
+        Context manager that provides the local path to a resource and protects the
+        cache entry from eviction until the context exits.
+
+        Parameters
+        ----------
+        uri: str
+            The source URI of the resource.
+
+        Yields
+        ------
+        local_path: str
+            The local path to the resource.
+
+        Examples
+        --------
+        >>> with get_media_cache().open(session.video_uri) as video_path:
+        ...     file_utils.split_audio(video_path, "audio.wav")
+        """
+        entry_path = self.get_entry_path(uri)
+        lease_path = entry_path.with_name(
+            f"{entry_path.name}.{uuid4().hex}{_LEASE_SUFFIX}"
+        )
+        lease_path.touch()
+        try:
+            yield self.get(uri)
+        finally:
+            _remove(lease_path)
+
+    def clear(self) -> None:
+        """
+        Remove all entries that are not currently leased from the cache.
+        """
+        for entry_path, _ in self._list_entries():
+            if not self._is_leased(entry_path):
+                _remove(entry_path)
+                _remove(self._get_hash_path(entry_path))
+
+
+###############################################################################
+
+_MEDIA_CACHES: Dict[Tuple[Path, int], LocalMediaCache] = {}
+_MEDIA_CACHES_LOCK = threading.Lock()
+
+
+def get_media_cache(
+    cache_dir: Optional[Union[str, Path]] = None,
+    max_bytes: Optional[int] = None,
+) -> LocalMediaCache:
+    """
+    Get the process-wide media cache shared by all pipeline tasks.
+
+    Parameters
+    ----------
+    cache_dir: Optional[Union[str, Path]]
+        The directory to store cached resources in.
+        Default: None (a "cdp-media-cache" directory in the system temp directory)
+    max_bytes: Optional[int]
+        The disk quota for the cache.
+        Default: None (20 GiB)
+
+    Returns
+    -------
+    media_cache: LocalMediaCache
+        The shared media cache for the directory and quota.
+    """
+    if cache_dir is None:
+        cache_dir = DEFAULT_MEDIA_CACHE_DIR
+    if max_bytes is None:
+        max_bytes = DEFAULT_MEDIA_CACHE_MAX_BYTES
+
+    key = (Path(cache_dir).resolve(), max_bytes)
+    with _MEDIA_CACHES_LOCK:
+        if key not in _MEDIA_CACHES:
+            _MEDIA_CACHES[key] = LocalMediaCache(cache_dir=key[0], max_bytes=max_bytes)
+
+        return _MEDIA_CACHES[key]
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from typing import Callable, Dict, Iterable, List, Optional
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Google Speech-to-Text speech adaptation limits
+# See: https://cloud.google.com/speech-to-text/quotas#content
+GOOGLE_SPEECH_MAX_PHRASES = 500
+GOOGLE_SPEECH_MAX_TOTAL_CHARS = 10000
+
+###############################################################################
+
+
+class PhraseBudget:
+    """
+    Collect unique phrases, in order of priority, until a phrase count or a total
+    character count limit is met.
+
+    Counts are kept as phrases are added so that each addition is constant time.
+
+    Parameters
+    ----------
+    max_phrases: int
+        The maximum number of phrases to keep.
+        Default: GOOGLE_SPEECH_MAX_PHRASES
+    max_total_chars: int
+        The maximum number of characters of all kept phrases combined.
+        Default: GOOGLE_SPEECH_MAX_TOTAL_CHARS
+    clean_phrase: Optional[Callable[[str], str]]
+        A function to clean each phrase with before it is counted and kept.
+        Default: None (keep phrases as is)
+
+    Examples
+    --------
+    Phrases are kept in the order they are added, so add the most important phrases
+    (tiers) first.
+
+    >>> budget = PhraseBudget(max_total_chars=20)
+    >>> budget.add("Full Council")
+    True
+    >>> budget.extend(["Chair", "Full Council", "Council President"])
+    >>> budget.phrases
+    ['Full Council', 'Chair']
+    """
+
+    def __init__(
+        self,
+        max_phrases: int = GOOGLE_SPEECH_MAX_PHRASES,
+        max_total_chars: int = GOOGLE_SPEECH_MAX_TOTAL_CHARS,
+        clean_phrase: Optional[Callable[[str], str]] = None,
+    ):
+        self.max_phrases = max_phrases
+        self.max_total_chars = max_total_chars
+        self.clean_phrase = clean_phrase
+        self.total_chars = 0
+
+        # Dicts keep insertion order
+        self._phrases: Dict[str, None] = {}
+
+    @property
+    def phrases(self) -> List[str]:
+        return list(self._phrases)
+
+    @property
+    def is_full(self) -> bool:
+        return (
+            len(self._phrases) >= self.max_phrases
+            or self.total_chars >= self.max_total_chars
+        )
+
+    def add(self, phrase: Optional[str]) -> bool:
+        """
+        Keep a phrase if it is new and fits in the remaining budget.
+
+        Parameters
+        ----------
+        phrase: Optional[str]
+            The phrase to add. Anything that isn't a string is ignored.
+
+        Returns
+        -------
+        added: bool
+            Whether or not the phrase was kept.
+        """
+        if not isinstance(phrase, str) or self.is_full:
+            return False
+
+        if self.clean_phrase is not None:
+            phrase = self.clean_phrase(phrase)
+
+        if phrase in self._phrases:
+            return False
+        if self.total_chars + len(phrase) > self.max_total_chars:
+            return False
+
+        self._phrases[phrase] = None
+        self.total_chars += len(phrase)
+        return True
+
+    def extend(self, phrases: Iterable[Optional[str]]) -> None:
+        """
+        Add a tier of phrases, in order, stopping early once the budget is full.
+
+        Parameters
+        ----------
+        phrases: Iterable[Optional[str]]
+            The phrases to add.
+        """
+        for phrase in phrases:
+            if self.is_full:
+                return
+
+            self.add(phrase)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from fsspec.core import url_to_fs
+from nltk.stem import SnowballStemmer
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+DEFAULT_MAX_SIZE = 100_000
+
+# Stem caches are shared per process
+_STEM_CACHE_LOCK = threading.Lock()
+_STEM_CACHE: Optional["StemCache"] = None
+_WARMED_VOCABULARY_PATHS: Set[str] = set()
+
+###############################################################################
+
+
+class StemCache:
+    """
+    A bounded (least recently used) memoization of the stems of terms.
+
+    Council vocabulary is small compared to the number of terms in transcripts, so
+    most terms are only stemmed once. The cache can be stored to, and warmed from,
+    a vocabulary file so that it is reused between runs.
+
+    Parameters
+    ----------
+    max_size: int
+        The maximum number of stems to keep.
+        Default: 100000
+    language: str
+        The language of the Snowball stemmer.
+        Default: "english"
+
+    Examples
+    --------
+    >>> cache = StemCache()
+    >>> cache.warm("stem-vocabulary.json")
+    >>> cache.stem("housing")
+    'hous'
+    >>> cache.save("stem-vocabulary.json")
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, language: str = "english"):
+        self.max_size = max_size
+        self.language = language
+        self._stemmer = SnowballStemmer(language)
+        self._stems: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._stems)
+
+    def _add(self, term: str, stem: str) -> None:
+        self._stems[term] = stem
+        if len(self._stems) > self.max_size:
+            self._stems.popitem(last=False)
+
+    def stem(self, term: str) -> str:
+        """
+        Get the stem of a term.
+
+        Parameters
+        ----------
+        term: str
+            The term to stem.
+
+        Returns
+        -------
+        stem: str
+            The stem of the term.
+        """
+        with self._lock:
+            stem = self._stems.get(term)
+            if stem is not None:
+                self._stems.move_to_end(term)
+                self.hits += 1
+                return stem
+
+        # Stem outside of the lock, stemming the same term twice is harmless
+        stem = self._stemmer.stem(term)
+        with self._lock:
+            self.misses += 1
+            self._add(term, stem)
+
+        return stem
+
+    def warm(self, path: str) -> int:
+        """
+        Add the stems of a vocabulary file (see save) to the cache.
+
+        Parameters
+        ----------
+        path: str
+            The path (or fsspec URI) to the vocabulary file.
+
+        Returns
+        -------
+        num_stems: int
+            The number of stems loaded. Zero when the file doesn't exist.
+        """
+        fs, fs_path = url_to_fs(path)
+        if not fs.exists(fs_path):
+            log.info(f"No stem vocabulary found at: '{path}'")
+            return 0
+
+        with fs.open(fs_path, "r") as open_f:
+            vocabulary = json.load(open_f)
+
+        if vocabulary["language"] != self.language:
+            log.warning(
+                f"Ignoring {vocabulary['language']} stem vocabulary "
+                f"for {self.language} stem cache: '{path}'"
+            )
+            return 0
+
+        # Stems are stored from least to most recently used
+        with self._lock:
+            for term, stem in vocabulary["stems"].items():
+                self._add(term, stem)
+
+        log.info(f"Loaded {len(vocabulary['stems'])} stems from: '{path}'")
+        return len(vocabulary["stems"])
+
+    def save(self, path: str) -> None:
+        """
+        Store the cached stems to a vocabulary file.
+
+        Parameters
+        ----------
+        path: str
+            The path (or fsspec URI) to the vocabulary file.
+        """
+        with self._lock:
+            stems: Dict[str, str] = dict(self._stems)
+
+        fs, fs_path = url_to_fs(path)
+        with fs.open(fs_path, "w") as open_f:
+            json.dump({"language": self.language, "stems": stems}, open_f)
+
+        log.info(f"Stored {len(stems)} stems to: '{path}'")
+
+
+def get_stem_cache(vocabulary_path: Optional[str] = None) -> StemCache:
+    """
+    Get the (process wide, shared) English stem cache.
+
+    Parameters
+    ----------
+    vocabulary_path: Optional[str]
+        A vocabulary file to warm the cache with.
+        Each vocabulary file is only loaded once per process.
+        Default: None (don't warm the cache)
+
+    Returns
+    -------
+    stem_cache: StemCache
+        The shared stem cache.
+    """
+    global _STEM_CACHE
+    with _STEM_CACHE_LOCK:
+        if _STEM_CACHE is None:
+            _STEM_CACHE = StemCache()
+
+        if (
+            vocabulary_path is not None
+            and vocabulary_path not in _WARMED_VOCABULARY_PATHS
+        ):
+            _STEM_CACHE.warm(vocabulary_path)
+            _WARMED_VOCABULARY_PATHS.add(vocabulary_path)
+
+        return _STEM_CACHE
@@ -4,6 +4,7 @@
 import logging
 import re
 import string
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Pattern
 
 ###############################################################################
 
@@ -11,42 +12,33 @@ log = logging.getLogger(__name__)
 
 ###############################################################################
 
+_PUNCTUATION = re.compile(f"[{re.escape(string.punctuation)}]")
+_WORD_OR_NON_WORD_RUNS = re.compile(r"\w+|\W+")
 
-def clean_text(text: str, clean_stop_words: bool = False) -> str:
-    """
-    Clean text of common characters and extra formatting.
+# Loaded once per process (see get_english_stop_words)
+_ENGLISH_STOP_WORDS: Optional[FrozenSet[str]] = None
+_DEFAULT_TOKENIZER: Optional["TextTokenizer"] = None
+_TEXT_CLEANERS: Dict[bool, "TextCleaner"] = {}
+
+###############################################################################
 
-    Parameters
-    ----------
-    text: str
-        The raw text to clean.
-    clean_stop_words: bool
-        Should English stop words be removed from the raw text or not.
-        Default: False (do not remove stop words)
+
+def get_english_stop_words() -> FrozenSet[str]:
+    """
+    Get the NLTK English stop words, downloading them if required.
 
     Returns
     -------
-    cleaned_text: str
-        The cleaned text.
+    stop_words: FrozenSet[str]
+        The English stop words.
     """
-    # Remove new line and tab characters
-    cleaned_formatting = text.replace("\n", " ").replace("\t", " ")
-
-    # Replace common sentence structures
-    cleaned_sentence_structs = cleaned_formatting.replace("--", " ")
-
-    # Remove punctuation except periods
-    cleaned_punctuation = re.sub(
-        f"[{re.escape(string.punctuation)}]", "", cleaned_sentence_structs
-    )
-
-    # Remove stopwords
-    if clean_stop_words:
+    global _ENGLISH_STOP_WORDS
+    if _ENGLISH_STOP_WORDS is None:
         # Ensure stopwords are downloaded
         try:
             from nltk.corpus import stopwords
 
-            STOPWORDS = stopwords.words("english")
+            _ENGLISH_STOP_WORDS = frozenset(stopwords.words("english"))
         except LookupError:
             import nltk
 
@@ -54,32 +46,298 @@ def clean_text(text: str, clean_stop_words: bool = False) -> str:
             log.info("Downloaded nltk stopwords")
             from nltk.corpus import stopwords
 
-            STOPWORDS = stopwords.words("english")
+            _ENGLISH_STOP_WORDS = frozenset(stopwords.words("english"))
+
+    return _ENGLISH_STOP_WORDS
+
+
+class TokenizedText(NamedTuple):
+    # The original (whitespace separated) terms of the text
+    terms: List[str]
+    # The cleaned tokens, their lowercased forms, the index of the original term
+    # each token comes from, and whether each token is a stop word
+    tokens: List[str]
+    lowered_tokens: List[str]
+    term_indices: List[int]
+    stop_words: List[bool]
+
+    @property
+    def content_indices(self) -> List[int]:
+        """
+        The indices of all tokens that are not stop words.
+        """
+        return [i for i, is_stop_word in enumerate(self.stop_words) if not is_stop_word]
+
+    def get_content_n_grams(self, n: int) -> List[List[int]]:
+        """
+        Get the token indices of every n gram of consecutive tokens that are not stop
+        words (stop words are skipped, not n gram boundaries).
+
+        Parameters
+        ----------
+        n: int
+            N number of tokens in each n gram.
+
+        Returns
+        -------
+        n_grams: List[List[int]]
+            The token indices of each n gram, in order.
+        """
+        content_indices = self.content_indices
+        return [content_indices[i : i + n] for i in range(len(content_indices) - n + 1)]
+
+
+class TextTokenizer:
+    """
+    Tokenize text in a single pass the same way `clean_text` cleans it.
+
+    Each original term of the text is stripped of punctuation once (splitting it
+    on "--") and stop words are found with set lookups, keeping the index of the
+    original term of every token so that the cleaned tokens can be mapped back to
+    the text (i.e. for context spans).
+
+    Joining the tokens that are not stop words with spaces gives the same text as
+    `clean_text(text, clean_stop_words=True)`.
+
+    Parameters
+    ----------
+    stop_words: Optional[Iterable[str]]
+        The stop words to mark.
+        Default: None (the NLTK English stop words)
+
+    Examples
+    --------
+    >>> tokenized = TextTokenizer().tokenize("Hello and good-bye.")
+    >>> [tokenized.tokens[i] for i in tokenized.content_indices]
+    ['Hello', 'goodbye']
+    """
 
-        joined_stopwords = "|".join(STOPWORDS)
-        cleaned_stopwords = re.sub(
-            r"\b(" + joined_stopwords + r")\b",
-            "",
-            cleaned_punctuation,
+    def __init__(self, stop_words: Optional[Iterable[str]] = None):
+        self.stop_words = (
+            get_english_stop_words() if stop_words is None else frozenset(stop_words)
         )
-    else:
-        # Update for mypy typing
-        cleaned_stopwords = cleaned_punctuation
-
-    # Remove gaps in string
-    try:
-        cleaned_doc = re.sub(r" {2,}", " ", cleaned_stopwords)
-        if cleaned_doc[0] == " ":
-            cleaned_doc = cleaned_doc[1:]
-        if cleaned_doc[-1] == " ":
-            cleaned_doc = cleaned_doc[:-1]
-
-    # IndexError occurs when the string was cleaned and it contained entirely stop
-    # words or punctuation for some reason
-    except IndexError:
-        return ""
-
-    return cleaned_doc
+
+    def _tokenize_piece(self, piece: str) -> Optional[str]:
+        # Most pieces are a single word (or stop word)
+        if piece in self.stop_words:
+            return None
+
+        # Stop words are only removed when they are a complete word
+        # i.e. the "s" of "council’s" (a non punctuation apostrophe)
+        runs = _WORD_OR_NON_WORD_RUNS.findall(piece)
+        if len(runs) > 1:
+            piece = "".join(run for run in runs if run not in self.stop_words)
+
+        return piece
+
+    def tokenize(self, text: str) -> TokenizedText:
+        """
+        Tokenize text.
+
+        Parameters
+        ----------
+        text: str
+            The raw text to tokenize.
+
+        Returns
+        -------
+        tokenized: TokenizedText
+            The tokens of the text.
+        """
+        terms = text.split()
+        tokenized = TokenizedText(
+            terms=terms,
+            tokens=[],
+            lowered_tokens=[],
+            term_indices=[],
+            stop_words=[],
+        )
+        for term_index, term in enumerate(terms):
+            for piece in _PUNCTUATION.sub("", term.replace("--", " ")).split():
+                token = self._tokenize_piece(piece)
+                tokenized.tokens.append(piece if token is None else token)
+                tokenized.lowered_tokens.append(
+                    piece.lower() if token is None else token.lower()
+                )
+                tokenized.term_indices.append(term_index)
+                tokenized.stop_words.append(token is None)
+
+        return tokenized
+
+
+def get_text_tokenizer() -> TextTokenizer:
+    """
+    Get the (process wide, shared) tokenizer using the NLTK English stop words.
+
+    Returns
+    -------
+    tokenizer: TextTokenizer
+        The shared tokenizer.
+    """
+    global _DEFAULT_TOKENIZER
+    if _DEFAULT_TOKENIZER is None:
+        _DEFAULT_TOKENIZER = TextTokenizer()
+
+    return _DEFAULT_TOKENIZER
+
+
+class TextCleaner:
+    """
+    Clean text of common characters and extra formatting.
+
+    All resources (stop words) are loaded and all patterns are compiled once, when
+    the cleaner is created, so a single cleaner should be reused for many texts.
+
+    Parameters
+    ----------
+    clean_stop_words: bool
+        Should English stop words be removed from the raw text or not.
+        Default: False (do not remove stop words)
+
+    Examples
+    --------
+    >>> cleaner = TextCleaner(clean_stop_words=True)
+    >>> cleaner.clean("hello and goodbye")
+    'hello goodbye'
+    >>> cleaner.clean_batch([sentence.text for sentence in transcript.sentences])
+    """
+
+    # Separates the texts of a batch, untouched by every cleaning step
+    BATCH_SEPARATOR = "\x00"
+
+    def __init__(self, clean_stop_words: bool = False):
+        self.clean_stop_words = clean_stop_words
+        self._punctuation = _PUNCTUATION
+        self._gaps = re.compile(r" {2,}")
+        self._stop_words: Optional[Pattern] = None
+        if clean_stop_words:
+            self._stop_words = re.compile(
+                r"\b("
+                + "|".join(re.escape(word) for word in sorted(get_english_stop_words()))
+                + r")\b"
+            )
+
+    def _clean(self, text: str) -> str:
+        # Remove new line and tab characters
+        cleaned_formatting = text.replace("\n", " ").replace("\t", " ")
+
+        # Replace common sentence structures
+        cleaned_sentence_structs = cleaned_formatting.replace("--", " ")
+
+        # Remove punctuation except periods
+        cleaned_punctuation = self._punctuation.sub("", cleaned_sentence_structs)
+
+        # Remove stopwords
+        if self._stop_words is not None:
+            cleaned_stopwords = self._stop_words.sub("", cleaned_punctuation)
+        else:
+            cleaned_stopwords = cleaned_punctuation
+
+        # Remove gaps in string
+        return self._gaps.sub(" ", cleaned_stopwords)
+
+    @staticmethod
+    def _strip_single_spaces(cleaned_text: str) -> str:
+        # Gaps were already removed so there is at most one space on each side
+        if cleaned_text.startswith(" "):
+            cleaned_text = cleaned_text[1:]
+        if cleaned_text.endswith(" "):
+            cleaned_text = cleaned_text[:-1]
+
+        return cleaned_text
+
+    def clean(self, text: str) -> str:
+        """
+        Clean a single text.
+
+        Parameters
+        ----------
+        text: str
+            The raw text to clean.
+
+        Returns
+        -------
+        cleaned_text: str
+            The cleaned text. Empty if the text contained entirely stop words or
+            punctuation.
+        """
+        return self._strip_single_spaces(self._clean(text))
+
+    def clean_batch(self, texts: Iterable[str]) -> List[str]:
+        """
+        Clean many texts with a single pass of each cleaning step.
+
+        Parameters
+        ----------
+        texts: Iterable[str]
+            The raw texts to clean.
+
+        Returns
+        -------
+        cleaned_texts: List[str]
+            The cleaned texts, in the same order, each the same as if cleaned with
+            `clean`.
+        """
+        texts = list(texts)
+        if len(texts) == 0:
+            return []
+
+        # Texts that contain the separator are cleaned one at a time
+        if any(self.BATCH_SEPARATOR in text for text in texts):
+            return [self.clean(text) for text in texts]
+
+        return [
+            self._strip_single_spaces(cleaned_text)
+            for cleaned_text in self._clean(self.BATCH_SEPARATOR.join(texts)).split(
+                self.BATCH_SEPARATOR
+            )
+        ]
+
+
+def get_text_cleaner(clean_stop_words: bool = False) -> TextCleaner:
+    """
+    Get the (process wide, shared) text cleaner.
+
+    Parameters
+    ----------
+    clean_stop_words: bool
+        Should English stop words be removed from the raw text or not.
+        Default: False (do not remove stop words)
+
+    Returns
+    -------
+    cleaner: TextCleaner
+        The shared text cleaner.
+    """
+    if clean_stop_words not in _TEXT_CLEANERS:
+        _TEXT_CLEANERS[clean_stop_words] = TextCleaner(clean_stop_words)
+
+    return _TEXT_CLEANERS[clean_stop_words]
+
+
+def clean_text(text: str, clean_stop_words: bool = False) -> str:
+    """
+    Clean text of common characters and extra formatting.
+
+    Parameters
+    ----------
+    text: str
+        The raw text to clean.
+    clean_stop_words: bool
+        Should English stop words be removed from the raw text or not.
+        Default: False (do not remove stop words)
+
+    Returns
+    -------
+    cleaned_text: str
+        The cleaned text.
+
+    See Also
+    --------
+    TextCleaner
+        To clean many texts at once.
+    """
+    return get_text_cleaner(clean_stop_words).clean(text)
 
 
 def convert_gcs_json_url_to_gsutil_form(url: str) -> str:
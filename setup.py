@@ -25,7 +25,7 @@ pipeline_requirements = [
     "pulumi~=3.3",
     "pulumi-google-native~=0.7.0",
     "pulumi-gcp~=5.7",
-    "rapidfuzz~=1.4",
+    "pyarrow~=5.0",
     "spacy~=3.0",
     "truecase~=0.0.12",
     "webvtt-py~=0.4.6",
@@ -41,7 +41,6 @@ test_requirements = [
     "isort>=5.7.0",
     "mypy>=0.790",
     "networkx>=2.5",
-    "pyarrow~=5.0",
     "pydot>=1.4",
     "pytest>=5.4.3",
     "pytest-cov>=2.9.0",
@@ -73,6 +72,7 @@ requirements = [
     "fireo~=1.4.5",
     "fsspec",  # Version pin set by gcsfs
     "gcsfs~=2021.7.0",
+    "requests",  # Version pin set by gcsfs
 ]
 
 extra_requirements = {
@@ -123,6 +123,7 @@ setup(
             "run_cdp_event_index=cdp_backend.bin.run_cdp_event_index:main",
             "search_cdp_events=cdp_backend.bin.search_cdp_events:main",
             "process_special_event=cdp_backend.bin.process_special_event:main",
+            "refresh_cdp_write_cache=cdp_backend.bin.refresh_cdp_write_cache:main",
         ],
     },
     install_requires=requirements,